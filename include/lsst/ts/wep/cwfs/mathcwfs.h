@@ -36,6 +36,30 @@ namespace ts {
 namespace wep {
 namespace cwfs {
 
+/**
+ * Input array of double. The array of any dimension is accepted. The array is
+ * converted to the C-contiguous double array only if it has the different type
+ * or layout (e.g. float32 or strided). Otherwise, there is no copy.
+ */
+using InputArray =
+    py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+/**
+ * Set the number of threads used in the evaluation. The evaluation releases
+ * the GIL and splits the points among the threads.
+ *
+ * @param[in] numThreads  Number of threads. The number of hardware threads is
+ * used if it is 0.
+ */
+void setNumOfThreads(size_t numThreads);
+
+/**
+ * Get the number of threads used in the evaluation.
+ *
+ * @return the number of threads
+ */
+size_t getNumOfThreads();
+
 /**
  * Annular Zernike polynomials evaluation.
  *
@@ -43,11 +67,29 @@ namespace cwfs {
  * @param[in] arrayX  X coordinate on pupil plane
  * @param[in] arrayY  Y coordinate on pupil plane
  * @param[in] e  Obscuration value
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
  * @return the wavefront surface
  */
-py::array_t<double> zernikeAnnularEval(py::array_t<double> arrayZk,
-                                       py::array_t<double> arrayX,
-                                       py::array_t<double> arrayY, double e);
+py::array_t<double> zernikeAnnularEval(InputArray arrayZk, InputArray arrayX,
+                                       InputArray arrayY, double e,
+                                       py::object out);
+
+/**
+ * Basis of annular Zernike polynomials. Each row is the evaluation of single
+ * term with the coefficient of 1.
+ *
+ * @param[in] arrayX  X coordinate on pupil plane
+ * @param[in] arrayY  Y coordinate on pupil plane
+ * @param[in] e  Obscuration value
+ * @param[in] numTerms  Number of terms (<= 28)
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
+ * @return the basis with the shape of (numTerms, *shape of arrayX)
+ */
+py::array_t<double> zernikeAnnularEvalBasis(InputArray arrayX,
+                                            InputArray arrayY, double e,
+                                            size_t numTerms, py::object out);
 
 /**
  * Jacobian of annular Zernike polynomials.
@@ -57,12 +99,31 @@ py::array_t<double> zernikeAnnularEval(py::array_t<double> arrayZk,
  * @param[in] arrayY  Y coordinate on pupil plane
  * @param[in] e  Obscuration value
  * @param[in] atype  Type/ Order of Jocobian Matrix ("1st" or "2nd")
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
  * @return the Jacobian elements in pupul x and y directions
  */
-py::array_t<double> zernikeAnnularJacobian(py::array_t<double> arrayZk,
-                                           py::array_t<double> arrayX,
-                                           py::array_t<double> arrayY, double e,
-                                           std::string atype);
+py::array_t<double> zernikeAnnularJacobian(InputArray arrayZk,
+                                           InputArray arrayX, InputArray arrayY,
+                                           double e, std::string atype,
+                                           py::object out);
+
+/**
+ * Basis of the Jacobian of annular Zernike polynomials. The "1st" Jacobian is
+ * the sum of Zk * row_k and the "2nd" Jacobian is the sum of Zk^2 * row_k.
+ *
+ * @param[in] arrayX  X coordinate on pupil plane
+ * @param[in] arrayY  Y coordinate on pupil plane
+ * @param[in] e  Obscuration value
+ * @param[in] atype  Type/ Order of Jocobian Matrix ("1st" or "2nd")
+ * @param[in] numTerms  Number of terms (<= 22)
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
+ * @return the basis with the shape of (numTerms, *shape of arrayX)
+ */
+py::array_t<double>
+zernikeAnnularJacobianBasis(InputArray arrayX, InputArray arrayY, double e,
+                            std::string atype, size_t numTerms, py::object out);
 
 /**
  * Gradient of annular Zernike polynomials.
@@ -72,49 +133,101 @@ py::array_t<double> zernikeAnnularJacobian(py::array_t<double> arrayZk,
  * @param[in] arrayY  Y coordinate on pupil plane
  * @param[in] e  Obscuration value
  * @param[in] axis  Axis of "dx", "dy", "dx2", "dy2", or "dxy"
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
  * @return the integration elements of gradient in pupul x and y directions
  */
-py::array_t<double> zernikeAnnularGrad(py::array_t<double> arrayZk,
-                                       py::array_t<double> arrayX,
-                                       py::array_t<double> arrayY, double e,
-                                       std::string axis);
+py::array_t<double> zernikeAnnularGrad(InputArray arrayZk, InputArray arrayX,
+                                       InputArray arrayY, double e,
+                                       std::string axis, py::object out);
+
+/**
+ * Basis of the gradient of annular Zernike polynomials. Each row is the
+ * gradient of single term with the coefficient of 1.
+ *
+ * @param[in] arrayX  X coordinate on pupil plane
+ * @param[in] arrayY  Y coordinate on pupil plane
+ * @param[in] e  Obscuration value
+ * @param[in] axis  Axis of "dx", "dy", "dx2", "dy2", or "dxy"
+ * @param[in] numTerms  Number of terms (<= 22)
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
+ * @return the basis with the shape of (numTerms, *shape of arrayX)
+ */
+py::array_t<double> zernikeAnnularGradBasis(InputArray arrayX,
+                                            InputArray arrayY, double e,
+                                            std::string axis, size_t numTerms,
+                                            py::object out);
 
 /**
  * Polynomial fit to 10th order in 2D (x, y dimensions).
  *
- * @param[in] arrayC  Parameters of off-axis distrotion
+ * @param[in] arrayC  Parameters of off-axis distrotion. It can be a stack of
+ * parameters with the shape of (numOfRows, 66), in which the points are split
+ * into numOfRows contiguous groups that use the parameters in the same row.
  * @param[in] arrayX  X coordinate on pupil plane
  * @param[in] arrayY  Y coordinate on pupil plane
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
  * @return the corrected parameters for off-axis distortion
  */
-py::array_t<double> poly10_2D(py::array_t<double> arrayC,
-                              py::array_t<double> arrayX,
-                              py::array_t<double> arrayY);
+py::array_t<double> poly10_2D(InputArray arrayC, InputArray arrayX,
+                              InputArray arrayY, py::object out);
 
 /**
  * Gradient of polynomial fit to 10th order in 2D (x, y dimensions).
  *
- * @param[in] arrayC  Parameters of off-axis distrotion
+ * @param[in] arrayC  Parameters of off-axis distrotion. It can be a stack of
+ * parameters with the shape of (numOfRows, 66), in which the points are split
+ * into numOfRows contiguous groups that use the parameters in the same row.
  * @param[in] arrayX  X coordinate on pupil plane
  * @param[in] arrayY  Y coordinate on pupil plane
  * @param[in] axis  Direction of gradient ("dx" or "dy")
+ * @param[in] out  Output buffer (C-contiguous float64 array with the matched
+ * size) or None to allocate a new array
  * @return the corrected parameters for off-axis distortion
  */
-py::array_t<double> poly10Grad(py::array_t<double> arrayC,
-                               py::array_t<double> arrayX,
-                               py::array_t<double> arrayY, std::string axis);
+py::array_t<double> poly10Grad(InputArray arrayC, InputArray arrayX,
+                               InputArray arrayY, std::string axis,
+                               py::object out);
 
 PYBIND11_MODULE(mathcwfs, m) {
+    m.def("setNumOfThreads", &setNumOfThreads,
+          "Set the number of threads used in the evaluation.");
+    m.def("getNumOfThreads", &getNumOfThreads,
+          "Get the number of threads used in the evaluation.");
     m.def("zernikeAnnularEval", &zernikeAnnularEval,
-          "Jacobian of annular Zernike polynomials.");
+          "Jacobian of annular Zernike polynomials.", py::arg("arrayZk"),
+          py::arg("arrayX"), py::arg("arrayY"), py::arg("e"),
+          py::arg("out") = py::none());
+    m.def("zernikeAnnularEvalBasis", &zernikeAnnularEvalBasis,
+          "Basis of annular Zernike polynomials.", py::arg("arrayX"),
+          py::arg("arrayY"), py::arg("e"), py::arg("numTerms"),
+          py::arg("out") = py::none());
     m.def("zernikeAnnularJacobian", &zernikeAnnularJacobian,
-          "Jacobian of annular Zernike polynomials.");
+          "Jacobian of annular Zernike polynomials.", py::arg("arrayZk"),
+          py::arg("arrayX"), py::arg("arrayY"), py::arg("e"), py::arg("atype"),
+          py::arg("out") = py::none());
+    m.def("zernikeAnnularJacobianBasis", &zernikeAnnularJacobianBasis,
+          "Basis of the Jacobian of annular Zernike polynomials.",
+          py::arg("arrayX"), py::arg("arrayY"), py::arg("e"), py::arg("atype"),
+          py::arg("numTerms"), py::arg("out") = py::none());
     m.def("zernikeAnnularGrad", &zernikeAnnularGrad,
-          "Gradient of annular Zernike polynomials.");
+          "Gradient of annular Zernike polynomials.", py::arg("arrayZk"),
+          py::arg("arrayX"), py::arg("arrayY"), py::arg("e"), py::arg("axis"),
+          py::arg("out") = py::none());
+    m.def("zernikeAnnularGradBasis", &zernikeAnnularGradBasis,
+          "Basis of the gradient of annular Zernike polynomials.",
+          py::arg("arrayX"), py::arg("arrayY"), py::arg("e"), py::arg("axis"),
+          py::arg("numTerms"), py::arg("out") = py::none());
     m.def("poly10_2D", &poly10_2D,
-          "Polynomial fit to 10th order in 2D (x, y dimensions).");
+          "Polynomial fit to 10th order in 2D (x, y dimensions).",
+          py::arg("arrayC"), py::arg("arrayX"), py::arg("arrayY"),
+          py::arg("out") = py::none());
     m.def("poly10Grad", &poly10Grad,
-          "Gradient of polynomial fit to 10th order in 2D (x, y dimensions).");
+          "Gradient of polynomial fit to 10th order in 2D (x, y dimensions).",
+          py::arg("arrayC"), py::arg("arrayX"), py::arg("arrayY"),
+          py::arg("axis"), py::arg("out") = py::none());
 }
 
 } // namespace cwfs
@@ -63,16 +63,24 @@ class CentroidFindType(IntEnum):
     RandomWalk = 1
     Otsu = auto()
     ConvolveTemplate = auto()
+    HistogramValley = auto()
 
 
 class DonutTemplateType(IntEnum):
     Model = 1
+    Bank = 2
 
 
 class DeblendDonutType(IntEnum):
     Adapt = 1
 
 
+class FftBackendType(IntEnum):
+    Numpy = 1
+    Scipy = auto()
+    Pyfftw = auto()
+
+
 def getModulePath():
     """Get the path of module.
 
@@ -364,7 +372,8 @@ def getCentroidFindType(centroidFindType):
     Parameters
     ----------
     centroidFindType : str
-        Centroid find algorithm to use (randomWalk, otsu, or convolveTemplate).
+        Centroid find algorithm to use (randomWalk, otsu, convolveTemplate, or
+        histogramValley).
 
     Returns
     -------
@@ -383,6 +392,8 @@ def getCentroidFindType(centroidFindType):
         return CentroidFindType.Otsu
     elif centroidFindType == "convolveTemplate":
         return CentroidFindType.ConvolveTemplate
+    elif centroidFindType == "histogramValley":
+        return CentroidFindType.HistogramValley
     else:
         raise ValueError("The %s is not supported." % centroidFindType)
 
@@ -410,3 +421,32 @@ def getDeblendDonutType(deblendDonutType):
         return DeblendDonutType.Adapt
     else:
         raise ValueError("The %s is not supported." % deblendDonutType)
+
+
+def getFftBackendType(fftBackendType):
+    """Get the FFT backend type.
+
+    Parameters
+    ----------
+    fftBackendType : str
+        FFT backend to use (numpy, scipy, or pyfftw).
+
+    Returns
+    -------
+    enum 'FftBackendType'
+        FFT backend type.
+
+    Raises
+    ------
+    ValueError
+        The FFT backend type is not supported.
+    """
+
+    if fftBackendType == "numpy":
+        return FftBackendType.Numpy
+    elif fftBackendType == "scipy":
+        return FftBackendType.Scipy
+    elif fftBackendType == "pyfftw":
+        return FftBackendType.Pyfftw
+    else:
+        raise ValueError("The %s is not supported." % fftBackendType)
@@ -183,6 +183,38 @@ class WfEstimator(object):
         self.imgIntra = CompensableImage(centroidFindType=centroidFindType)
         self.imgExtra = CompensableImage(centroidFindType=centroidFindType)
 
+    def setWarmStart(self, zer4UpNm):
+        """Set the Zk coefficients to seed the compensation (warm start) in the
+        next calculation of wavefront error.
+
+        This is useful for the consecutive exposures of the same field, e.g.
+        the average of wavefront error on single CCD in the previous visit.
+
+        Parameters
+        ----------
+        zer4UpNm : numpy.ndarray or None
+            Zk coefficients (z4 - zn) in nm. None means there is no warm
+            start.
+        """
+
+        self.algo.setWarmStart(zer4UpNm)
+
+    def setConvergencePolicy(self, convergencePolicy):
+        """Set the convergence policy of outer-loop iteration in the
+        calculation of wavefront error.
+
+        The policy is reset in config().
+
+        Parameters
+        ----------
+        convergencePolicy : ConvergencePolicy or None
+            Convergence policy. If it is None, the policy in the algorithm
+            configuration file is used. The tolerance in calWfsErr() is used
+            if there is no policy in the file.
+        """
+
+        self.algo.setConvergencePolicy(convergencePolicy)
+
     def setImg(self, fieldXY, defocalType, image=None, imageFile=None):
         """Set the wavefront image.
 
@@ -232,11 +264,12 @@ class WfEstimator(object):
 
         # Check the image size
         for img in (self.imgIntra, self.imgExtra):
-            d1, d2 = img.getImg().shape
-            if (d1 != self.sizeInPix) or (d2 != self.sizeInPix):
+            # The image stamp is square, which is checked in setImg()
+            sizeInPix = img.getImgSizeInPix()
+            if sizeInPix != self.sizeInPix:
                 raise RuntimeError(
                     "Input image shape is (%d, %d), not required (%d, %d)"
-                    % (d1, d2, self.sizeInPix, self.sizeInPix)
+                    % (sizeInPix, sizeInPix, self.sizeInPix, self.sizeInPix)
                 )
 
         # Calculate the wavefront error.
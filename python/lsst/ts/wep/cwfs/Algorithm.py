@@ -24,18 +24,19 @@ import sys
 import numpy as np
 
 from scipy.ndimage import generate_binary_structure, iterate_structure
+from scipy.sparse import csr_matrix
+from scipy.fft import next_fast_len
 from scipy.ndimage.filters import laplace
 from scipy.ndimage.morphology import binary_dilation, binary_erosion
 
 from lsst.ts.wep.ParamReader import ParamReader
+from lsst.ts.wep.Utility import getFftBackendType
+from lsst.ts.wep.cwfs.ConvergencePolicy import ConvergencePolicy
+from lsst.ts.wep.cwfs.FftBackendFactory import FftBackendFactory
 from lsst.ts.wep.cwfs.Instrument import Instrument
-from lsst.ts.wep.cwfs.Tool import (
-    padArray,
-    extractArray,
-    ZernikeAnnularEval,
-    ZernikeMaskedFit,
-    ZernikeAnnularGrad,
-)
+from lsst.ts.wep.cwfs.Tool import padArray, extractArray
+from lsst.ts.wep.cwfs.ZernikeBasisCache import ZernikeBasisCache
+from lsst.ts.wep.cwfs.ZernikeMaskedFitter import ZernikeMaskedFitter
 from lsst.ts.wep.PlotUtil import plotZernike
 
 
@@ -97,6 +98,35 @@ class Algorithm(object):
         self.pMaskPad = None
         self.cMaskPad = None
 
+        # Operator to average the wavefront around the boundary of pMask for
+        # "fft" to use. It is built from pMask when needed.
+        self._boundaryAvgOperator = None
+
+        # Backend of FFT for "fft" to use. It is created when needed.
+        self._fftBackend = None
+
+        # Convergence policy of outer-loop iteration. It is created from the
+        # algorithm configuration file when needed if not set. The tolerance
+        # of runIt() is used if it is None.
+        self._convergencePolicy = None
+
+        # Zk coefficients in meter to seed the compensation (warm start). The
+        # iteration starts from zero if it is None.
+        self._zcompWarmStart = None
+
+        # Cache of annular Zernike basis on the sensor grid
+        self._basisCache = ZernikeBasisCache()
+
+        # Fitter of annular Zernike polynomials in the mask with the cached
+        # pseudo-inverse matrix
+        self._maskedFitter = ZernikeMaskedFitter()
+
+        # Key of pMask in the fitter, which has the instrument scalars and
+        # the version of pMask. It is None if pMask is not made by
+        # _makeMasterMask().
+        self._maskVersion = 0
+        self._maskedFitKey = None
+
     def reset(self):
         """Reset the calculation for the new input images with the same
         algorithm settings."""
@@ -118,6 +148,14 @@ class Algorithm(object):
         self.pMaskPad = None
         self.cMaskPad = None
 
+        self._boundaryAvgOperator = None
+        self._maskedFitKey = None
+
+        # The count of converged iterations of the convergence policy is not
+        # carried over to the new images
+        if self._convergencePolicy is not None:
+            self._convergencePolicy.start()
+
     def config(self, algoName, inst, debugLevel=0):
         """Configure the algorithm to solve TIE.
 
@@ -166,6 +204,203 @@ class Algorithm(object):
         self.pMaskPad = None
         self.cMaskPad = None
 
+        self._boundaryAvgOperator = None
+        self._maskedFitKey = None
+
+        self._fftBackend = None
+
+        self._convergencePolicy = None
+
+        # The number of Zk terms might be changed
+        self._zcompWarmStart = None
+
+    def getZernikeBasisCache(self):
+        """Get the cache of annular Zernike basis on the sensor grid.
+
+        Returns
+        -------
+        ZernikeBasisCache
+            Cache of annular Zernike basis.
+        """
+
+        return self._basisCache
+
+    def getFftBackend(self):
+        """Get the backend of fast Fourier transform (FFT).
+
+        This is for the FFT solver only.
+
+        Returns
+        -------
+        Child class of FftBackendDefault or None
+            FFT backend. It is None if the solver is not "fft".
+        """
+
+        if self.getPoissonSolverName() != "fft":
+            return None
+
+        if self._fftBackend is None:
+            self._fftBackend = FftBackendFactory.createFftBackend(
+                getFftBackendType(self.getFftBackendName()),
+                numOfWorkers=self.getNumOfFftWorkers(),
+            )
+
+        return self._fftBackend
+
+    def getConvergencePolicy(self):
+        """Get the convergence policy of outer-loop iteration.
+
+        If the policy is not set, it is created from the algorithm
+        configuration file.
+
+        Returns
+        -------
+        ConvergencePolicy or None
+            Convergence policy. None means the tolerance in runIt() is used.
+        """
+
+        if self._convergencePolicy is None:
+            self._convergencePolicy = self._createConvergencePolicy()
+
+        return self._convergencePolicy
+
+    def setConvergencePolicy(self, convergencePolicy):
+        """Set the convergence policy of outer-loop iteration.
+
+        The policy is reset in config().
+
+        Parameters
+        ----------
+        convergencePolicy : ConvergencePolicy or None
+            Convergence policy. If it is None, the policy in the algorithm
+            configuration file is used. The tolerance in runIt() is used if
+            there is no policy in the file.
+        """
+
+        self._convergencePolicy = convergencePolicy
+
+    def _createConvergencePolicy(self):
+        """Create the convergence policy from the algorithm configuration
+        file.
+
+        Returns
+        -------
+        ConvergencePolicy or None
+            Convergence policy. None if none of the tolerances and maximum
+            time is set.
+        """
+
+        absTol = self._getSettingWithDefault("convergenceAbsTol", None)
+        relTol = self._getSettingWithDefault("convergenceRelTol", None)
+        maxTimeInSec = self._getSettingWithDefault("convergenceMaxTimeInSec", None)
+        if (absTol is None) and (relTol is None) and (maxTimeInSec is None):
+            return None
+
+        return ConvergencePolicy(
+            absTol=absTol,
+            relTol=relTol,
+            zkGroups=self._getSettingWithDefault("convergenceZkGroups", None),
+            patience=self._getSettingWithDefault("convergencePatience", 1),
+            maxTimeInSec=maxTimeInSec,
+        )
+
+    def getWarmStart(self):
+        """Get the Zk coefficients to seed the compensation (warm start).
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Zk coefficients (z4 - zn) in nm. None means there is no warm
+            start.
+        """
+
+        if self._zcompWarmStart is None:
+            return None
+
+        return self._zcompWarmStart[3:] * 1e9
+
+    def setWarmStart(self, zer4UpNm):
+        """Set the Zk coefficients to seed the compensation (warm start).
+
+        The outer-loop iteration starts from the compensation with these Zk
+        coefficients instead of zero, e.g. the solution of previous visit or
+        neighboring donut. Since the lower terms are already compensated, the
+        iteration skips the ramp-up of compSequence and starts from the first
+        iteration that compensates all the terms. This shortens the iteration.
+        The warm start is kept in reset() and cleared in config().
+
+        Parameters
+        ----------
+        zer4UpNm : numpy.ndarray or None
+            Zk coefficients (z4 - zn) in nm. The missing higher terms are
+            zero. None means there is no warm start.
+
+        Raises
+        ------
+        ValueError
+            The number of terms is more than the solved terms.
+        """
+
+        if zer4UpNm is None:
+            self._zcompWarmStart = None
+            return
+
+        zer4UpNm = np.array(zer4UpNm, dtype=float).reshape(-1)
+
+        numTerms = self.getNumOfZernikes()
+        if len(zer4UpNm) > numTerms - 3:
+            raise ValueError("Number of terms should be <= %d." % (numTerms - 3))
+
+        zcomp = np.zeros(numTerms)
+        zcomp[3 : 3 + len(zer4UpNm)] = zer4UpNm * 1e-9
+
+        self._zcompWarmStart = zcomp
+
+    def _getItrOffset(self):
+        """Get the offset of iteration in compSequence and
+        signalClipSequence.
+
+        The offset is the number of ramp-up iterations in compSequence that
+        are skipped in the warm start.
+
+        Returns
+        -------
+        int
+            Offset of iteration.
+        """
+
+        if self._zcompWarmStart is None:
+            return 0
+
+        compSequence = self.getCompSequence()
+        isFullTerms = compSequence >= self.getNumOfZernikes()
+        if not np.any(isFullTerms):
+            return 0
+
+        return int(np.argmax(isFullTerms))
+
+    def getNumOfItrUsed(self):
+        """Get the number of outer-loop iterations that have been run.
+
+        Returns
+        -------
+        int
+            Number of outer-loop iterations.
+        """
+
+        return self.currentItr
+
+    def getZernikeMaskedFitter(self):
+        """Get the fitter of annular Zernike polynomials in the mask.
+
+        Returns
+        -------
+        ZernikeMaskedFitter
+            Fitter of annular Zernike polynomials in the mask.
+        """
+
+        return self._maskedFitter
+
     def setDebugLevel(self, debugLevel):
         """Set the debug level.
 
@@ -396,10 +631,90 @@ class Algorithm(object):
         else:
             dimToFit = fftDim
 
-        padDim = int(2 ** np.ceil(np.log2(dimToFit)))
+        if self._getSettingWithDefault("fastFftDimension", False):
+            # Keep the dimension to be even for the padding to be symmetric
+            padDim = next_fast_len(int(dimToFit), real=True)
+            while padDim % 2 != 0:
+                padDim = next_fast_len(padDim + 1, real=True)
+        else:
+            padDim = int(2 ** np.ceil(np.log2(dimToFit)))
 
         return padDim
 
+    def getFftBackendName(self):
+        """Get the backend name of FFT.
+
+        This is for the fast Fourier transform (FFT) solver only.
+
+        Returns
+        -------
+        str
+            Backend name of FFT. It is "numpy" if not set.
+        """
+
+        return self._getSettingWithDefault("fftBackend", "numpy")
+
+    def getNumOfFftWorkers(self):
+        """Get the number of workers (threads) used in FFT.
+
+        This is for the fast Fourier transform (FFT) solver only.
+
+        Returns
+        -------
+        int
+            Number of workers. It is 1 if not set.
+        """
+
+        return int(self._getSettingWithDefault("numOfFftWorkers", 1))
+
+    def getImageDtype(self):
+        """Get the data type of images in the compensation.
+
+        In the "float32" mode, the images, Jacobians, and interpolation in
+        the compensation are in float32 and the masks are in uint8. The
+        Zernike solve is still in float64.
+
+        Returns
+        -------
+        type
+            numpy.float64 or numpy.float32. It is numpy.float64 if not set.
+
+        Raises
+        ------
+        ValueError
+            The image data type is not supported.
+        """
+
+        imageDtype = self._getSettingWithDefault("imageDtype", "float64")
+        if imageDtype == "float64":
+            return np.float64
+        elif imageDtype == "float32":
+            return np.float32
+        else:
+            raise ValueError("The image data type (%s) is not supported." % imageDtype)
+
+    def _getSettingWithDefault(self, param, default):
+        """Get the setting value with the default value if the parameter does
+        not exist in the algorithm configuration file.
+
+        Parameters
+        ----------
+        param : str
+            Parameter name.
+        default : int, float, str, or bool
+            Default value.
+
+        Returns
+        -------
+        int, float, str, or bool
+            Parameter value.
+        """
+
+        try:
+            return self.algoParamFile.getSetting(param)
+        except ValueError:
+            return default
+
     def getSignalClipSequence(self):
         """Get the signal clip sequence.
 
@@ -536,19 +851,29 @@ class Algorithm(object):
             Optical model. It can be "paraxial", "onAxis", or "offAxis".
         tol : float, optional
             Tolerance of difference of coefficients of Zk polynomials compared
-            with the previours iteration. (the default is 1e-3.)
+            with the previours iteration. It is not used if the convergence
+            policy is set. (the default is 1e-3.)
         """
 
+        # The convergence policy is started in the iteration 0 of
+        # _singleItr()
+        convergencePolicy = self.getConvergencePolicy()
+
         # To have the iteration time initiated from global variable is to
         # distinguish the manually and automatically iteration processes.
+        # The warm start skips the ramp-up iterations in compSequence
         itr = self.currentItr
-        while itr <= self.getNumOfOuterItr():
+        while itr <= self.getNumOfOuterItr() - self._getItrOffset():
             stopItr = self._singleItr(I1, I2, model, tol)
 
             # Stop the iteration of outer loop if converged
             if stopItr:
                 break
 
+            # Stop the iteration of outer loop if the time is out
+            if (convergencePolicy is not None) and convergencePolicy.isTimeOut():
+                break
+
             itr += 1
 
     def nextItr(self, I1, I2, model, nItr=1):
@@ -610,7 +935,7 @@ class Algorithm(object):
             if I1.getImgInit() is None or I2.getImgInit() is None:
 
                 # Check the image dimension
-                if I1.getImg().shape != I2.getImg().shape:
+                if I1.getWorkingImg().shape != I2.getWorkingImg().shape:
                     print(
                         "Error: The intra and extra image stamps need to be of same size."
                     )
@@ -619,8 +944,10 @@ class Algorithm(object):
                 # Calculate the pupil mask (binary matrix) and related
                 # parameters
                 boundaryT = self.getBoundaryThickness()
-                I1.makeMask(self._inst, model, boundaryT, 1)
-                I2.makeMask(self._inst, model, boundaryT, 1)
+                imageDtype = self.getImageDtype()
+                maskDtype = np.uint8 if (imageDtype == np.float32) else int
+                I1.makeMask(self._inst, model, boundaryT, 1, maskDtype=maskDtype)
+                I2.makeMask(self._inst, model, boundaryT, 1, maskDtype=maskDtype)
                 self._makeMasterMask(I1, I2, self.getPoissonSolverName())
 
                 # Load the offAxis correction coefficients
@@ -634,13 +961,20 @@ class Algorithm(object):
                 I1.imageCoCenter(self._inst, debugLevel=self.debugLevel)
                 I2.imageCoCenter(self._inst, debugLevel=self.debugLevel)
 
-                # Update the self-initial image
+                # Update the self-initial image in the data type of
+                # compensation
+                I1.updateImage(I1.getWorkingImg().astype(imageDtype, copy=False))
+                I2.updateImage(I2.getWorkingImg().astype(imageDtype, copy=False))
                 I1.updateImgInit()
                 I2.updateImgInit()
 
-            # Initialize the variables used in the iteration.
-            self.zcomp = np.zeros(self.getNumOfZernikes())
-            self.zc = self.zcomp.copy()
+            # Initialize the variables used in the iteration. Seed the
+            # compensation with the warm start if any.
+            if self._zcompWarmStart is None:
+                self.zcomp = np.zeros(self.getNumOfZernikes())
+            else:
+                self.zcomp = self._zcompWarmStart.copy()
+            self.zc = np.zeros(self.getNumOfZernikes())
 
             dimOfDonut = self._inst.getDimOfDonutOnSensor()
             self.wcomp = np.zeros((dimOfDonut, dimOfDonut))
@@ -648,15 +982,24 @@ class Algorithm(object):
 
             self.caustic = False
 
+            # Start the convergence policy for the new solve, which is also
+            # the case of nextItr() without runIt()
+            convergencePolicy = self.getConvergencePolicy()
+            if convergencePolicy is not None:
+                convergencePolicy.start()
+
         # Rename this index (currentItr) for the simplification
         jj = self.currentItr
 
+        # Index in compSequence and signalClipSequence
+        itrOffset = self._getItrOffset()
+
         # Solve the transport of intensity equation (TIE)
         if not self.caustic:
 
             # Reset the images before the compensation
-            I1.updateImage(I1.getImgInit().copy())
-            I2.updateImage(I2.getImgInit().copy())
+            I1.resetImage()
+            I2.resetImage()
 
             if compMode == "zer":
 
@@ -667,7 +1010,7 @@ class Algorithm(object):
                 # sequence defined in compSequence
                 if jj != 0:
                     compSequence = self.getCompSequence()
-                    ztmp[int(compSequence[jj - 1]) :] = 0
+                    ztmp[int(compSequence[jj - 1 + itrOffset]) :] = 0
 
                 # Add partial feedback of residual estimated wavefront in Zk
                 self.zcomp = self.zcomp + ztmp * feedbackGain
@@ -688,19 +1031,24 @@ class Algorithm(object):
             I1, I2 = self._applyI1I2pMask(I1, I2)
 
             # Solve the Poisson's equation
-            self.zc, self.West = self._solvePoissonEq(I1, I2, jj)
+            self.zc, self.West = self._solvePoissonEq(I1, I2, jj + itrOffset)
 
             # Record/ calculate the Zk coefficient and wavefront
             if compMode == "zer":
                 self.converge[:, jj] = self.zcomp + self.zc
 
-                xoSensor, yoSensor = self._inst.getSensorCoorAnnular()
-                self.wcomp = self.West + ZernikeAnnularEval(
-                    np.concatenate(([0, 0, 0], self.zcomp[3:])),
-                    xoSensor,
-                    yoSensor,
-                    self.getObsOfZernikes(),
+                zBasis = self._basisCache.getBasis(
+                    self._inst, self.getNumOfZernikes(), self.getObsOfZernikes()
                 )
+                wcomp = np.tensordot(
+                    np.concatenate(([0, 0, 0], self.zcomp[3:])), zBasis, axes=1
+                )
+
+                # The wavefront is not defined outside of the annular aperture
+                xoSensor = self._inst.getSensorCoorAnnular()[0]
+                wcomp[np.isnan(xoSensor)] = np.nan
+
+                self.wcomp = self.West + wcomp
 
         else:
             # Once we run into caustic, stop here, results may be close to real
@@ -716,7 +1064,8 @@ class Algorithm(object):
         stopItr = False
 
         # Calculate the difference
-        if jj > 0:
+        convergencePolicy = self.getConvergencePolicy()
+        if (jj > 0) and (convergencePolicy is None):
             diffZk = (
                 np.sum(np.abs(self.converge[:, jj] - self.converge[:, jj - 1])) * 1e9
             )
@@ -725,6 +1074,15 @@ class Algorithm(object):
             if diffZk < tol:
                 stopItr = True
 
+        # Use the convergence policy after all the terms are compensated
+        # based on the compSequence
+        elif (jj > 0) and (
+            self.getCompSequence()[jj - 1 + itrOffset] >= self.getNumOfZernikes()
+        ):
+            stopItr = convergencePolicy.isConverged(
+                self.converge[:, jj - 1] * 1e9, self.converge[:, jj] * 1e9
+            )
+
         # Update the current iteration time
         self.currentItr += 1
 
@@ -782,65 +1140,31 @@ class Algorithm(object):
             sumclipSequence = self.getSignalClipSequence()
             cliplevel = sumclipSequence[iOutItr]
 
-            # Generate the v, u-coordinates on pupil plane
+            # FFT dimension and backend
             padDim = self.getFftDimension()
-            v, u = np.mgrid[
-                -0.5
-                / aperturePixelSize : 0.5
-                / aperturePixelSize : 1.0
-                / padDim
-                / aperturePixelSize,
-                -0.5
-                / aperturePixelSize : 0.5
-                / aperturePixelSize : 1.0
-                / padDim
-                / aperturePixelSize,
-            ]
+            fftBackend = self.getFftBackend()
 
             # Show the threshold and pupil coordinate information
             if self.debugLevel >= 3:
                 print("iOuter=%d, cliplevel=%4.2f" % (iOutItr, cliplevel))
-                print(v.shape)
-
-            # Calculate the const of fft:
-            # FT{Delta W} = -4*pi^2*(u^2+v^2) * FT{W}
-            u2v2 = -4 * (np.pi ** 2) * (u * u + v * v)
-
-            # Set origin to Inf to result in 0 at origin after filtering
-            ctrIdx = int(np.floor(padDim / 2.0))
-            u2v2[ctrIdx, ctrIdx] = np.inf
+                print((padDim, padDim))
 
             # Calculate the wavefront signal
             Sini = self._createSignal(I1, I2, cliplevel)
 
-            # Find the just-outside and just-inside indices of a ring in pixels
-            # This is for the use in setting dWdn = 0
+            # Get the operator to set dWdn = 0 around the boundary
             boundaryT = self.getBoundaryThickness()
-
-            struct = generate_binary_structure(2, 1)
-            struct = iterate_structure(struct, boundaryT)
-
-            ApringOut = np.logical_xor(
-                binary_dilation(self.pMask, structure=struct), self.pMask
-            ).astype(int)
-            ApringIn = np.logical_xor(
-                binary_erosion(self.pMask, structure=struct), self.pMask
-            ).astype(int)
-
-            bordery, borderx = np.nonzero(ApringOut)
+            borderIdx, avgOperator, emptyIdx = self._getBoundaryAvgOperator(boundaryT)
 
             # Put the signal in boundary (since there's no existing Sestimate,
             # S just equals self.S as the initial condition of SCF
             S = Sini.copy()
             for jj in range(self.getNumOfInnerItr()):
 
-                # Calculate FT{S}
-                SFFT = np.fft.fftshift(np.fft.fft2(np.fft.fftshift(S)))
-
                 # Calculate W by W=IFT{ FT{S}/(-4*pi^2*(u^2+v^2)) }
-                W = np.fft.fftshift(
-                    np.fft.irfft2(np.fft.fftshift(SFFT / u2v2), s=S.shape)
-                )
+                # The FFT of real signal is used and the inverse Laplacian
+                # kernel is cached in the backend.
+                W = fftBackend.solvePoissonEq(S, aperturePixelSize)
 
                 # Estimate the wavefront (includes zeroing offset & masking to
                 # the aperture size)
@@ -858,20 +1182,9 @@ class Algorithm(object):
 
                 # Do a 3x3 average around each border pixel, including only
                 # those pixels inside the aperture
-                for ii in range(len(borderx)):
-                    reg = West[
-                        borderx[ii] - boundaryT : borderx[ii] + boundaryT + 1,
-                        bordery[ii] - boundaryT : bordery[ii] + boundaryT + 1,
-                    ]
-
-                    intersectIdx = ApringIn[
-                        borderx[ii] - boundaryT : borderx[ii] + boundaryT + 1,
-                        bordery[ii] - boundaryT : bordery[ii] + boundaryT + 1,
-                    ]
-
-                    WestdWdn0[borderx[ii], bordery[ii]] = reg[
-                        np.nonzero(intersectIdx)
-                    ].mean()
+                borderValue = avgOperator.dot(West.ravel())
+                borderValue[emptyIdx] = np.nan
+                WestdWdn0.ravel()[borderIdx] = borderValue
 
                 # Take Laplacian to find sensor signal estimate (Delta W = S)
                 del2W = laplace(WestdWdn0) / dOmega
@@ -890,8 +1203,14 @@ class Algorithm(object):
             # Calculate the coefficient of normal/ annular Zernike polynomials
             if self.getCompensatorMode() == "zer":
                 xSensor, ySensor = self._inst.getSensorCoor()
-                zc = ZernikeMaskedFit(
-                    West, xSensor, ySensor, numTerms, self.pMask, zobsR
+                zc = self._maskedFitter.fit(
+                    West,
+                    xSensor,
+                    ySensor,
+                    numTerms,
+                    self.pMask,
+                    zobsR,
+                    key=self._maskedFitKey,
                 )
             else:
                 zc = np.zeros(numTerms)
@@ -904,50 +1223,29 @@ class Algorithm(object):
             # Calculate I0 and dI
             I0, dI = self._getdIandI(I1, I2)
 
-            # Get the x, y coordinate in mask. The element outside mask is 0.
-            xSensor, ySensor = self._inst.getSensorCoor()
-            xSensor = xSensor * self.cMask
-            ySensor = ySensor * self.cMask
-
-            # Create the F matrix and Zernike-related matrixes
-            F = np.zeros(numTerms)
-            dZidx = np.zeros((numTerms, dimOfDonut, dimOfDonut))
-            dZidy = dZidx.copy()
-
-            zcCol = np.zeros(numTerms)
-            for ii in range(int(numTerms)):
-
-                # Calculate the matrix for each Zk related component
-                # Set the specific Zk cofficient to be 1 for the calculation
-                zcCol[ii] = 1
-
-                F[ii] = (
-                    np.sum(dI * ZernikeAnnularEval(zcCol, xSensor, ySensor, zobsR))
-                    * dOmega
-                )
-                dZidx[ii, :, :] = ZernikeAnnularGrad(
-                    zcCol, xSensor, ySensor, zobsR, "dx"
-                )
-                dZidy[ii, :, :] = ZernikeAnnularGrad(
-                    zcCol, xSensor, ySensor, zobsR, "dy"
+            # Get the Zernike basis and its gradient in mask. The x, y
+            # coordinate outside mask is 0.
+            zBasis, dZidx, dZidy = [
+                self._basisCache.getMaskedBasis(
+                    self._inst, numTerms, zobsR, self.cMask, basisType=basisType
                 )
+                for basisType in ("eval", "dx", "dy")
+            ]
 
-                # Set the specific Zk cofficient back to 0 to avoid interfering
-                # other Zk's calculation
-                zcCol[ii] = 0
+            # Create the F matrix
+            F = zBasis.reshape(numTerms, -1).dot(dI.ravel()) * dOmega
 
             # Calculate Mij matrix, need to check the stability of integration
-            # and symmetry later
-            Mij = np.zeros([numTerms, numTerms])
-            for ii in range(numTerms):
-                for jj in range(numTerms):
-                    Mij[ii, jj] = np.sum(
-                        I0
-                        * (
-                            dZidx[ii, :, :].squeeze() * dZidx[jj, :, :].squeeze()
-                            + dZidy[ii, :, :].squeeze() * dZidy[jj, :, :].squeeze()
-                        )
-                    )
+            # later. Mij is the Gram matrix of the gradients of basis weighted
+            # by I0: Mij = sum(I0 * (dZi/dx * dZj/dx + dZi/dy * dZj/dy)).
+            dZi = np.concatenate(
+                (dZidx.reshape(numTerms, -1), dZidy.reshape(numTerms, -1)), axis=1
+            )
+            weight = np.tile(I0.ravel(), 2)
+            Mij = (dZi * weight).dot(dZi.T)
+
+            # Keep the symmetry that is lost in the rounding of matrix product
+            Mij = (Mij + Mij.T) / 2
             Mij = dOmega / (apertureDiameter / 2.0) ** 2 * Mij
 
             # Calculate dz
@@ -967,12 +1265,91 @@ class Algorithm(object):
 
             # Estimate the wavefront surface based on z4 - z22
             # z0 - z3 are set to be 0 instead
-            West = ZernikeAnnularEval(
-                np.concatenate(([0, 0, 0], zc[3:])), xSensor, ySensor, zobsR
-            )
+            West = np.tensordot(np.concatenate(([0, 0, 0], zc[3:])), zBasis, axes=1)
 
         return zc, West
 
+    def _getBoundaryAvgOperator(self, boundaryT):
+        """Get the operator to average the wavefront around the boundary of
+        pMask for "fft" to use.
+
+        Each border pixel just outside the pMask is set to be the average of
+        wavefront in the window of (2 * boundaryT + 1)^2 pixels, including
+        only those pixels just inside the pMask. The operator only depends on
+        pMask and boundaryT, and is reused in all the iterations.
+
+        Parameters
+        ----------
+        boundaryT : int
+            Extended boundary in pixel.
+
+        Returns
+        -------
+        numpy.ndarray
+            Flattened index of border pixels.
+        scipy.sparse.csr_matrix
+            Averaging operator with the shape of (number of border pixels,
+            number of pixels). The average is the product of operator and
+            flattened wavefront.
+        numpy.ndarray
+            Index of border pixels whose window has no pixel inside the
+            pMask. The average is not defined for them.
+        """
+
+        if (
+            self._boundaryAvgOperator is not None
+            and self._boundaryAvgOperator[0] == boundaryT
+        ):
+            return self._boundaryAvgOperator[1:]
+
+        # Find the just-outside and just-inside indices of a ring in pixels
+        # This is for the use in setting dWdn = 0
+        struct = generate_binary_structure(2, 1)
+        struct = iterate_structure(struct, boundaryT)
+
+        ApringOut = np.logical_xor(
+            binary_dilation(self.pMask, structure=struct), self.pMask
+        ).astype(int)
+        ApringIn = np.logical_xor(
+            binary_erosion(self.pMask, structure=struct), self.pMask
+        ).astype(int)
+
+        bordery, borderx = np.nonzero(ApringOut)
+
+        # Collect the flattened index of pixels in each window with the same
+        # slicing as the wavefront
+        pixelIdx = np.arange(self.pMask.size).reshape(self.pMask.shape)
+
+        borderIdx = np.zeros(len(borderx), dtype=int)
+        rows = [np.zeros(0, dtype=int)]
+        cols = [np.zeros(0, dtype=int)]
+        weights = [np.zeros(0)]
+        emptyIdx = []
+        for ii in range(len(borderx)):
+            winX = slice(borderx[ii] - boundaryT, borderx[ii] + boundaryT + 1)
+            winY = slice(bordery[ii] - boundaryT, bordery[ii] + boundaryT + 1)
+
+            regIdx = pixelIdx[winX, winY][np.nonzero(ApringIn[winX, winY])]
+
+            borderIdx[ii] = pixelIdx[borderx[ii], bordery[ii]]
+            if len(regIdx) == 0:
+                emptyIdx.append(ii)
+                continue
+
+            rows.append(np.full(len(regIdx), ii))
+            cols.append(regIdx)
+            weights.append(np.full(len(regIdx), 1.0 / len(regIdx)))
+
+        avgOperator = csr_matrix(
+            (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(borderx), self.pMask.size),
+        )
+        emptyIdx = np.array(emptyIdx, dtype=int)
+
+        self._boundaryAvgOperator = (boundaryT, borderIdx, avgOperator, emptyIdx)
+
+        return self._boundaryAvgOperator[1:]
+
     def _createSignal(self, I1, I2, cliplevel):
         """Calculate the wavefront singal for "fft" to use in solving the
         Poisson's equation.
@@ -1098,8 +1475,8 @@ class Algorithm(object):
         """
 
         # Check the condition of images
-        m1, n1 = I1.getImg().shape
-        m2, n2 = I2.getImg().shape
+        m1, n1 = I1.getWorkingImg().shape
+        m2, n2 = I2.getWorkingImg().shape
 
         if m1 != n1 or m2 != n2:
             raise Exception("Image is not square.")
@@ -1108,11 +1485,11 @@ class Algorithm(object):
             raise Exception("Images do not have the same size.")
 
         # Define I1
-        I1image = I1.getImg()
+        I1image = I1.getWorkingImg()
 
         # Rotate the image by 180 degree through rotating two times of 90
         # degree
-        I2image = np.rot90(I2.getImg(), k=2)
+        I2image = np.rot90(I2.getWorkingImg(), k=2)
 
         return I1image, I2image
 
@@ -1137,6 +1514,20 @@ class Algorithm(object):
         self.pMask = I1.getPaddedMask() * I2.getPaddedMask()
         self.cMask = I1.getNonPaddedMask() * I2.getNonPaddedMask()
 
+        # The boundary operator depends on pMask
+        self._boundaryAvgOperator = None
+
+        # The pseudo-inverse matrix of Zernike fitting depends on pMask and
+        # the sensor coordinate of instrument. Use the scalars as the key
+        # instead of hashing the arrays in each iteration.
+        self._maskVersion += 1
+        self._maskedFitKey = (
+            self._maskVersion,
+            self._inst.getInstFileDir(),
+            int(self._inst.getDimOfDonutOnSensor()),
+            float(self._inst.getSensorFactor()),
+        )
+
         # Change the dimension of image for fft to use
         if poissonSolver == "fft":
             padDim = self.getFftDimension()
@@ -1171,15 +1562,15 @@ class Algorithm(object):
         if I1.getFieldXY() != I2.getFieldXY():
 
             # Get the overlap region of image
-            I1.updateImage(I1.getImg() * self.pMask)
+            I1.updateImage(I1.getWorkingImg() * self.pMask)
 
             # Rotate the pMask by 180 degree through rotating two times of 90
             # degree because I2 has been rotated by 180 degree already.
-            I2.updateImage(I2.getImg() * np.rot90(self.pMask, 2))
+            I2.updateImage(I2.getWorkingImg() * np.rot90(self.pMask, 2))
 
             # Do the normalization of image.
-            I1.updateImage(I1.getImg() / np.sum(I1.getImg()))
-            I2.updateImage(I2.getImg() / np.sum(I2.getImg()))
+            I1.updateImage(I1.getWorkingImg() / np.sum(I1.getWorkingImg()))
+            I2.updateImage(I2.getWorkingImg() / np.sum(I2.getWorkingImg()))
 
         # Return the correct images. It is noted that there is no need of
         # vignetting correction.
@@ -1209,14 +1600,14 @@ class Algorithm(object):
         # inner loop, this attribute will exist.
         try:
             # Reset the images to the first beginning
-            I1.updateImage(I1.getImgInit().copy())
-            I2.updateImage(I2.getImgInit().copy())
+            I1.resetImage()
+            I2.resetImage()
 
             # Show the information of resetting image
             if self.debugLevel >= 3:
                 print("Resetting images in inside.")
 
-        except AttributeError:
+        except RuntimeError:
             # Show the information of no image0
             if self.debugLevel >= 3:
                 print("Image0 = None. This is the first time to run the code.")
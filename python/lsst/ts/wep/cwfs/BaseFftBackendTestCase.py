@@ -0,0 +1,117 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+
+class BaseFftBackendTestCase(object):
+    """Base class for the tests of FFT backend shared by all the
+    FftBackendDefault child classes."""
+
+    def createFftBackend(self):
+        """Create the FFT backend to test.
+
+        Returns
+        -------
+        Child class of FftBackendDefault
+            FFT backend.
+
+        Raises
+        ------
+        NotImplementedError
+            Child class should implement this.
+        """
+
+        raise NotImplementedError("Child class should implement this.")
+
+    def setUp(self):
+
+        self.fftBackend = self.createFftBackend()
+
+        self.padDim = 64
+        self.aperturePixelSize = 0.07
+        self.signal = np.random.RandomState(seed=1).rand(self.padDim, self.padDim)
+
+    def testRfft2AndIrfft2(self):
+
+        spectrum = self.fftBackend.rfft2(self.signal)
+        np.testing.assert_allclose(spectrum, np.fft.rfft2(self.signal), atol=1e-10)
+
+        signal = self.fftBackend.irfft2(spectrum, self.signal.shape)
+        np.testing.assert_allclose(signal, self.signal, atol=1e-12)
+
+    def testSolvePoissonEq(self):
+
+        wavefront = self.fftBackend.solvePoissonEq(self.signal, self.aperturePixelSize)
+
+        ans = self._solvePoissonEqWithFullFft(self.signal, self.aperturePixelSize)
+        np.testing.assert_allclose(wavefront, ans, rtol=0, atol=1e-12)
+
+    def testSolvePoissonEqConsecutively(self):
+
+        signalOther = np.random.RandomState(seed=2).rand(self.padDim, self.padDim)
+
+        wavefront = self.fftBackend.solvePoissonEq(self.signal, self.aperturePixelSize)
+        wavefrontOther = self.fftBackend.solvePoissonEq(
+            signalOther, self.aperturePixelSize
+        )
+
+        # The result is not overwritten by the next call
+        self.assertFalse(np.shares_memory(wavefront, wavefrontOther))
+        np.testing.assert_allclose(
+            wavefront,
+            self._solvePoissonEqWithFullFft(self.signal, self.aperturePixelSize),
+            rtol=0,
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(
+            wavefrontOther,
+            self._solvePoissonEqWithFullFft(signalOther, self.aperturePixelSize),
+            rtol=0,
+            atol=1e-12,
+        )
+
+    def testRfft2Consecutively(self):
+
+        spectrum = self.fftBackend.rfft2(self.signal)
+        spectrumCopy = spectrum.copy()
+
+        self.fftBackend.rfft2(np.zeros_like(self.signal))
+        np.testing.assert_array_equal(spectrum, spectrumCopy)
+
+    def _solvePoissonEqWithFullFft(self, S, aperturePixelSize):
+
+        # Solve the Poisson's equation with the shifted full FFT
+        padDim = S.shape[0]
+        step = 1.0 / padDim / aperturePixelSize
+        v, u = np.mgrid[
+            -0.5 / aperturePixelSize : 0.5 / aperturePixelSize : step,
+            -0.5 / aperturePixelSize : 0.5 / aperturePixelSize : step,
+        ]
+
+        u2v2 = -4 * (np.pi**2) * (u * u + v * v)
+        ctrIdx = int(np.floor(padDim / 2.0))
+        u2v2[ctrIdx, ctrIdx] = np.inf
+
+        SFFT = np.fft.fftshift(np.fft.fft2(np.fft.fftshift(S)))
+
+        return np.fft.fftshift(np.fft.irfft2(np.fft.fftshift(SFFT / u2v2), s=S.shape))
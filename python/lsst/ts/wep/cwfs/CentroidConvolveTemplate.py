@@ -23,6 +23,9 @@ import numpy as np
 from copy import copy
 from lsst.ts.wep.cwfs.CentroidDefault import CentroidDefault
 from lsst.ts.wep.cwfs.CentroidRandomWalk import CentroidRandomWalk
+from lsst.ts.wep.cwfs.LruCache import LruCache
+from lsst.ts.wep.cwfs.TemplateCorrelator import TemplateCorrelator
+from scipy.ndimage import maximum_filter
 from scipy.signal import correlate
 from sklearn.cluster import KMeans
 
@@ -35,6 +38,9 @@ class CentroidConvolveTemplate(CentroidDefault):
         super(CentroidConvolveTemplate, self).__init__()
         self._centRandomWalk = CentroidRandomWalk()
 
+        # Template correlators keyed by the template image
+        self._correlatorCache = LruCache(maxSize=4)
+
     def getImgBinary(self, imgDonut):
         """Get the binary image.
 
@@ -51,6 +57,35 @@ class CentroidConvolveTemplate(CentroidDefault):
 
         return self._centRandomWalk.getImgBinary(imgDonut)
 
+    def getTemplateCorrelator(self, templateImgBinary):
+        """Get the template correlator of binary template image.
+
+        The correlator is cached by the template image, so the spectrum of
+        template is reused for all the images correlated with the same
+        template.
+
+        Parameters
+        ----------
+        templateImgBinary : numpy.ndarray
+            Binary image of template donut.
+
+        Returns
+        -------
+        TemplateCorrelator
+            Template correlator.
+        """
+
+        templateImgBinary = np.asarray(templateImgBinary)
+        key = (
+            templateImgBinary.shape,
+            templateImgBinary.dtype.str,
+            templateImgBinary.tobytes(),
+        )
+
+        return self._correlatorCache.getOrCreate(
+            key, lambda: TemplateCorrelator(templateImgBinary)
+        )
+
     def getCenterAndR(self, imgDonut, templateDonut=None, peakThreshold=0.95):
         """Get the centroid data and effective weighting radius.
 
@@ -80,8 +115,9 @@ class CentroidConvolveTemplate(CentroidDefault):
 
         imgBinary = self.getImgBinary(imgDonut)
 
+        # The image is correlated with itself if there is no template
         if templateDonut is None:
-            templateBinary = copy(imgBinary)
+            templateBinary = None
         else:
             templateBinary = self.getImgBinary(templateDonut)
 
@@ -128,7 +164,13 @@ class CentroidConvolveTemplate(CentroidDefault):
         return x[0], y[0], radius
 
     def getCenterAndRfromTemplateConv(
-        self, imageBinary, templateImgBinary=None, nDonuts=1, peakThreshold=0.95
+        self,
+        imageBinary,
+        templateImgBinary=None,
+        nDonuts=1,
+        peakThreshold=0.95,
+        peakFindMethod="maxFilter",
+        minPeakDistance=None,
     ):
         """
         Get the centers of the donuts by convolving a binary template image
@@ -139,6 +181,15 @@ class CentroidConvolveTemplate(CentroidDefault):
         the peaks of any stars in the image should have about the same
         brightness if the template is correct.
 
+        The peaks are found by the maximum filter and non-maximum suppression
+        in the "maxFilter" method, which falls back to the K-means clustering
+        if less than nDonuts peaks are found. The "kmeans" method clusters all
+        the pixels above the threshold by the K-means algorithm.
+
+        The spectrum of template is cached by the template image. The binary
+        image can be a whole CCD image to find all the donuts on it with a
+        single correlation.
+
         Parameters
         ----------
         imageBinary: numpy.ndarray
@@ -155,6 +206,13 @@ class CentroidConvolveTemplate(CentroidDefault):
             The code then sets all pixels with a value below this to 0 before
             running the K-means algorithm to find peaks that represent possible
             donut locations. (The default is 0.95)
+        peakFindMethod: str, optional
+            Method to find the peaks in the convolved image. It can be
+            "maxFilter" or "kmeans". (The default is "maxFilter")
+        minPeakDistance: None or int, optional
+            Minimum distance between the peaks in pixel used in the
+            "maxFilter" method. If set to None then the effective weighting
+            radius of the template is used. (The default is None)
 
         Returns
         -------
@@ -164,17 +222,122 @@ class CentroidConvolveTemplate(CentroidDefault):
             Y pixel coordinates for donut centroid.
         float
             Effective weighting radius calculated using the template image.
-        """
 
-        if templateImgBinary is None:
-            templateImgBinary = copy(imageBinary)
+        Raises
+        ------
+        ValueError
+            The peak find method is not supported.
+        """
 
         nDonutsAssertStr = "nDonuts must be an integer >= 1"
         assert (nDonuts >= 1) & (type(nDonuts) is int), nDonutsAssertStr
 
+        if peakFindMethod not in ("maxFilter", "kmeans"):
+            raise ValueError("The %s is not supported." % peakFindMethod)
+
         # We set the mode to be "same" because we need to return the same
-        # size image to the code.
-        tempConvolve = correlate(imageBinary, templateImgBinary, mode="same")
+        # size image to the code. The spectrum of template is cached and
+        # reused for all the images correlated with the same template.
+        if templateImgBinary is None:
+            templateImgBinary = copy(imageBinary)
+            tempConvolve = correlate(imageBinary, templateImgBinary, mode="same")
+        else:
+            tempConvolve = self.getTemplateCorrelator(templateImgBinary).correlate(
+                imageBinary
+            )
+
+        # Get the radius of the donut from the template image
+        radius = np.sqrt(np.sum(templateImgBinary) / np.pi)
+
+        if peakFindMethod == "maxFilter":
+            if minPeakDistance is None:
+                minPeakDistance = max(int(radius), 1)
+
+            centX, centY = self._findPeaksByMaxFilter(
+                tempConvolve, nDonuts, peakThreshold, minPeakDistance
+            )
+            if len(centX) == nDonuts:
+                return centX, centY, radius
+
+        centX, centY = self._findPeaksByKMeans(tempConvolve, nDonuts, peakThreshold)
+
+        return centX, centY, radius
+
+    def _findPeaksByMaxFilter(
+        self, tempConvolve, nDonuts, peakThreshold, minPeakDistance
+    ):
+        """Find the peaks in the convolved image by the maximum filter and
+        non-maximum suppression.
+
+        Parameters
+        ----------
+        tempConvolve : numpy.ndarray
+            Convolved image.
+        nDonuts : int
+            Number of donuts there should be in the image.
+        peakThreshold : float
+            Fraction of the highest pixel value in the convolved image. Only
+            the pixels above this are the candidates of peak.
+        minPeakDistance : int
+            Minimum distance between the peaks in pixel.
+
+        Returns
+        -------
+        list
+            X pixel coordinates (row) of peaks. The number of peaks is less
+            than nDonuts if there are not enough separated peaks.
+        list
+            Y pixel coordinates (column) of peaks.
+        """
+
+        # Local maxima above the threshold
+        localMax = maximum_filter(
+            tempConvolve, size=2 * minPeakDistance + 1, mode="nearest"
+        )
+        isPeak = (tempConvolve == localMax) & (
+            tempConvolve > peakThreshold * np.max(tempConvolve)
+        )
+        nx, ny = np.nonzero(isPeak)
+
+        # Take the brightest candidates first. The plateau of local maxima is
+        # suppressed by the distance to the peaks taken already.
+        order = np.argsort(-tempConvolve[nx, ny], kind="stable")
+        nx = nx[order]
+        ny = ny[order]
+
+        centX = []
+        centY = []
+        while (len(centX) < nDonuts) and (len(nx) != 0):
+            centX.append(nx[0])
+            centY.append(ny[0])
+
+            isFar = np.hypot(nx - nx[0], ny - ny[0]) > minPeakDistance
+            nx = nx[isFar]
+            ny = ny[isFar]
+
+        return centX, centY
+
+    def _findPeaksByKMeans(self, tempConvolve, nDonuts, peakThreshold):
+        """Find the peaks in the convolved image by the K-means clustering
+        of the pixels above the threshold.
+
+        Parameters
+        ----------
+        tempConvolve : numpy.ndarray
+            Convolved image.
+        nDonuts : int
+            Number of donuts there should be in the image.
+        peakThreshold : float
+            Fraction of the highest pixel value in the convolved image. Only
+            the pixels above this are clustered.
+
+        Returns
+        -------
+        list
+            X pixel coordinates (row) of peaks.
+        list
+            Y pixel coordinates (column) of peaks.
+        """
 
         # Then we rank the pixel values keeping only those above
         # some fraction of the highest value.
@@ -183,7 +346,7 @@ class CentroidConvolveTemplate(CentroidDefault):
             np.where(tempConvolve.flatten() > peakThreshold * np.max(tempConvolve))[0]
         )
         rankedConvolveCutoff = rankedConvolve[:cutoff]
-        nx, ny = np.unravel_index(rankedConvolveCutoff, np.shape(imageBinary))
+        nx, ny = np.unravel_index(rankedConvolveCutoff, np.shape(tempConvolve))
 
         # Then to find peaks in the image we use K-Means with the
         # specified number of donuts
@@ -195,12 +358,9 @@ class CentroidConvolveTemplate(CentroidDefault):
         centY = []
         for labelNum in range(nDonuts):
             nxLabel, nyLabel = np.unravel_index(
-                rankedConvolveCutoff[labels == labelNum][0], np.shape(imageBinary)
+                rankedConvolveCutoff[labels == labelNum][0], np.shape(tempConvolve)
             )
             centX.append(nxLabel)
             centY.append(nyLabel)
 
-        # Get the radius of the donut from the template image
-        radius = np.sqrt(np.sum(templateImgBinary) / np.pi)
-
-        return centX, centY, radius
+        return centX, centY
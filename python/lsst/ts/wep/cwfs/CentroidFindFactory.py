@@ -23,6 +23,7 @@ from lsst.ts.wep.Utility import CentroidFindType
 from lsst.ts.wep.cwfs.CentroidRandomWalk import CentroidRandomWalk
 from lsst.ts.wep.cwfs.CentroidOtsu import CentroidOtsu
 from lsst.ts.wep.cwfs.CentroidConvolveTemplate import CentroidConvolveTemplate
+from lsst.ts.wep.cwfs.CentroidHistogramValley import CentroidHistogramValley
 
 
 class CentroidFindFactory(object):
@@ -55,5 +56,7 @@ class CentroidFindFactory(object):
             return CentroidOtsu()
         elif centroidFindType == CentroidFindType.ConvolveTemplate:
             return CentroidConvolveTemplate()
+        elif centroidFindType == CentroidFindType.HistogramValley:
+            return CentroidHistogramValley()
         else:
             raise ValueError("The %s is not supported." % centroidFindType)
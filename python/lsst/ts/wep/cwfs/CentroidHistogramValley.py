@@ -0,0 +1,217 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.CentroidDefault import CentroidDefault
+
+
+class CentroidHistogramValley(CentroidDefault):
+    def __init__(self):
+        """CentroidDefault child class to get the centroid of donut by the
+        deterministic search of valley in the smoothed intensity histogram.
+
+        This follows the same start points, range, and closing of the second
+        peak as CentroidRandomWalk, but replaces the random walk with the
+        descent along the smoothed histogram. The global random state is not
+        used."""
+
+        # Minimum effective signal
+        self.minEffSignal = 1e-8
+
+        # Number of bins in the histogram
+        self.numOfBins = 256
+
+        # Half width of the moving average to smooth the histogram in bins
+        self.smoothHalfWidth = 5
+
+        # Ratio of the smoothed count to the lowest count on the way down
+        # to stop the descent
+        self.barrierRatio = 3.0
+
+    def getImgBinary(self, imgDonut):
+        """Get the binary image.
+
+        Parameters
+        ----------
+        imgDonut : numpy.ndarray
+            Donut image to do the analysis.
+
+        Returns
+        -------
+        numpy.ndarray [int]
+            Binary image of donut.
+        """
+
+        threshold = self._calcThreshold(imgDonut)
+        imgBinary = (imgDonut > max(self.minEffSignal, threshold)).astype(int)
+
+        return imgBinary
+
+    def _calcThreshold(self, imgDonut):
+        """Calculate the threshold to decide the effective signal.
+
+        Parameters
+        ----------
+        imgDonut : numpy.ndarray
+            Donut image to do the analysis.
+
+        Returns
+        -------
+        float
+            Threshold.
+        """
+
+        # Parameters to decide the signal of donut
+        slide = int(0.1 * self.numOfBins)
+
+        # Generate the histogram of intensity
+        hist, binEdges = np.histogram(imgDonut.ravel(), bins=self.numOfBins)
+        histSmooth = self._smoothHist(hist)
+
+        # Start points of the search. This is the same as the random walk.
+        start = int(self.numOfBins / 2.1)
+        end = slide + 25
+
+        foundvalley = False
+        for startPoint in range(start, end, -15):
+
+            # Check the condition of start index
+            if (startPoint <= 0) or (max(hist[startPoint - 1 :]) == 0):
+                continue
+
+            # The index of bin is 1-based as the random walk
+            minind = self._descendToValley(hist, histSmooth, startPoint)
+
+            # Find the signal of donut in histogram
+            if minind >= slide:
+                foundvalley = True
+                break
+
+        if foundvalley:
+            minind = self._closeSecondPeak(hist, minind, slide)
+
+        # If no valley (signal) is found for the noise, use the value at start
+        # index of histogram to be the threshold.
+        else:
+            minind = start
+
+        # Get the threshold value of donut
+        threshold = binEdges[int(minind)]
+
+        return threshold
+
+    def _smoothHist(self, hist):
+        """Smooth the histogram by the moving average.
+
+        Parameters
+        ----------
+        hist : numpy.ndarray
+            Histogram of intensity.
+
+        Returns
+        -------
+        numpy.ndarray
+            Smoothed histogram. The bins close to the boundary are averaged
+            over the available bins only.
+        """
+
+        kernel = np.ones(2 * self.smoothHalfWidth + 1)
+        histSum = np.convolve(hist, kernel, mode="same")
+        numOfBinsInSum = np.convolve(np.ones(len(hist)), kernel, mode="same")
+
+        return histSum / numOfBinsInSum
+
+    def _descendToValley(self, hist, histSmooth, startPoint):
+        """Descend from the start point to the valley toward the low
+        intensity.
+
+        The descent stops at the first bin whose smoothed count is higher than
+        barrierRatio times the lowest smoothed count on the way down (plus one
+        count to suppress the shot noise of empty bins). The valley is the
+        lowest bin of the minimum before that barrier.
+
+        Parameters
+        ----------
+        hist : numpy.ndarray
+            Histogram of intensity.
+        histSmooth : numpy.ndarray
+            Smoothed histogram of intensity.
+        startPoint : int
+            1-based index of bin to start the descent.
+
+        Returns
+        -------
+        int
+            1-based index of bin of the valley.
+        """
+
+        # Counts from the start point toward the low intensity
+        countDown = histSmooth[:startPoint][::-1]
+        lowestCount = np.minimum.accumulate(countDown)
+
+        barrier = np.flatnonzero(countDown > self.barrierRatio * (lowestCount + 1))
+        numOfSteps = barrier[0] if (len(barrier) != 0) else len(countDown)
+
+        # Take the lowest bin if there are multiple minima
+        basin = countDown[:numOfSteps]
+        step = numOfSteps - 1 - int(np.argmin(basin[::-1]))
+        minind = startPoint - step
+
+        # Find the index of bin that the count is not zero
+        nonZero = np.flatnonzero(hist[:minind])
+        if len(nonZero) != 0:
+            minind = int(nonZero[-1]) + 1
+
+        return minind
+
+    def _closeSecondPeak(self, hist, minind, slide):
+        """Try to close the second peak. This is the same as the random walk.
+
+        Parameters
+        ----------
+        hist : numpy.ndarray
+            Histogram of intensity.
+        minind : int
+            1-based index of bin of the valley.
+        slide : int
+            Lowest index of bin to search.
+
+        Returns
+        -------
+        int
+            1-based index of bin of the threshold.
+        """
+
+        tolerance = 4 * np.median(hist[len(hist) - 20 :])
+
+        # Move toward the low intensity while the difference to the bin five
+        # bins below stays within the tolerance
+        index = np.arange(slide, minind + 1)
+        isFlat = np.abs(hist[index - 5] - hist[index]) < tolerance
+
+        # Find the highest bin from minind that breaks the flatness
+        notFlat = np.flatnonzero(~isFlat)
+        if len(notFlat) == 0:
+            return slide - 1
+        else:
+            return int(index[notFlat[-1]])
@@ -19,28 +19,54 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import os
-import re
+import hashlib
 import numpy as np
 
-from scipy.ndimage import generate_binary_structure, iterate_structure
+from scipy.ndimage import generate_binary_structure, iterate_structure, map_coordinates
 from scipy.ndimage.morphology import binary_dilation, binary_erosion
 from scipy.interpolate import RectBivariateSpline
-from scipy.signal import correlate
+from scipy.fft import next_fast_len
 
-from lsst.ts.wep.ParamReader import ParamReader
 from lsst.ts.wep.cwfs.Tool import (
-    padArray,
-    extractArray,
     ZernikeAnnularGrad,
+    ZernikeAnnularGradBasis,
     ZernikeAnnularJacobian,
+    ZernikeAnnularJacobianBasis,
 )
 from lsst.ts.wep.cwfs import mathcwfs
 from lsst.ts.wep.cwfs.Image import Image
+from lsst.ts.wep.cwfs.LruCache import LruCache
+from lsst.ts.wep.cwfs.OffAxisCoeffStore import OffAxisCoeffStore
 from lsst.ts.wep.Utility import DefocalType, CentroidFindType
 
 
 class CompensableImage(object):
+
+    # Geometric mapping between the pupil and focal plane shared by all the
+    # compensable images. See getGeometricMapping().
+    _geometricMappingCache = LruCache(maxSize=16)
+
+    # Coefficients of off-axis correction shared by all the compensable images
+    _offAxisCoeffStore = OffAxisCoeffStore()
+
+    # Masks shared by all the compensable images. See makeMask().
+    _maskCache = LruCache(maxSize=32)
+
+    # Number of decimals in degree to round the field position of mask
+    MASK_FIELD_DECIMALS = 3
+
+    # Tolerance of wavefront change in meter to reuse the support of projected
+    # image in compensate()
+    PROJ_SUPPORT_ZK_TOL_IN_M = 1e-9
+
+    # Structuring element to close the support of projected image
+    PROJ_SUPPORT_STRUCT = binary_dilation(
+        iterate_structure(generate_binary_structure(2, 1), 4),
+        structure=generate_binary_structure(2, 1),
+        iterations=2,
+    )
+    PROJ_SUPPORT_STRUCT.setflags(write=False)
+
     def __init__(self, centroidFindType=CentroidFindType.RandomWalk):
         """Instantiate the class of CompensableImage.
 
@@ -76,6 +102,16 @@ class CompensableImage(object):
         # Non-padded mask corresponding to aperture
         self.cMask = np.array([], dtype=int)
 
+        # Support of projected image in the last compensation:
+        # (key, zcCol, support)
+        self._projSupport = None
+
+        # FFT of template in the last centering: (key, FFT)
+        self._templateFft = None
+
+        # Working buffer of image reused by resetImage() and compensate()
+        self._imgBuffer = None
+
     def getDefocalType(self):
         """Get the defocal type.
 
@@ -101,12 +137,31 @@ class CompensableImage(object):
     def getImg(self):
         """Get the image.
 
+        The returned image is a copy, which is not changed by the following
+        resetImage() or compensate().
+
         Returns
         -------
         numpy.ndarray
             Image.
         """
 
+        return self.getWorkingImg().copy()
+
+    def getWorkingImg(self):
+        """Get the working image without the copy.
+
+        Warning: the image after resetImage() or compensate() is held in a
+        working buffer, which is overwritten in place by the next call of
+        them. Use getImg() if the image needs to be retained. A new buffer is
+        allocated after setImg().
+
+        Returns
+        -------
+        numpy.ndarray
+            Working image.
+        """
+
         return self._image.getImg()
 
     def getImgSizeInPix(self):
@@ -118,7 +173,7 @@ class CompensableImage(object):
             Image size in pixel.
         """
 
-        return self.getImg().shape[0]
+        return self.getWorkingImg().shape[0]
 
     def getOffAxisCoeff(self):
         """Get the coefficients to do the off-axis correction.
@@ -226,7 +281,7 @@ class CompensableImage(object):
             Number of pixels cannot be odd numbers.
         """
 
-        img = self.getImg()
+        img = self.getWorkingImg()
         if img.shape[0] != img.shape[1]:
             raise RuntimeError("Only square image stamps are accepted.")
         elif img.shape[0] % 2 == 1:
@@ -246,6 +301,12 @@ class CompensableImage(object):
         self.pMask = np.array([], dtype=int)
         self.cMask = np.array([], dtype=int)
 
+        self._projSupport = None
+
+        # Drop the working buffer instead of overwriting it, because the
+        # image in it might be retained by the caller.
+        self._imgBuffer = None
+
     def updateImage(self, image):
         """Update the image of donut.
 
@@ -265,7 +326,55 @@ class CompensableImage(object):
         """
 
         # Update the initial image for future use
-        self.image0 = self.getImg().copy()
+        self.image0 = self.getWorkingImg().copy()
+
+    def resetImage(self):
+        """Reset the image to the initial image (image0).
+
+        The initial image is copied into the working buffer, which is
+        allocated once for each stamp size and reused in place afterwards.
+
+        Raises
+        ------
+        RuntimeError
+            No initial image to reset.
+        """
+
+        if self.image0 is None:
+            raise RuntimeError("No initial image to reset. Call updateImgInit() first.")
+
+        imgBuffer = self._getImgBuffer(self.image0.shape, self.image0.dtype)
+        np.copyto(imgBuffer, self.image0)
+        self.updateImage(imgBuffer)
+
+    def _getImgBuffer(self, shape, dtype):
+        """Get the working buffer of image.
+
+        The buffer is reallocated only if the shape or data type changes.
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of buffer.
+        dtype : numpy.dtype
+            Data type of buffer.
+
+        Returns
+        -------
+        numpy.ndarray
+            Working buffer of image.
+        """
+
+        imgBuffer = self._imgBuffer
+        if (
+            imgBuffer is None
+            or imgBuffer.shape != tuple(shape)
+            or imgBuffer.dtype != dtype
+        ):
+            imgBuffer = np.empty(shape, dtype=dtype)
+            self._imgBuffer = imgBuffer
+
+        return imgBuffer
 
     def imageCoCenter(self, inst, fov=3.5, debugLevel=0):
         """Shift the weighting center of donut to the center of reference
@@ -322,10 +431,10 @@ class CompensableImage(object):
 
         # Shift the image to the projected position
         self.updateImage(
-            np.roll(self.getImg(), int(np.round(stampCentery1 - y1)), axis=0)
+            np.roll(self.getWorkingImg(), int(np.round(stampCentery1 - y1)), axis=0)
         )
         self.updateImage(
-            np.roll(self.getImg(), int(np.round(stampCenterx1 - x1)), axis=1)
+            np.roll(self.getWorkingImg(), int(np.round(stampCenterx1 - x1)), axis=1)
         )
 
     def _getFieldDistFromOrigin(self, fieldX=None, fieldY=None, minDist=1e-8):
@@ -333,10 +442,10 @@ class CompensableImage(object):
 
         Parameters
         ----------
-        fieldX : float, optional
+        fieldX : float or numpy.ndarray, optional
             Field x in degree. If the input is None, the value of self.fieldX
             will be used. (the default is None.)
-        fieldY : float, optional
+        fieldY : float or numpy.ndarray, optional
             Field y in degree. If the input is None, the value of self.fieldY
             will be used. (the default is None.)
         minDist : float, optional
@@ -345,7 +454,7 @@ class CompensableImage(object):
 
         Returns
         -------
-        float
+        float or numpy.ndarray
             Field distance from the origin.
         """
 
@@ -356,14 +465,14 @@ class CompensableImage(object):
             fieldY = self.fieldY
 
         fieldDist = np.hypot(fieldX, fieldY)
-        if fieldDist == 0:
-            fieldDist = minDist
 
-        return fieldDist
+        return np.where(fieldDist == 0, minDist, fieldDist)[()]
 
     def compensate(self, inst, algo, zcCol, model):
         """Calculate the image compensated from the affection of wavefront.
 
+        The image in float32 is compensated in float32.
+
         Parameters
         ----------
         inst : Instrument
@@ -392,7 +501,7 @@ class CompensableImage(object):
             )
 
         # Dimension of image
-        sm, sn = self.getImg().shape
+        sm, sn = self.getWorkingImg().shape
 
         # Dimenstion of projected image on focal plane
         projSamples = sm
@@ -407,34 +516,30 @@ class CompensableImage(object):
         lutx = lutx / (projSamples / 2 / sensorFactor)
         luty = luty / (projSamples / 2 / sensorFactor)
 
-        # Set up the mapping
+        # Set up the mapping. The key of geometric mapping is also the key of
+        # support of projection.
+        geoMappingKey = self._getGeometricMappingKey(inst, algo, projSamples, model)
         lutxp, lutyp, J = self._aperture2image(
-            inst, algo, zcCol, lutx, luty, projSamples, model
+            inst,
+            algo,
+            zcCol,
+            lutx,
+            luty,
+            projSamples,
+            model,
+            geoMappingKey=geoMappingKey,
         )
 
-        show_lutxyp = self._showProjection(
-            lutxp, lutyp, sensorFactor, projSamples, raytrace=False
+        show_lutxyp = self._getProjSupport(
+            inst, zcCol, lutxp, lutyp, projSamples, geoMappingKey
         )
-        if np.all(show_lutxyp <= 0):
+        if show_lutxyp is None:
             self.caustic = True
             return
 
-        # Extend the dimension of image by 20 pixel in x and y direction
-        show_lutxyp = padArray(show_lutxyp, projSamples + 20)
-
-        # Get the binary matrix of image on pupil plane if raytrace=False
-        struct0 = generate_binary_structure(2, 1)
-        struct = iterate_structure(struct0, 4)
-        struct = binary_dilation(struct, structure=struct0, iterations=2).astype(int)
-        show_lutxyp = binary_dilation(show_lutxyp, structure=struct)
-        show_lutxyp = binary_erosion(show_lutxyp, structure=struct)
-
-        # Extract the region from the center of image and get the original one
-        show_lutxyp = extractArray(show_lutxyp, projSamples)
-
         # Recenter the image
         imgRecenter = self.centerOnProjection(
-            self.getImg(), show_lutxyp.astype(float), window=20
+            self.getWorkingImg(), show_lutxyp.astype(float), window=20
         )
         self.updateImage(imgRecenter)
 
@@ -451,42 +556,841 @@ class CompensableImage(object):
         lutxp[np.isnan(lutxp)] = 0
         lutyp[np.isnan(lutyp)] = 0
 
-        # Construct the function for interpolation
-        ip = RectBivariateSpline(yp[:, 0], xp[0, :], self.getImg(), kx=1, ky=1)
+        if self.getWorkingImg().dtype == np.float32:
+            # Bilinear interpolation in float32. The out-of-range points take
+            # the values at the boundary as the spline does.
+            scale = sm / 2 / sensorFactor
+            lutIp = map_coordinates(
+                self.getWorkingImg(),
+                [
+                    (lutyp * scale + (sm / 2 - 0.5)).astype(np.float32),
+                    (lutxp * scale + (sm / 2 - 0.5)).astype(np.float32),
+                ],
+                order=1,
+                mode="nearest",
+                output=np.float32,
+            )
+            J = J.astype(np.float32)
 
-        # Construct the projected image by the interpolation
-        lutIp = np.zeros(lutxp.shape[0] * lutxp.shape[1])
-        for ii, (xx, yy) in enumerate(zip(lutxp.ravel(), lutyp.ravel())):
-            lutIp[ii] = ip(yy, xx)
-        lutIp = lutIp.reshape(lutxp.shape)
+        else:
+            # Construct the function for interpolation
+            ip = RectBivariateSpline(
+                yp[:, 0], xp[0, :], self.getWorkingImg(), kx=1, ky=1
+            )
+
+            # Construct the projected image by the interpolation. All the
+            # points are evaluated in a single call.
+            lutIp = ip.ev(lutyp, lutxp)
 
         # Calaculate the image on focal plane with compensation based on flux
         # conservation
         # I(x, y)/I'(x', y') = J = (dx'/dx)*(dy'/dy) - (dx'/dy)*(dy'/dx)
-        self.updateImage(lutIp * J)
+        # The recentered image is a new array, so the working buffer is free
+        # to hold the result.
+        imgBuffer = self._getImgBuffer(lutIp.shape, np.result_type(lutIp, J))
+        self.updateImage(np.multiply(lutIp, J, out=imgBuffer))
+
+        if self.defocalType == DefocalType.Extra:
+            self.updateImage(np.rot90(self.getWorkingImg(), k=2))
+
+        # Put NaN to be 0
+        imgCompensate = self.getWorkingImg()
+        imgCompensate[np.isnan(imgCompensate)] = 0
+
+        # Check the compensated image has the problem or not.
+        # The negative value means the over-compensation from wavefront error
+        if np.any(imgCompensate < 0) and np.all(self.image0 >= 0):
+            print(
+                "WARNING: negative scale parameter, image is within caustic, zcCol (in um)=\n"
+            )
+            self.caustic = True
+
+        # Put the overcompensated part to be 0
+        imgCompensate[imgCompensate < 0] = 0
+        self.updateImage(imgCompensate)
+
+    @classmethod
+    def compensateStack(
+        cls, inst, algo, imgStack, fieldXYList, defocalType, zcColStack, model
+    ):
+        """Calculate the images compensated from the affection of wavefront
+        for a stack of donuts with the same defocal type.
+
+        The per-pixel calculation is done on the 3-D stack: the geometric
+        mapping of "offAxis" model over the stacked field positions (the
+        mapping of other models is shared by all the donuts), the Zernike
+        terms, the support of projection closed by a structuring element
+        with the depth of 1, the recentering by the batched FFT, and the
+        interpolation. The only loops over the donuts are on the scalars:
+        the keys of geometric mapping and the entries of them in the cache.
+        Each donut gives the same result as compensate() within the
+        floating-point precision.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        imgStack : numpy.ndarray
+            Stack of donut images with the shape of (nDonuts, H, W), where
+            H = W. The stack in float32 is compensated in float32.
+        fieldXYList : list[tuple]
+            Position of each donut on the focal plane in degree
+            (field x, field y).
+        defocalType : enum 'DefocalType'
+            Defocal type of images.
+        zcColStack : numpy.ndarray
+            Coefficients of wavefront of each donut with the shape of
+            (nDonuts, numTerms). The coefficients with the shape of
+            (numTerms,) are used for all the donuts.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+
+        Returns
+        -------
+        numpy.ndarray
+            Stack of compensated (projected) images.
+        numpy.ndarray
+            Stack of Jacobian matrix between the pupil and focal plane.
+        numpy.ndarray[bool]
+            The image is within the caustic or not. The image in the caustic
+            before the projection is kept as it is.
+
+        Raises
+        ------
+        ValueError
+            The shape of image stack is not (nDonuts, n, n).
+        ValueError
+            The image stack is empty.
+        ValueError
+            The number of field positions is not nDonuts.
+        ValueError
+            The shape of zcColStack is not (nDonuts, numTerms).
+        """
+
+        # The images in float32 are compensated in float32
+        imgStack = np.array(imgStack)
+        imgDtype = np.float32 if (imgStack.dtype == np.float32) else float
+        imgStack = imgStack.astype(imgDtype, copy=False)
+        if (imgStack.ndim != 3) or (imgStack.shape[1] != imgStack.shape[2]):
+            raise ValueError("The shape of image stack should be (nDonuts, n, n).")
+
+        nDonuts, sm = imgStack.shape[0:2]
+        if nDonuts == 0:
+            raise ValueError("The image stack should have at least one donut.")
+
+        if len(fieldXYList) != nDonuts:
+            raise ValueError("The number of field positions should be %d." % nDonuts)
+
+        numTerms = algo.getNumOfZernikes()
+        try:
+            zcColStack = np.broadcast_to(
+                np.asarray(zcColStack, dtype=float), (nDonuts, numTerms)
+            )
+        except ValueError:
+            raise ValueError(
+                "The shape of zcColStack should be (%d, %d)." % (nDonuts, numTerms)
+            )
+
+        # Dimenstion of projected image on focal plane
+        projSamples = sm
+
+        # Let us create a look-up table for x -> xp first.
+        luty, lutx = np.mgrid[
+            -(projSamples / 2 - 0.5) : (projSamples / 2 + 0.5),
+            -(projSamples / 2 - 0.5) : (projSamples / 2 + 0.5),
+        ]
+
+        sensorFactor = inst.getSensorFactor()
+        lutx = lutx / (projSamples / 2 / sensorFactor)
+        luty = luty / (projSamples / 2 / sensorFactor)
+
+        # The image only holds the parameters shared by all the donuts
+        wfsImg = cls()
+        wfsImg.setImg(fieldXYList[0], defocalType, image=imgStack[0])
+
+        geoMapping = wfsImg._getGeometricMappingStack(
+            inst, algo, lutx, luty, projSamples, fieldXYList, model
+        )
+        lutxp, lutyp, J = wfsImg._aperture2imageStack(
+            inst, algo, zcColStack, geoMapping, model
+        )
+
+        # Get the support of projected image and recenter the images
+        imgInit = imgStack.copy()
+        supportStack, isOutOfProj = wfsImg._getProjSupportStack(
+            inst, lutxp, lutyp, projSamples
+        )
+        isInProj = ~isOutOfProj
+        imgStack[isInProj] = wfsImg._centerOnProjectionStack(
+            imgStack[isInProj], supportStack[isInProj].astype(float), window=20
+        )
+
+        # Put the NaN to be 0 for the interpolate to use
+        lutxp[np.isnan(lutxp)] = 0
+        lutyp[np.isnan(lutyp)] = 0
+
+        # Bilinear interpolation of the intensity on (x', y') plane that
+        # corresponds to the grid points on (x, y). The out-of-range points
+        # take the values at the boundary.
+        scale = sm / 2 / sensorFactor
+        idxStack = np.broadcast_to(
+            np.arange(nDonuts, dtype=float)[:, np.newaxis, np.newaxis], lutxp.shape
+        )
+        lutIp = map_coordinates(
+            imgStack,
+            [idxStack, lutyp * scale + (sm / 2 - 0.5), lutxp * scale + (sm / 2 - 0.5)],
+            order=1,
+            mode="nearest",
+            output=imgDtype,
+        )
+        J = J.astype(imgDtype, copy=False)
+
+        # Calaculate the image on focal plane with compensation based on flux
+        # conservation
+        projStack = lutIp * J
+
+        if defocalType == DefocalType.Extra:
+            projStack = np.rot90(projStack, k=2, axes=(1, 2))
+
+        # Put NaN to be 0
+        projStack[np.isnan(projStack)] = 0
+
+        # The negative value means the over-compensation from wavefront error
+        causticStack = isOutOfProj | (
+            np.any(projStack < 0, axis=(1, 2)) & np.all(imgInit >= 0, axis=(1, 2))
+        )
+
+        # Put the overcompensated part to be 0
+        projStack[projStack < 0] = 0
+
+        # Keep the images out of the projection as they are
+        projStack[isOutOfProj] = imgInit[isOutOfProj]
+
+        return projStack, J, causticStack
+
+    def _getGeometricMappingStack(
+        self, inst, algo, lutx, luty, projSamples, fieldXYList, model
+    ):
+        """Get the geometric mapping of a stack of donuts with the same
+        defocal type.
+
+        The mapping of "offAxis" model is calculated at once for the field
+        positions not in the cache, and is put into the cache for each
+        donut. The mapping of other models does not depend on the field
+        position and is shared by all the donuts.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        lutx : numpy.ndarray
+            X-coordinate on pupil plane.
+        luty : numpy.ndarray
+            Y-coordinate on pupil plane.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        fieldXYList : list[tuple]
+            Position of each donut on the focal plane in degree
+            (field x, field y).
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+
+        Returns
+        -------
+        dict
+            Geometric mapping of donuts. See getGeometricMapping() for the
+            details. The arrays of "offAxis" model have the stack axis.
+        """
+
+        if model != "offAxis":
+            return self.getGeometricMapping(inst, algo, lutx, luty, projSamples, model)
+
+        fieldXY = np.asarray(fieldXYList, dtype=float).reshape(-1, 2)
+
+        # The defocal offset in files of off-axis correction is shared by all
+        # the donuts
+        self.setOffAxisCorr(inst, algo.getOffAxisPolyOrder())
+
+        # Index of the unique key of each donut
+        keyIndex = dict()
+        idxMapping = np.zeros(len(fieldXY), dtype=int)
+        for idx, (fieldX, fieldY) in enumerate(fieldXY):
+            key = self._getGeometricMappingKey(
+                inst, algo, projSamples, model, fieldX=fieldX, fieldY=fieldY
+            )
+            idxMapping[idx] = keyIndex.setdefault(key, len(keyIndex))
+
+        keyList = list(keyIndex.keys())
+        idxFirstDonut = np.unique(idxMapping, return_index=True)[1]
+
+        # Calculate the mappings not in the cache at once
+        geoMappingList = [self._geometricMappingCache.get(key) for key in keyList]
+        idxToCalc = [
+            idx for idx, geoMapping in enumerate(geoMappingList) if geoMapping is None
+        ]
+        if len(idxToCalc) != 0:
+            fieldX, fieldY = fieldXY[idxFirstDonut[idxToCalc]].T
+            geoMappingToCalc = self._calcGeometricMapping(
+                inst,
+                algo,
+                lutx,
+                luty,
+                projSamples,
+                model,
+                fieldX=fieldX,
+                fieldY=fieldY,
+                offAxisCoeff=self._interpOffAxisCoeff(inst, np.hypot(fieldX, fieldY)),
+            )
+
+            for idxCalc, idx in enumerate(idxToCalc):
+                geoMappingList[idx] = {
+                    name: array[idxCalc] for name, array in geoMappingToCalc.items()
+                }
+                self._geometricMappingCache.put(keyList[idx], geoMappingList[idx])
+
+        # Stack the mappings of donuts
+        geoMapping = dict()
+        for name in geoMappingList[0].keys():
+            arrays = [mapping[name] for mapping in geoMappingList]
+            geoMapping[name] = np.stack(arrays)[idxMapping]
+
+        return geoMapping
+
+    def _aperture2imageStack(self, inst, algo, zcColStack, geoMapping, model):
+        """Calculate the x, y-coordinate on the focal plane and the related
+        Jacobian matrix for a stack of donuts with the same defocal type.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        zcColStack : numpy.ndarray
+            Coefficients of wavefront of each donut with the shape of
+            (nDonuts, numTerms).
+        geoMapping : dict
+            Stacked geometric mapping of donuts. See getGeometricMapping()
+            for the details. The mapping without the stack axis is shared by
+            all the donuts.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+
+        Returns
+        -------
+        numpy.ndarray
+            Stack of x coordinate on the focal plane.
+        numpy.ndarray
+            Stack of y coordinate on the focal plane.
+        numpy.ndarray
+            Stack of Jacobian matrix between the pupil and focal plane.
+        """
+
+        # The extended x, y-coordinate on pupil plane
+        lutx = geoMapping["lutx"]
+        luty = geoMapping["luty"]
+
+        # Calculate C = -f(f-l)/l/R^2. This is for the calculation of reduced
+        # coordinate.
+        R = inst.getApertureDiameter() / 2
+        l = self._getSignedDefocalDis(inst)
+        focalLength = inst.getFocalLength()
+        myC = -focalLength * (focalLength - l) / l / R ** 2
+
+        # Obscuration of annular aperture
+        zobsR = algo.getObsOfZernikes()
+        numTerms = zcColStack.shape[1]
+
+        # Sum of the basis of annular Zernike polynomials weighted by the
+        # coefficients of each donut. The basis of shared pupil grid is only
+        # evaluated once.
+        subscripts = "nt,tn...->n..." if (lutx.ndim == 3) else "nt,t...->n..."
+
+        def gradStack(axis):
+            basis = ZernikeAnnularGradBasis(lutx, luty, zobsR, axis, numTerms)
+            return np.einsum(subscripts, zcColStack, basis)
+
+        # Calculate the x, y-coordinate on focal plane
+        # x' = F(x,y)*x + C*(dW/dx), y' = F(x,y)*y + C*(dW/dy)
+        lutxp = geoMapping["lutxp"] + myC * gradStack("dx")
+        lutyp = geoMapping["lutyp"] + myC * gradStack("dy")
+
+        # Make the sign to be consistent
+        if self.defocalType == DefocalType.Extra:
+            lutxp = -lutxp
+            lutyp = -lutyp
+
+        # Calculate the Jacobian matrix
+        if model == "paraxial":
+            basis1st = ZernikeAnnularJacobianBasis(lutx, luty, zobsR, "1st", numTerms)
+            basis2nd = ZernikeAnnularJacobianBasis(lutx, luty, zobsR, "2nd", numTerms)
+            J = (
+                1
+                + myC * np.einsum(subscripts, zcColStack, basis1st)
+                + myC ** 2 * np.einsum(subscripts, zcColStack ** 2, basis2nd)
+            )
+
+        else:
+            xpox = geoMapping["xpox"] + myC * gradStack("dx2")
+            ypoy = geoMapping["ypoy"] + myC * gradStack("dy2")
+
+            temp = myC * gradStack("dxy")
+            xpoy = geoMapping["xpoy"] + temp
+            ypox = geoMapping["ypox"] + temp
+
+            J = xpox * ypoy - xpoy * ypox
+
+        return lutxp, lutyp, J
+
+    def _getProjSupport(self, inst, zcCol, lutxp, lutyp, projSamples, geoMappingKey):
+        """Get the support of projected image on the pupil plane.
+
+        The support is the binary image of projection closed by the
+        PROJ_SUPPORT_STRUCT. The one in the last compensation is reused if
+        the key of geometric mapping is the same and the change of zcCol is
+        not larger than PROJ_SUPPORT_ZK_TOL_IN_M.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        zcCol : numpy.ndarray
+            Coefficients of wavefront.
+        lutxp : numpy.ndarray
+            X-coordinate on focal plane.
+        lutyp : numpy.ndarray
+            Y-coordinate on focal plane.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        geoMappingKey : tuple
+            Key of geometric mapping from _getGeometricMappingKey(), which
+            includes the sensor factor.
+
+        Returns
+        -------
+        numpy.ndarray[bool] or None
+            Read-only support of projected image. None if all the pixels are
+            out of the projection (caustic).
+        """
+
+        if self._projSupport is not None:
+            keyPrev, zcColPrev, supportPrev = self._projSupport
+            if (
+                keyPrev == geoMappingKey
+                and zcColPrev.shape == zcCol.shape
+                and np.max(np.abs(zcCol - zcColPrev), initial=0)
+                <= self.PROJ_SUPPORT_ZK_TOL_IN_M
+            ):
+                return supportPrev
+
+        show_lutxyp = self._showProjection(
+            lutxp, lutyp, inst.getSensorFactor(), projSamples, raytrace=False
+        )
+        if np.all(show_lutxyp <= 0):
+            return None
+
+        show_lutxyp = self._closeProjSupport(show_lutxyp)
+        show_lutxyp.setflags(write=False)
+
+        self._projSupport = (
+            geoMappingKey,
+            np.array(zcCol, dtype=float),
+            show_lutxyp,
+        )
+
+        return show_lutxyp
+
+    def _getProjSupportStack(self, inst, lutxp, lutyp, projSamples):
+        """Get the supports of projected images of a stack of donuts on the
+        pupil plane.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        lutxp : numpy.ndarray
+            Stack of x coordinate on the focal plane.
+        lutyp : numpy.ndarray
+            Stack of y coordinate on the focal plane.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+
+        Returns
+        -------
+        numpy.ndarray[bool]
+            Stack of supports of projected images.
+        numpy.ndarray[bool]
+            All the pixels of image are out of the projection (caustic) or
+            not.
+        """
+
+        show_lutxyp = self._showProjection(
+            lutxp, lutyp, inst.getSensorFactor(), projSamples, raytrace=False
+        )
+        isOutOfProj = np.all(show_lutxyp <= 0, axis=(1, 2))
+
+        return self._closeProjSupport(show_lutxyp), isOutOfProj
+
+    def _closeProjSupport(self, show_lutxyp):
+        """Close the binary image of projection by the PROJ_SUPPORT_STRUCT.
+
+        Parameters
+        ----------
+        show_lutxyp : numpy.ndarray
+            Binary image of projection. The stack of images with the shape of
+            (nDonuts, n1, n2) is closed at once.
+
+        Returns
+        -------
+        numpy.ndarray[bool]
+            Support of projected image.
+        """
+
+        # The structuring element has the depth of 1 along the stack axis, so
+        # that the images in the stack do not affect each other.
+        struct = self.PROJ_SUPPORT_STRUCT
+        struct = struct.reshape((1,) * (show_lutxyp.ndim - 2) + struct.shape)
+
+        # Extend the image by the radius of structuring element, so that
+        # the closing is not affected by the border of image.
+        radius = struct.shape[-1] // 2
+        padWidth = [(0, 0)] * (show_lutxyp.ndim - 2) + [(radius, radius)] * 2
+        show_lutxyp = np.pad(show_lutxyp, padWidth)
+        show_lutxyp = binary_dilation(show_lutxyp, structure=struct)
+        show_lutxyp = binary_erosion(show_lutxyp, structure=struct)
+
+        # Extract the region of original image
+        return show_lutxyp[..., radius:-radius, radius:-radius]
+
+    def _aperture2image(
+        self, inst, algo, zcCol, lutx, luty, projSamples, model, geoMappingKey=None
+    ):
+        """Calculate the x, y-coordinate on the focal plane and the related
+        Jacobian matrix.
+
+        The geometric (zero-aberration) part of mapping only depends on the
+        instrument, field position, defocal type, and optical model. It is
+        taken from the cache in getGeometricMapping(), and only the terms of
+        wavefront are calculated here.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        zcCol : numpy.ndarray
+            Coefficients of optical basis. It is Zernike polynomials in the
+            baseline.
+        lutx : numpy.ndarray
+            X-coordinate on pupil plane.
+        luty : numpy.ndarray
+            Y-coordinate on pupil plane.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+        geoMappingKey : tuple, optional
+            Key of geometric mapping from _getGeometricMappingKey(). It is
+            calculated if it is None. (the default is None.)
+
+        Returns
+        -------
+        numpy.ndarray
+            X coordinate on the focal plane.
+        numpy.ndarray
+            Y coordinate on the focal plane.
+        numpy.ndarray
+            Jacobian matrix between the pupil and focal plane.
+        """
+
+        if model not in ("paraxial", "onAxis", "offAxis"):
+            print("Wrong optical model type in compensate. \n")
+            return
+
+        if geoMappingKey is None:
+            geoMappingKey = self._getGeometricMappingKey(inst, algo, projSamples, model)
+        geoMapping = self._getGeometricMappingByKey(
+            geoMappingKey, inst, algo, lutx, luty, projSamples, model
+        )
+
+        # The extended x, y-coordinate on pupil plane
+        lutx = geoMapping["lutx"]
+        luty = geoMapping["luty"]
+
+        # Calculate C = -f(f-l)/l/R^2. This is for the calculation of reduced
+        # coordinate.
+        R = inst.getApertureDiameter() / 2
+        l = self._getSignedDefocalDis(inst)
+        focalLength = inst.getFocalLength()
+        myC = -focalLength * (focalLength - l) / l / R ** 2
+
+        # Obscuration of annular aperture
+        zobsR = algo.getObsOfZernikes()
+
+        # Calculate the x, y-coordinate on focal plane
+        # x' = F(x,y)*x + C*(dW/dx), y' = F(x,y)*y + C*(dW/dy)
+        lutxp = geoMapping["lutxp"]
+        lutyp = geoMapping["lutyp"]
+
+        # In Model basis (zer: Zernike polynomials)
+        if zcCol.ndim == 1:
+            lutxp = lutxp + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dx")
+            lutyp = lutyp + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dy")
+
+        # Make the sign to be consistent
+        if self.defocalType == DefocalType.Extra:
+            lutxp = -lutxp
+            lutyp = -lutyp
+
+        # Calculate the Jacobian matrix
+        # In Model basis (zer: Zernike polynomials)
+        if zcCol.ndim == 1:
+            if model == "paraxial":
+                J = (
+                    1
+                    + myC * ZernikeAnnularJacobian(zcCol, lutx, luty, zobsR, "1st")
+                    + myC ** 2 * ZernikeAnnularJacobian(zcCol, lutx, luty, zobsR, "2nd")
+                )
+
+            else:
+                xpox = geoMapping["xpox"] + myC * ZernikeAnnularGrad(
+                    zcCol, lutx, luty, zobsR, "dx2"
+                )
+
+                ypoy = geoMapping["ypoy"] + myC * ZernikeAnnularGrad(
+                    zcCol, lutx, luty, zobsR, "dy2"
+                )
+
+                temp = myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dxy")
+
+                # if temp==0,xpoy doesn't need to be symmetric about x=y
+                xpoy = geoMapping["xpoy"] + temp
+
+                # xpoy-flipud(rot90(ypox))==0 is true
+                ypox = geoMapping["ypox"] + temp
+
+                J = xpox * ypoy - xpoy * ypox
+
+        return lutxp, lutyp, J
+
+    def getGeometricMapping(self, inst, algo, lutx, luty, projSamples, model):
+        """Get the geometric (zero-aberration) part of mapping between the
+        pupil and focal plane.
+
+        The mapping does not depend on the wavefront. It is kept in a cache
+        shared by all the compensable images, so that it is only calculated
+        once for each instrument, field position, defocal type, and optical
+        model.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        lutx : numpy.ndarray
+            X-coordinate on pupil plane. It should be the pupil grid of
+            projSamples and the sensor factor of instrument as in
+            compensate(), which is not compared in the cache.
+        luty : numpy.ndarray
+            Y-coordinate on pupil plane. It should be the pupil grid as lutx.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+
+        Returns
+        -------
+        dict
+            Read-only arrays of geometric mapping. The keys are "lutx" and
+            "luty" for the extended x, y-coordinate on pupil plane, "lutxp"
+            and "lutyp" for the x, y-coordinate on focal plane, and "xpox",
+            "ypoy", "xpoy", and "ypox" for the partial derivatives of
+            x, y-coordinate on focal plane (not used in the "paraxial" model).
+            The sign of defocal type is not applied.
+
+        Raises
+        ------
+        ValueError
+            The optical model is not supported.
+        """
+
+        if model not in ("paraxial", "onAxis", "offAxis"):
+            raise ValueError("Wrong optical model type: %s." % model)
+
+        key = self._getGeometricMappingKey(inst, algo, projSamples, model)
+
+        return self._getGeometricMappingByKey(
+            key, inst, algo, lutx, luty, projSamples, model
+        )
+
+    def _getGeometricMappingByKey(
+        self, key, inst, algo, lutx, luty, projSamples, model
+    ):
+        """Get the geometric mapping with the key in the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of geometric mapping from _getGeometricMappingKey().
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        lutx : numpy.ndarray
+            X-coordinate on pupil plane.
+        luty : numpy.ndarray
+            Y-coordinate on pupil plane.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+
+        Returns
+        -------
+        dict
+            Read-only arrays of geometric mapping. See getGeometricMapping()
+            for the details.
+        """
+
+        return self._geometricMappingCache.getOrCreate(
+            key,
+            lambda: self._calcGeometricMapping(
+                inst, algo, lutx, luty, projSamples, model
+            ),
+        )
+
+    @classmethod
+    def clearGeometricMappingCache(cls):
+        """Clear the cache of geometric mapping shared by all the compensable
+        images."""
+
+        cls._geometricMappingCache.clear()
+
+    def _getSignedDefocalDis(self, inst):
+        """Get the defocal distance offset with the sign of defocal type.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+
+        Returns
+        -------
+        float
+            Defocal distance offset. It is positive for the intra-focal image
+            and negative for the extra-focal image.
+        """
+
+        defocalDisOffset = inst.getDefocalDisOffset()
+        if self.defocalType == DefocalType.Intra:
+            return defocalDisOffset
+        elif self.defocalType == DefocalType.Extra:
+            return -defocalDisOffset
+
+    def _getGeometricMappingKey(
+        self, inst, algo, projSamples, model, fieldX=None, fieldY=None
+    ):
+        """Get the key of geometric mapping in the cache.
+
+        The key only consists of the scalars. The pupil grid is determined by
+        projSamples and the sensor factor of instrument. The off-axis
+        correction coefficients and mask parameters are determined by the
+        instrument directory and field position (see setOffAxisCorr()).
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        algo : Algorithm
+            Algorithm to solve the Poisson's equation. It can by done by the
+            fast Fourier transform or serial expansion.
+        projSamples : int
+            Dimension of projected image. This value considers the
+            magnification ratio of donut image.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+        fieldX : float, optional
+            Field x in degree. If the input is None, the value of self.fieldX
+            will be used. (the default is None.)
+        fieldY : float, optional
+            Field y in degree. If the input is None, the value of self.fieldY
+            will be used. (the default is None.)
+
+        Returns
+        -------
+        tuple
+            Key of geometric mapping.
+        """
 
-        if self.defocalType == DefocalType.Extra:
-            self.updateImage(np.rot90(self.getImg(), k=2))
+        if fieldX is None:
+            fieldX = self.fieldX
 
-        # Put NaN to be 0
-        imgCompensate = self.getImg()
-        imgCompensate[np.isnan(imgCompensate)] = 0
+        if fieldY is None:
+            fieldY = self.fieldY
 
-        # Check the compensated image has the problem or not.
-        # The negative value means the over-compensation from wavefront error
-        if np.any(imgCompensate < 0) and np.all(self.image0 >= 0):
-            print(
-                "WARNING: negative scale parameter, image is within caustic, zcCol (in um)=\n"
-            )
-            self.caustic = True
+        key = [
+            model,
+            self.defocalType,
+            int(projSamples),
+            float(inst.getApertureDiameter()),
+            float(inst.getDefocalDisOffset()),
+            float(inst.getFocalLength()),
+            float(inst.getObscuration()),
+            float(inst.getSensorFactor()),
+        ]
 
-        # Put the overcompensated part to be 0
-        imgCompensate[imgCompensate < 0] = 0
-        self.updateImage(imgCompensate)
+        if model == "onAxis":
+            key.append(float(algo.getMaskScalingFactor()))
 
-    def _aperture2image(self, inst, algo, zcCol, lutx, luty, projSamples, model):
-        """Calculate the x, y-coordinate on the focal plane and the related
-        Jacobian matrix.
+        elif model == "offAxis":
+            key += [
+                inst.getInstFileDir(),
+                float(fieldX),
+                float(fieldY),
+                int(algo.getOffAxisPolyOrder()),
+                float(self.offAxisOffset),
+                float(inst.getDimOfDonutOnSensor()),
+                float(inst.getCamPixelSize()),
+            ]
+
+        return tuple(key)
+
+    def _calcGeometricMapping(
+        self,
+        inst,
+        algo,
+        lutx,
+        luty,
+        projSamples,
+        model,
+        fieldX=None,
+        fieldY=None,
+        offAxisCoeff=None,
+    ):
+        """Calculate the geometric (zero-aberration) part of mapping between
+        the pupil and focal plane.
+
+        The mappings of a stack of donuts are calculated at once if the field
+        positions are given. The mapping of "paraxial" and "onAxis" models
+        does not depend on the field position and has no stack axis.
 
         Parameters
         ----------
@@ -495,9 +1399,6 @@ class CompensableImage(object):
         algo : Algorithm
             Algorithm to solve the Poisson's equation. It can by done by the
             fast Fourier transform or serial expansion.
-        zcCol : numpy.ndarray
-            Coefficients of optical basis. It is Zernike polynomials in the
-            baseline.
         lutx : numpy.ndarray
             X-coordinate on pupil plane.
         luty : numpy.ndarray
@@ -507,36 +1408,38 @@ class CompensableImage(object):
             magnification ratio of donut image.
         model : str
             Optical model. It can be "paraxial", "onAxis", or "offAxis".
+        fieldX : numpy.ndarray, optional
+            X-coordinate of a stack of donuts on the focal plane in degree.
+            If None, the field position of image is used. (the default is
+            None.)
+        fieldY : numpy.ndarray, optional
+            Y-coordinate of a stack of donuts on the focal plane in degree.
+            (the default is None.)
+        offAxisCoeff : numpy.ndarray, optional
+            Coefficients of off-axis correction of a stack of donuts with the
+            shape of (nDonuts, 4, numOfCoeffs). If None, the coefficients of
+            image are used. (the default is None.)
 
         Returns
         -------
-        numpy.ndarray
-            X coordinate on the focal plane.
-        numpy.ndarray
-            Y coordinate on the focal plane.
-        numpy.ndarray
-            Jacobian matrix between the pupil and focal plane.
+        dict
+            Read-only arrays of geometric mapping. See getGeometricMapping()
+            for the details. The arrays of "offAxis" model have the shape of
+            (nDonuts, projSamples, projSamples) if the field positions are
+            given.
         """
 
+        # Do not change the input coordinates
+        lutx = np.array(lutx, dtype=float)
+        luty = np.array(luty, dtype=float)
+
         # Get the radius: R = D/2
         R = inst.getApertureDiameter() / 2
 
-        # Calculate C = -f(f-l)/l/R^2. This is for the calculation of reduced
-        # coordinate.
-        defocalDisOffset = inst.getDefocalDisOffset()
-        if self.defocalType == DefocalType.Intra:
-            l = defocalDisOffset
-        elif self.defocalType == DefocalType.Extra:
-            l = -defocalDisOffset
+        # Defocal distance offset with the sign of defocal type
+        l = self._getSignedDefocalDis(inst)
 
         focalLength = inst.getFocalLength()
-        myC = -focalLength * (focalLength - l) / l / R ** 2
-
-        # Get the functions to do the off-axis correction by numerical fitting
-        # Order to do the off-axis correction. The order is 10 now.
-        offAxisPolyOrder = algo.getOffAxisPolyOrder()
-        polyFunc = self._getFunction("poly%d_2D" % offAxisPolyOrder)
-        polyGradFunc = self._getFunction("poly%dGrad" % offAxisPolyOrder)
 
         # Calculate the distance to center
         lutr = np.sqrt(lutx ** 2 + luty ** 2)
@@ -572,7 +1475,9 @@ class CompensableImage(object):
         lutx[idxinbd] = lutx[idxinbd] / lutr[idxinbd] * obscuration
         luty[idxinbd] = luty[idxinbd] / lutr[idxinbd] * obscuration
 
-        # Get the corrected x, y-coordinate on focal plane (lutxp, lutyp)
+        # Get the corrected x, y-coordinate on focal plane (lutxp, lutyp) and
+        # the partial derivatives of them
+        geoMapping = dict()
         if model == "paraxial":
             # No correction is needed in "paraxial" model
             lutxp = lutx
@@ -598,17 +1503,62 @@ class CompensableImage(object):
             lutxp = maskScalingFactor * myA * lutx
             lutyp = maskScalingFactor * myA * luty
 
+            geoMapping["xpox"] = (
+                maskScalingFactor
+                * myA
+                * (1 + lutx ** 2 * R ** 2.0 / (focalLength ** 2 - R ** 2 * lutr ** 2))
+            )
+
+            geoMapping["ypoy"] = (
+                maskScalingFactor
+                * myA
+                * (1 + luty ** 2 * R ** 2.0 / (focalLength ** 2 - R ** 2 * lutr ** 2))
+            )
+
+            geoMapping["xpoy"] = (
+                maskScalingFactor
+                * myA
+                * lutx
+                * luty
+                * R ** 2
+                / (focalLength ** 2 - R ** 2 * lutr ** 2)
+            )
+
+            geoMapping["ypox"] = geoMapping["xpoy"]
+
         elif model == "offAxis":
 
+            # Get the functions to do the off-axis correction by numerical
+            # fitting. Order to do the off-axis correction. The order is 10
+            # now.
+            offAxisPolyOrder = algo.getOffAxisPolyOrder()
+            polyFunc = self._getFunction("poly%d_2D" % offAxisPolyOrder)
+            polyGradFunc = self._getFunction("poly%dGrad" % offAxisPolyOrder)
+
+            if fieldX is None:
+                fieldX = self.fieldX
+                fieldY = self.fieldY
+                offAxisCoeff = self.offAxisCoeff
+            else:
+                # The parameters of each donut are broadcast along the stack
+                # axis of pupil grid. The polynomials take a row of
+                # coefficients for each donut.
+                fieldX = np.reshape(fieldX, (-1, 1, 1))
+                fieldY = np.reshape(fieldY, (-1, 1, 1))
+                offAxisCoeff = np.asarray(offAxisCoeff, dtype=float)
+
+                lutx = np.repeat(lutx[np.newaxis], len(fieldX), axis=0)
+                luty = np.repeat(luty[np.newaxis], len(fieldY), axis=0)
+
             # Get the coefficient of polynomials for off-axis correction
             tt = self.offAxisOffset
 
-            cx = (self.offAxisCoeff[0, :] - self.offAxisCoeff[2, :]) * (tt + l) / (
+            cx = (offAxisCoeff[..., 0, :] - offAxisCoeff[..., 2, :]) * (tt + l) / (
                 2 * tt
-            ) + self.offAxisCoeff[2, :]
-            cy = (self.offAxisCoeff[1, :] - self.offAxisCoeff[3, :]) * (tt + l) / (
+            ) + offAxisCoeff[..., 2, :]
+            cy = (offAxisCoeff[..., 1, :] - offAxisCoeff[..., 3, :]) * (tt + l) / (
                 2 * tt
-            ) + self.offAxisCoeff[3, :]
+            ) + offAxisCoeff[..., 3, :]
 
             # This will be inverted back by typesign later on.
             # We do the inversion here to make the (x,y)->(x',y') equations has
@@ -618,16 +1568,11 @@ class CompensableImage(object):
 
             # Do the orthogonalization: x'=1/sqrt(2)*(x+y), y'=1/sqrt(2)*(x-y)
             # Calculate the rotation angle for the orthogonalization
-            fieldDist = self._getFieldDistFromOrigin()
-            costheta = (self.fieldX + self.fieldY) / fieldDist / np.sqrt(2)
-            if costheta > 1:
-                costheta = 1
-            elif costheta < -1:
-                costheta = -1
+            fieldDist = self._getFieldDistFromOrigin(fieldX=fieldX, fieldY=fieldY)
+            costheta = np.clip((fieldX + fieldY) / fieldDist / np.sqrt(2), -1, 1)
 
             sintheta = np.sqrt(1 - costheta ** 2)
-            if self.fieldY < self.fieldX:
-                sintheta = -sintheta
+            sintheta = np.where(fieldY < fieldX, -sintheta, sintheta)
 
             # Create the pupil grid in off-axis model. This gives the
             # x,y-coordinate in the extended ring area defined by the parameter
@@ -635,7 +1580,7 @@ class CompensableImage(object):
 
             # Get the mask-related parameters
             maskCa, maskRa, maskCb, maskRb = self._interpMaskParam(
-                self.fieldX, self.fieldY, inst.getMaskOffAxisCorr()
+                fieldX, fieldY, inst.getMaskParamTable()
             )
 
             lutx, luty = self._createPupilGrid(
@@ -646,8 +1591,8 @@ class CompensableImage(object):
                 maskCb,
                 maskRa,
                 maskRb,
-                self.fieldX,
-                self.fieldY,
+                fieldX,
+                fieldY,
             )
 
             # Calculate the x, y-coordinate on focal plane
@@ -673,101 +1618,39 @@ class CompensableImage(object):
             lutxp = lutxp * reduced_coordi_factor
             lutyp = lutyp * reduced_coordi_factor
 
-        else:
-            print("Wrong optical model type in compensate. \n")
-            return
-
-        # Obscuration of annular aperture
-        zobsR = algo.getObsOfZernikes()
-
-        # Calculate the x, y-coordinate on focal plane
-        # x' = F(x,y)*x + C*(dW/dx), y' = F(x,y)*y + C*(dW/dy)
-
-        # In Model basis (zer: Zernike polynomials)
-        if zcCol.ndim == 1:
-            lutxp = lutxp + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dx")
-            lutyp = lutyp + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dy")
-
-        # Make the sign to be consistent
-        if self.defocalType == DefocalType.Extra:
-            lutxp = -lutxp
-            lutyp = -lutyp
-
-        # Calculate the Jacobian matrix
-        # In Model basis (zer: Zernike polynomials)
-        if zcCol.ndim == 1:
-            if model == "paraxial":
-                J = (
-                    1
-                    + myC * ZernikeAnnularJacobian(zcCol, lutx, luty, zobsR, "1st")
-                    + myC ** 2 * ZernikeAnnularJacobian(zcCol, lutx, luty, zobsR, "2nd")
-                )
-
-            elif model == "onAxis":
-                xpox = maskScalingFactor * myA * (
-                    1 + lutx ** 2 * R ** 2.0 / (focalLength ** 2 - R ** 2 * lutr ** 2)
-                ) + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dx2")
-
-                ypoy = maskScalingFactor * myA * (
-                    1 + luty ** 2 * R ** 2.0 / (focalLength ** 2 - R ** 2 * lutr ** 2)
-                ) + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dy2")
-
-                xpoy = maskScalingFactor * myA * lutx * luty * R ** 2 / (
-                    focalLength ** 2 - R ** 2 * lutr ** 2
-                ) + myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dxy")
-
-                ypox = xpoy
-
-                J = xpox * ypoy - xpoy * ypox
-
-            elif model == "offAxis":
-                xp0ox = (
-                    polyGradFunc(cx, lutx0, luty0, "dx") * costheta
-                    - polyGradFunc(cx, lutx0, luty0, "dy") * sintheta
-                )
-
-                yp0ox = (
-                    polyGradFunc(cy, lutx0, luty0, "dx") * costheta
-                    - polyGradFunc(cy, lutx0, luty0, "dy") * sintheta
-                )
-
-                xp0oy = (
-                    polyGradFunc(cx, lutx0, luty0, "dx") * sintheta
-                    + polyGradFunc(cx, lutx0, luty0, "dy") * costheta
-                )
-
-                yp0oy = (
-                    polyGradFunc(cy, lutx0, luty0, "dx") * sintheta
-                    + polyGradFunc(cy, lutx0, luty0, "dy") * costheta
-                )
-
-                xpox = (
-                    xp0ox * costheta - yp0ox * sintheta
-                ) * reduced_coordi_factor + myC * ZernikeAnnularGrad(
-                    zcCol, lutx, luty, zobsR, "dx2"
-                )
-
-                ypoy = (
-                    xp0oy * sintheta + yp0oy * costheta
-                ) * reduced_coordi_factor + myC * ZernikeAnnularGrad(
-                    zcCol, lutx, luty, zobsR, "dy2"
-                )
-
-                temp = myC * ZernikeAnnularGrad(zcCol, lutx, luty, zobsR, "dxy")
-
-                # if temp==0,xpoy doesn't need to be symmetric about x=y
-                xpoy = (
-                    xp0oy * costheta - yp0oy * sintheta
-                ) * reduced_coordi_factor + temp
-
-                # xpoy-flipud(rot90(ypox))==0 is true
-                ypox = (
-                    xp0ox * sintheta + yp0ox * costheta
-                ) * reduced_coordi_factor + temp
-
-                J = xpox * ypoy - xpoy * ypox
-
-        return lutxp, lutyp, J
+            # Partial derivatives at reference orientation
+            cxox = polyGradFunc(cx, lutx0, luty0, "dx")
+            cxoy = polyGradFunc(cx, lutx0, luty0, "dy")
+            cyox = polyGradFunc(cy, lutx0, luty0, "dx")
+            cyoy = polyGradFunc(cy, lutx0, luty0, "dy")
+
+            xp0ox = cxox * costheta - cxoy * sintheta
+            yp0ox = cyox * costheta - cyoy * sintheta
+            xp0oy = cxox * sintheta + cxoy * costheta
+            yp0oy = cyox * sintheta + cyoy * costheta
+
+            geoMapping["xpox"] = (
+                xp0ox * costheta - yp0ox * sintheta
+            ) * reduced_coordi_factor
+            geoMapping["ypoy"] = (
+                xp0oy * sintheta + yp0oy * costheta
+            ) * reduced_coordi_factor
+            geoMapping["xpoy"] = (
+                xp0oy * costheta - yp0oy * sintheta
+            ) * reduced_coordi_factor
+            geoMapping["ypox"] = (
+                xp0ox * sintheta + yp0ox * costheta
+            ) * reduced_coordi_factor
+
+        geoMapping["lutx"] = lutx
+        geoMapping["luty"] = luty
+        geoMapping["lutxp"] = lutxp
+        geoMapping["lutyp"] = lutyp
+
+        for array in geoMapping.values():
+            array.setflags(write=False)
+
+        return geoMapping
 
     def _getFunction(self, name):
         """Decide to call the function of _poly10_2D() or _poly10Grad().
@@ -810,7 +1693,9 @@ class CompensableImage(object):
         Parameters
         ----------
         c : numpy.ndarray
-            Parameters of off-axis distrotion.
+            Parameters of off-axis distrotion. The stack of parameters with
+            the shape of (nDonuts, numOfCoeffs) is applied to the stack of
+            coordinates with the shape of (nDonuts, ...).
         data : numpy.ndarray
             X, y-coordinate on aperature. If y is provided this will be just
             the x-coordinate.
@@ -831,7 +1716,7 @@ class CompensableImage(object):
             x = data
 
         # Correct the off-axis distortion
-        return mathcwfs.poly10_2D(c, x.flatten(), y.flatten()).reshape(x.shape)
+        return mathcwfs.poly10_2D(c, x, y)
 
     def _poly10Grad(self, c, x, y, atype):
         """Correct the off-axis distortion by fitting with a 10 order
@@ -840,7 +1725,9 @@ class CompensableImage(object):
         Parameters
         ----------
         c : numpy.ndarray
-            Parameters of off-axis distrotion.
+            Parameters of off-axis distrotion. The stack of parameters with
+            the shape of (nDonuts, numOfCoeffs) is applied to the stack of
+            coordinates with the shape of (nDonuts, ...).
         x : numpy.ndarray
             X-coordinate at aperature.
         y : numpy.ndarray
@@ -854,13 +1741,15 @@ class CompensableImage(object):
             Corrected parameters for off-axis distortion.
         """
 
-        return mathcwfs.poly10Grad(c, x.flatten(), y.flatten(), atype).reshape(x.shape)
+        return mathcwfs.poly10Grad(c, x, y, atype)
 
     def _createPupilGrid(self, lutx, luty, onepixel, ca, cb, ra, rb, fieldX, fieldY):
         """Create the pupil grid in off-axis model.
 
         This function gives the x,y-coordinate in the extended ring area
-        defined by the parameter of onepixel.
+        defined by the parameter of onepixel. The pupil grids of a stack of
+        donuts are created at once if the mask-related parameters and field
+        positions are the arrays broadcastable to the shape of lutx.
 
         Parameters
         ----------
@@ -870,17 +1759,17 @@ class CompensableImage(object):
             Y-coordinate on pupil plane.
         onepixel : float
             Exteneded delta radius.
-        ca : float
+        ca : float or numpy.ndarray
             Center of outer ring on the pupil plane.
-        cb : float
+        cb : float or numpy.ndarray
             Center of inner ring on the pupil plane.
-        ra : float
+        ra : float or numpy.ndarray
             Radius of outer ring on the pupil plane.
-        rb : float
+        rb : float or numpy.ndarray
             Radius of inner ring on the pupil plane.
-        fieldX : float
+        fieldX : float or numpy.ndarray
             X-coordinate of donut on the focal plane in degree.
-        fieldY : float
+        fieldY : float or numpy.ndarray
             Y-coordinate of donut on the focal plane in degree.
 
         Returns
@@ -920,14 +1809,18 @@ class CompensableImage(object):
             X-coordinate on pupil plane.
         luty : numpy.ndarray
             Y-coordinate on pupil plane.
-        cenX : float
-            X-coordinate of boundary ring center.
-        cenY : float
-            Y-coordinate of boundary ring center.
-        innerR : float
-            Inner radius of extended ring.
-        outerR : float
-            Outer radius of extended ring.
+        cenX : float or numpy.ndarray
+            X-coordinate of boundary ring center. The array should be
+            broadcastable to the shape of lutx.
+        cenY : float or numpy.ndarray
+            Y-coordinate of boundary ring center. The array should be
+            broadcastable to the shape of lutx.
+        innerR : float or numpy.ndarray
+            Inner radius of extended ring. The array should be broadcastable
+            to the shape of lutx.
+        outerR : float or numpy.ndarray
+            Outer radius of extended ring. The array should be broadcastable
+            to the shape of lutx.
         config : str
             Configuration to calculate the x,y-coordinate in the extended ring.
             "inner": inner extended ring; "outer": outer extended ring.
@@ -967,6 +1860,9 @@ class CompensableImage(object):
         luty[idxout] = np.nan
 
         # Get the x, y-coordinate in this ring area by the linear approximation
+        cenX = np.broadcast_to(cenX, lutx.shape)[idxbound]
+        cenY = np.broadcast_to(cenY, luty.shape)[idxbound]
+        R = np.broadcast_to(R, lutr.shape)[idxbound]
         lutx[idxbound] = (lutx[idxbound] - cenX) / lutr[idxbound] * R + cenX
         luty[idxbound] = (luty[idxbound] - cenY) / lutr[idxbound] * R + cenY
 
@@ -977,40 +1873,38 @@ class CompensableImage(object):
 
         Parameters
         ----------
-        ca : float
+        ca : float or numpy.ndarray
             Mask-related parameter of center.
-        cb : float
+        cb : float or numpy.ndarray
             Mask-related parameter of center.
-        fieldX : float
+        fieldX : float or numpy.ndarray
             X-coordinate of donut on the focal plane in degree.
-        fieldY : float
+        fieldY : float or numpy.ndarray
             Y-coordinate of donut on the focal plane in degree.
 
         Returns
         -------
-        float
+        float or numpy.ndarray
             Projected x element after the rotation.
-        float
+        float or numpy.ndarray
             Projected y element after the rotation.
-        float
+        float or numpy.ndarray
             Projected x element after the rotation.
-        float
+        float or numpy.ndarray
             Projected y element after the rotation.
         """
 
-        # Calculate the sin(theta) and cos(theta) for the rotation
+        # Calculate the sin(theta) and cos(theta) for the rotation. They are
+        # zero for the donut at the origin.
         fieldDist = self._getFieldDistFromOrigin(
-            fieldX=fieldX, fieldY=fieldY, minDist=0
+            fieldX=fieldX, fieldY=fieldY, minDist=np.inf
         )
-        if fieldDist == 0:
-            c = 0
-            s = 0
-        else:
-            # Calculate cos(theta)
-            c = fieldX / fieldDist
 
-            # Calculate sin(theta)
-            s = fieldY / fieldDist
+        # Calculate cos(theta)
+        c = fieldX / fieldDist
+
+        # Calculate sin(theta)
+        s = fieldY / fieldDist
 
         # Projected x and y coordinate after the rotation
         cax = c * ca
@@ -1044,32 +1938,119 @@ class CompensableImage(object):
             Recentered image.
         """
 
-        # Calculate the cross-correlate
-        corr = correlate(img, template, mode="same")
-
-        # Calculate the shifts of center
-
         # Only consider the shifts in a cetrain window (range)
-        # Align the input image to the center of template
+        r = window // 2
+
+        # Calculate the cross-correlation of shifts in [-r, r) by the
+        # circular one. The dimension of FFT is at least length + r, so that
+        # there is no wrap-around in the window.
         length = template.shape[0]
-        center = length // 2
+        dimOfFft = next_fast_len(length + r, real=True)
+        shape = (dimOfFft, dimOfFft)
+        corr = np.fft.irfft2(
+            np.fft.rfft2(img, s=shape) * self._getTemplateFft(template, shape),
+            s=shape,
+        )
+
+        shifts = np.arange(-r, r) % dimOfFft
+        corrInWindow = corr[np.ix_(shifts, shifts)]
+
+        # Calculate the shifts of center to align the input image to the
+        # center of template
+        ymatch, xmatch = np.unravel_index(np.argmax(corrInWindow), corrInWindow.shape)
+
+        dx = r - xmatch
+        dy = r - ymatch
+
+        # Shift/ recenter the input image
+        return np.roll(img, (dy, dx), axis=(0, 1))
+
+    def _centerOnProjectionStack(self, imgStack, templateStack, window=20):
+        """Center a stack of images to the centers of templates.
 
+        Parameters
+        ----------
+        imgStack : numpy.ndarray
+            Stack of images to be centered with the templates with the shape
+            of (nDonuts, n, n).
+        templateStack : numpy.ndarray
+            Stack of templates with the same shape as imgStack.
+        window : int, optional
+            Size of window in pixel. See centerOnProjection() for the details.
+            (the default is 20.)
+
+        Returns
+        -------
+        numpy.ndarray
+            Stack of recentered images.
+        """
+
+        # Calculate the cross-correlation of shifts in [-r, r) of all the
+        # images by the batched FFT. See centerOnProjection() for the details.
         r = window // 2
 
-        mask = np.zeros(corr.shape)
-        mask[center - r : center + r, center - r : center + r] = 1
-        idx = np.argmax(corr * mask)
+        nDonuts, length = templateStack.shape[0:2]
+        dimOfFft = next_fast_len(length + r, real=True)
+        shape = (dimOfFft, dimOfFft)
+        corr = np.fft.irfft2(
+            np.fft.rfft2(imgStack, s=shape)
+            * np.conj(np.fft.rfft2(templateStack, s=shape)),
+            s=shape,
+        )
 
-        # The above 'idx' is an interger. Need to rematch it to the
-        # two-dimention position (x and y)
-        xmatch = idx % length
-        ymatch = idx // length
+        shifts = np.arange(-r, r) % dimOfFft
+        corrInWindow = corr[:, shifts[:, np.newaxis], shifts]
 
-        dx = center - xmatch
-        dy = center - ymatch
+        # Calculate the shifts of center of each image
+        ymatch, xmatch = np.unravel_index(
+            np.argmax(corrInWindow.reshape(nDonuts, -1), axis=1),
+            corrInWindow.shape[1:],
+        )
 
-        # Shift/ recenter the input image
-        return np.roll(np.roll(img, dx, axis=1), dy, axis=0)
+        dx = r - xmatch
+        dy = r - ymatch
+
+        # Shift/ recenter the images as np.roll() by the indices of the
+        # shifted rows and columns of each image
+        n1, n2 = imgStack.shape[1:]
+        rows = (np.arange(n1) - dy[:, np.newaxis]) % n1
+        cols = (np.arange(n2) - dx[:, np.newaxis]) % n2
+
+        return imgStack[
+            np.arange(nDonuts)[:, np.newaxis, np.newaxis],
+            rows[:, :, np.newaxis],
+            cols[:, np.newaxis, :],
+        ]
+
+    def _getTemplateFft(self, template, shape):
+        """Get the complex conjugate of FFT of template.
+
+        The FFT of the last template is kept, because the same template is
+        used if the support of projected image is reused in compensate().
+
+        Parameters
+        ----------
+        template : numpy.array
+            Template image.
+        shape : tuple
+            Shape of FFT.
+
+        Returns
+        -------
+        numpy.ndarray
+            Read-only complex conjugate of real-to-complex FFT of template.
+        """
+
+        digest = hashlib.sha1(np.ascontiguousarray(template, dtype=float).data)
+        key = (template.shape, shape, digest.hexdigest())
+
+        if (self._templateFft is None) or (self._templateFft[0] != key):
+            templateFft = np.conj(np.fft.rfft2(template, s=shape))
+            templateFft.setflags(write=False)
+
+            self._templateFft = (key, templateFft)
+
+        return self._templateFft[1]
 
     def setOffAxisCorr(self, inst, order):
         """Set the coefficients of off-axis correction for x, y-projection of
@@ -1086,103 +2067,65 @@ class CompensableImage(object):
             Up to order-th of off-axis correction.
         """
 
-        # List of configuration
-        configList = ["cxin", "cyin", "cxex", "cyex"]
-
-        # Get all files in the directory
-        instDir = inst.getInstFileDir()
-        fileList = [
-            f for f in os.listdir(instDir) if os.path.isfile(os.path.join(instDir, f))
-        ]
-
-        # Read files
-        offAxisCoeff = []
-        for config in configList:
-
-            # Construct the configuration file name
-            for fileName in fileList:
-                m = re.match(r"\S*%s\S*.yaml" % config, fileName)
-                if m is not None:
-                    matchFileName = m.group()
-                    break
+        # The coefficient files are only read once for each instrument
+        corrDataList = self._offAxisCoeffStore.getCorrData(inst.getInstFileDir())
 
-            filePath = os.path.join(instDir, matchFileName)
-            corrCoeff, offset = self._getOffAxisCorrSingle(filePath)
-            offAxisCoeff.append(corrCoeff)
-
-        # Give the values
-        self.offAxisCoeff = np.array(offAxisCoeff)
-        self.offAxisOffset = offset
+        # Give the values. The offset is the defocal distance.
+        fieldDist = self._getFieldDistFromOrigin(minDist=0.0)
+        self.offAxisCoeff = self._interpOffAxisCoeff(inst, fieldDist)
+        self.offAxisOffset = corrDataList[-1][0, 0]
 
-    def _getOffAxisCorrSingle(self, confFile):
-        """Get the image-related pamameters for the off-axis distortion by the
-        linear approximation with a series of fitted parameters with LSST
-        ZEMAX model.
+    def _interpOffAxisCoeff(self, inst, fieldDist):
+        """Get the coefficients of off-axis correction by the linear
+        approximation over the field distance.
 
         Parameters
         ----------
-        confFile : str
-            Path of configuration file.
+        inst : Instrument
+            Instrument to use.
+        fieldDist : float or numpy.ndarray
+            Field distance from donut to origin (aperature).
 
         Returns
         -------
         numpy.ndarray
-            Coefficients for the off-axis distortion based on the linear
-            response.
-        float
-            Defocal distance in m.
+            Coefficients of off-axis correction with the shape of
+            fieldDist.shape + (4, numOfCoeffs).
         """
 
-        fieldDist = self._getFieldDistFromOrigin(minDist=0.0)
-
-        # Read the configuration file
-        paramReader = ParamReader()
-        paramReader.setFilePath(confFile)
-        cdata = paramReader.getMatContent()
-
-        # Record the offset (defocal distance)
-        offset = cdata[0, 0]
-
-        # Take the reference parameters
-        c = cdata[:, 1:]
-
-        # Get the ruler, which is the distance to center
-        # ruler is between 1.51 and 1.84 degree here
-        ruler = np.sqrt(c[:, 0] ** 2 + c[:, 1] ** 2)
-
-        # Get the fitted parameters for off-axis correction by linear
-        # approximation
-        corr_coeff = self._linearApprox(fieldDist, ruler, c[:, 2:])
+        corrTableList = self._offAxisCoeffStore.getCorrTables(inst.getInstFileDir())
 
-        return corr_coeff, offset
+        return np.stack(
+            [corrTable.interp(fieldDist) for corrTable in corrTableList], axis=-2
+        )
 
-    def _interpMaskParam(self, fieldX, fieldY, maskParam):
+    def _interpMaskParam(self, fieldX, fieldY, maskParamTable):
         """Get the mask-related pamameters for the off-axis distortion and
         vignetting correction by the linear approximation with a series of
         fitted parameters with LSST ZEMAX model.
 
         Parameters
         ----------
-        fieldX : float
+        fieldX : float or numpy.ndarray
             X-coordinate of donut on the focal plane in degree.
-        fieldY : float
+        fieldY : float or numpy.ndarray
             Y-coordinate of donut on the focal plane in degree.
-        maskParam : numpy.ndarray
-            Fitted coefficients for the off-axis distortion and vignetting
-            correction.
+        maskParamTable : RadialInterpTable
+            Table of fitted coefficients for the off-axis distortion and
+            vignetting correction over the field radius.
 
         Returns
         -------
-        float
+        float or numpy.ndarray
             'ca' coefficient for the off-axis distortion and vignetting
             correction based on the linear response.
-        float
+        float or numpy.ndarray
             'ra' coefficient for the off-axis distortion and vignetting
             correction based on the linear response.
-        float
+        float or numpy.ndarray
             'cb' coefficient for the off-axis distortion and vignetting
             correction based on the linear response.
-        float
+        float or numpy.ndarray
             'rb' coefficient for the off-axis distortion and vignetting
             correction based on the linear response.
         """
@@ -1190,82 +2133,19 @@ class CompensableImage(object):
         # Calculate the distance from donut to origin (aperature)
         filedDist = np.sqrt(fieldX ** 2 + fieldY ** 2)
 
-        # Get the ruler, which is the distance to center
-        # ruler is between 1.51 and 1.84 degree here
-        ruler = np.sqrt(2) * maskParam[:, 0]
-
         # Get the fitted parameters for off-axis correction by linear
         # approximation
-        param = self._linearApprox(filedDist, ruler, maskParam[:, 1:])
+        param = maskParamTable.interp(filedDist)
 
         # Define related parameters
-        ca = param[0]
-        ra = param[1]
-        cb = param[2]
-        rb = param[3]
+        ca = param[..., 0]
+        ra = param[..., 1]
+        cb = param[..., 2]
+        rb = param[..., 3]
 
         return ca, ra, cb, rb
 
-    def _linearApprox(self, fieldDist, ruler, parameters):
-        """Get the fitted parameters for off-axis correction by linear
-        approximation.
-
-        Parameters
-        ----------
-        fieldDist : float
-            Field distance from donut to origin (aperature).
-        ruler : numpy.ndarray
-            A series of distance with available parameters for the fitting.
-        parameters : numpy.ndarray
-            Referenced parameters for the fitting.
-
-        Returns
-        -------
-        numpy.ndarray
-            Fitted parameters based on the linear approximation.
-        """
-
-        # Sort the ruler and parameters based on the magnitude of ruler
-        sortIndex = np.argsort(ruler)
-        ruler = ruler[sortIndex]
-        parameters = parameters[sortIndex, :]
-
-        # Compare the distance to center (aperature) between donut and standard
-        compDis = ruler >= fieldDist
-
-        # fieldDist is too big and out of range
-        if fieldDist > ruler.max():
-            # Take the coefficients in the highest boundary
-            p2 = parameters.shape[0] - 1
-            p1 = 0
-            w1 = 0
-            w2 = 1
-
-        # fieldDist is too small to be in the range
-        elif fieldDist < ruler.min():
-            # Take the coefficients in the lowest boundary
-            p2 = 0
-            p1 = 0
-            w1 = 1
-            w2 = 0
-
-        # fieldDist is in the range
-        else:
-            # Find the boundary of fieldDist in the known data
-            p2 = compDis.argmax()
-            p1 = p2 - 1
-
-            # Calculate the weighting ratio
-            w1 = (ruler[p2] - fieldDist) / (ruler[p2] - ruler[p1])
-            w2 = 1 - w1
-
-        # Get the fitted parameters for off-axis correction by linear
-        # approximation
-        param = w1 * parameters[p1, :] + w2 * parameters[p2, :]
-
-        return param
-
-    def makeMaskList(self, inst, model):
+    def makeMaskList(self, inst, model, fieldX=None, fieldY=None):
         """Calculate the mask list based on the obscuration and optical model.
 
         Parameters
@@ -1274,6 +2154,12 @@ class CompensableImage(object):
             Instrument to use.
         model : str
             Optical model. It can be "paraxial", "onAxis", or "offAxis".
+        fieldX : float, optional
+            X-coordinate of donut on the focal plane in degree. If None, the
+            field position of image is used. (the default is None.)
+        fieldY : float, optional
+            Y-coordinate of donut on the focal plane in degree. If None, the
+            field position of image is used. (the default is None.)
 
         Returns
         -------
@@ -1281,6 +2167,12 @@ class CompensableImage(object):
             The list of mask.
         """
 
+        if fieldX is None:
+            fieldX = self.fieldX
+
+        if fieldY is None:
+            fieldY = self.fieldY
+
         # Masklist = [center_x, center_y, radius_of_boundary,
         #             1/ 0 for outer/ inner boundary]
         obscuration = inst.getObscuration()
@@ -1293,13 +2185,11 @@ class CompensableImage(object):
         else:
             # Get the mask-related parameters
             maskCa, maskRa, maskCb, maskRb = self._interpMaskParam(
-                self.fieldX, self.fieldY, inst.getMaskOffAxisCorr()
+                fieldX, fieldY, inst.getMaskParamTable()
             )
 
             # Rotate the mask-related parameters of center
-            cax, cay, cbx, cby = self._rotateMaskParam(
-                maskCa, maskCb, self.fieldX, self.fieldY
-            )
+            cax, cay, cbx, cby = self._rotateMaskParam(maskCa, maskCb, fieldX, fieldY)
             masklist = np.array(
                 [
                     [0, 0, 1, 1],
@@ -1320,7 +2210,8 @@ class CompensableImage(object):
         ----------
         lutxp : numpy.ndarray
             X-coordinate on pupil plane. The value of element will be NaN if
-            that point is not inside the pupil.
+            that point is not inside the pupil. The stack of coordinates with
+            the shape of (nDonuts, n1, n2) is projected at once.
         lutyp : numpy.ndarray
             Y-coordinate on pupil plane. The value of element will be NaN if
             that point is not inside the pupil.
@@ -1340,12 +2231,12 @@ class CompensableImage(object):
         """
 
         # Dimension of pupil image
-        n1, n2 = lutxp.shape
+        n1, n2 = lutxp.shape[-2:]
 
         # Construct the binary matrix on pupil. It is noted that if the
         # raytrace is true, the value of element is allowed to be greater
         # than 1.
-        show_lutxyp = np.zeros((n1, n2))
+        show_lutxyp = np.zeros(lutxp.shape)
 
         # Get the index in pupil. If a point's value is NaN, this point is
         # outside the pupil.
@@ -1353,8 +2244,8 @@ class CompensableImage(object):
 
         # Calculate the projected x, y-coordinate in pixel
         # x=0.5 is center of pixel#1
-        xR = np.zeros((n1, n2))
-        yR = np.zeros((n1, n2))
+        xR = np.zeros(lutxp.shape)
+        yR = np.zeros(lutxp.shape)
 
         xR[idx] = np.round(
             (lutxp[idx] + sensorFactor) * (projSamples / sensorFactor) / 2 + 0.5
@@ -1370,20 +2261,20 @@ class CompensableImage(object):
         )
 
         # Check the projected coordinate is in the range of image or not.
-        # If the check passes, the times will be recorded.
+        # If the check passes, the times will be recorded. The index of stack
+        # (if any) is kept.
+        idxProj = np.nonzero(mask)[:-2] + (
+            np.array(yR - 1, dtype=int)[mask],
+            np.array(xR - 1, dtype=int)[mask],
+        )
         if raytrace:
-            for ii, jj in zip(
-                np.array(yR - 1, dtype=int)[mask], np.array(xR - 1, dtype=int)[mask]
-            ):
-                show_lutxyp[ii, jj] += 1
+            np.add.at(show_lutxyp, idxProj, 1)
         else:
-            show_lutxyp[
-                np.array(yR - 1, dtype=int)[mask], np.array(xR - 1, dtype=int)[mask]
-            ] = 1
+            show_lutxyp[idxProj] = 1
 
         return show_lutxyp
 
-    def makeMask(self, inst, model, boundaryT, maskScalingFactorLocal):
+    def makeMask(self, inst, model, boundaryT, maskScalingFactorLocal, maskDtype=int):
         """Get the binary mask which considers the obscuration and off-axis
         correction.
 
@@ -1391,6 +2282,11 @@ class CompensableImage(object):
         pMask: padded mask for use at the offset planes
         cMask: non-padded mask corresponding to aperture
 
+        The masks are kept in a cache shared by all the compensable images.
+        In the "offAxis" model, the field position is rounded to
+        MASK_FIELD_DECIMALS decimals in degree, so that the donuts close to
+        each other share the same masks.
+
         Parameters
         ----------
         inst : Instrument
@@ -1404,11 +2300,85 @@ class CompensableImage(object):
             zero.
         maskScalingFactorLocal : float
             Mask scaling factor (for fast beam) for local correction.
+        maskDtype : type, optional
+            Data type of masks. (the default is int.)
         """
 
-        dimOfDonut = inst.getDimOfDonutOnSensor()
-        self.pMask = np.ones(dimOfDonut, dtype=int)
-        self.cMask = self.pMask.copy()
+        # The masks do not depend on the field position in the "paraxial" and
+        # "onAxis" models
+        if model in ("paraxial", "onAxis"):
+            fieldX = self.fieldX
+            fieldY = self.fieldY
+            fieldKey = None
+        else:
+            fieldX = round(float(self.fieldX), self.MASK_FIELD_DECIMALS)
+            fieldY = round(float(self.fieldY), self.MASK_FIELD_DECIMALS)
+            fieldKey = (fieldX, fieldY)
+
+        # The key only consists of the scalars as _getGeometricMappingKey().
+        # The sensor grid is determined by the dimension of donut and the
+        # sensor factor, and the parameters of off-axis mask are determined
+        # by the instrument directory.
+        key = (
+            model in ("paraxial", "onAxis"),
+            fieldKey,
+            inst.getInstFileDir(),
+            int(inst.getDimOfDonutOnSensor()),
+            float(inst.getSensorFactor()),
+            float(inst.getApertureDiameter()),
+            float(inst.getFocalLength()),
+            float(inst.getDefocalDisOffset()),
+            float(inst.getCamPixelSize()),
+            float(inst.getObscuration()),
+            float(boundaryT),
+            float(maskScalingFactorLocal),
+        )
+
+        pMask, cMask = self._maskCache.getOrCreate(
+            key,
+            lambda: self._calcMask(
+                inst, model, boundaryT, maskScalingFactorLocal, fieldX, fieldY
+            ),
+        )
+
+        self.pMask = pMask.astype(maskDtype)
+        self.cMask = cMask.astype(maskDtype)
+
+    @classmethod
+    def clearMaskCache(cls):
+        """Clear the cache of masks shared by all the compensable images."""
+
+        cls._maskCache.clear()
+
+    def _calcMask(self, inst, model, boundaryT, maskScalingFactorLocal, fieldX, fieldY):
+        """Calculate the binary mask which considers the obscuration and
+        off-axis correction.
+
+        All the mask elements are evaluated in a single broadcast over the
+        sensor grid.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        model : str
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+        boundaryT : int
+            Extended boundary in pixel.
+        maskScalingFactorLocal : float
+            Mask scaling factor (for fast beam) for local correction.
+        fieldX : float
+            X-coordinate of donut on the focal plane in degree.
+        fieldY : float
+            Y-coordinate of donut on the focal plane in degree.
+
+        Returns
+        -------
+        numpy.ndarray[bool]
+            Read-only padded mask for use at the offset planes.
+        numpy.ndarray[bool]
+            Read-only non-padded mask corresponding to aperture.
+        """
 
         apertureDiameter = inst.getApertureDiameter()
         focalLength = inst.getFocalLength()
@@ -1418,49 +2388,37 @@ class CompensableImage(object):
         # Get the mask list
         pixelSize = inst.getCamPixelSize()
         xSensor, ySensor = inst.getSensorCoor()
-        masklist = self.makeMaskList(inst, model)
-        for ii in range(masklist.shape[0]):
-
-            # Distance to center on pupil
-            r = np.sqrt(
-                (xSensor - masklist[ii, 0]) ** 2 + (ySensor - masklist[ii, 1]) ** 2
-            )
-
-            # Find the indices that correspond to the mask element, set them to
-            # the pass/ block boolean
-
-            # Get the index inside the aperature
-            idx = r <= masklist[ii, 2]
-
-            # Get the higher and lower boundary beyond the pupil mask by
-            # extension.
-            # The extension level is dicided by boundaryT.
-            # In fft, this is also the Neuman boundary where the derivative of
-            # the wavefront is set to zero.
-            if masklist[ii, 3] >= 1:
-                aidx = np.nonzero(
-                    r <= masklist[ii, 2] * (1 + boundaryT * pixelSize / rMask)
-                )
-            else:
-                aidx = np.nonzero(
-                    r <= masklist[ii, 2] * (1 - boundaryT * pixelSize / rMask)
-                )
+        masklist = self.makeMaskList(inst, model, fieldX=fieldX, fieldY=fieldY)
+
+        centerX = masklist[:, 0, np.newaxis, np.newaxis]
+        centerY = masklist[:, 1, np.newaxis, np.newaxis]
+        radius = masklist[:, 2, np.newaxis, np.newaxis]
+        isOuter = masklist[:, 3, np.newaxis, np.newaxis] >= 1
+
+        # Distance to center on pupil for all the mask elements
+        r = np.sqrt((xSensor - centerX) ** 2 + (ySensor - centerY) ** 2)
+
+        # Get the higher and lower boundary beyond the pupil mask by
+        # extension.
+        # The extension level is dicided by boundaryT.
+        # In fft, this is also the Neuman boundary where the derivative of
+        # the wavefront is set to zero.
+        extRadius = np.where(
+            isOuter,
+            radius * (1 + boundaryT * pixelSize / rMask),
+            radius * (1 - boundaryT * pixelSize / rMask),
+        )
 
-            # Initialize both mask elements to the opposite of the pass/ block
-            # boolean
-            pMaskii = (1 - int(masklist[ii, 3])) * np.ones(
-                [dimOfDonut, dimOfDonut], dtype=int
-            )
-            cMaskii = pMaskii.copy()
+        # The pixel passes the outer boundary if it is inside, and passes the
+        # inner boundary if it is outside. The common region of all the mask
+        # elements is the mask.
 
-            pMaskii[idx] = int(masklist[ii, 3])
-            cMaskii[aidx] = int(masklist[ii, 3])
+        # padded mask for use at the offset planes
+        pMask = np.all((r <= radius) == isOuter, axis=0)
+        # non-padded mask corresponding to aperture
+        cMask = np.all((r <= extRadius) == isOuter, axis=0)
 
-            # Multiplicatively add the current mask elements to the model
-            # masks.
-            # This is try to find the common mask region.
+        pMask.setflags(write=False)
+        cMask.setflags(write=False)
 
-            # padded mask for use at the offset planes
-            self.pMask = self.pMask * pMaskii
-            # non-padded mask corresponding to aperture
-            self.cMask = self.cMask * cMaskii
+        return pMask, cMask
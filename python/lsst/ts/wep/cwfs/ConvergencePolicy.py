@@ -0,0 +1,238 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+
+import numpy as np
+
+
+class ConvergencePolicy(object):
+    def __init__(
+        self, absTol=None, relTol=None, zkGroups=None, patience=1, maxTimeInSec=None
+    ):
+        """Initialize the convergence policy class of the outer-loop iteration
+        to solve the transport of intensity equation (TIE).
+
+        The iteration is converged if the change of Zk in each group compared
+        with the previous iteration is within the absolute or relative
+        tolerance for the number of consecutive iterations defined by the
+        patience. The iteration is also stopped if the wall-clock time exceeds
+        the maximum time.
+
+        Parameters
+        ----------
+        absTol : float or list[float], optional
+            Absolute tolerance of the maximum change of Zk in each group in
+            nm. If it is a list, the length should be the number of groups.
+            The absolute tolerance is not used if it is None. (the default is
+            None.)
+        relTol : float or list[float], optional
+            Relative tolerance of the maximum change of Zk in each group
+            compared with the maximum absolute value of Zk in the group. If it
+            is a list, the length should be the number of groups. The relative
+            tolerance is not used if it is None. (the default is None.)
+        zkGroups : list[list[int]], optional
+            Groups of Zk in Noll index (e.g. [[4, 5, 6], [7, 8]]). All the
+            terms from z4 are in a single group if it is None. (the default is
+            None.)
+        patience : int, optional
+            Number of consecutive converged iterations to stop the iteration.
+            (the default is 1.)
+        maxTimeInSec : float, optional
+            Maximum wall-clock time of iteration in second. There is no limit
+            if it is None. (the default is None.)
+
+        Raises
+        ------
+        ValueError
+            Both of absTol and relTol are None.
+        ValueError
+            The length of tolerance does not match the number of groups.
+        ValueError
+            The patience is less than 1.
+        ValueError
+            The Noll index in zkGroups is less than 1.
+        """
+
+        if (absTol is None) and (relTol is None):
+            raise ValueError("At least one of absTol and relTol should be set.")
+
+        if int(patience) < 1:
+            raise ValueError("Patience should be >= 1.")
+
+        self._zkGroups = None
+        if zkGroups is not None:
+            self._zkGroups = [np.array(group, dtype=int) for group in zkGroups]
+            for group in self._zkGroups:
+                if np.any(group < 1):
+                    raise ValueError("Noll index of Zk should be >= 1.")
+
+        numOfGroups = 1 if (self._zkGroups is None) else len(self._zkGroups)
+        self._absTol = self._getTolOfGroups(absTol, numOfGroups)
+        self._relTol = self._getTolOfGroups(relTol, numOfGroups)
+
+        self._patience = int(patience)
+        self._maxTimeInSec = maxTimeInSec
+
+        self._numOfConvergedItr = 0
+        self._startTime = None
+
+    def _getTolOfGroups(self, tol, numOfGroups):
+        """Get the tolerance of each group.
+
+        Parameters
+        ----------
+        tol : float, list[float], or None
+            Tolerance.
+        numOfGroups : int
+            Number of groups.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Tolerance of each group.
+
+        Raises
+        ------
+        ValueError
+            The length of tolerance does not match the number of groups.
+        """
+
+        if tol is None:
+            return None
+
+        tolOfGroups = np.array(tol, dtype=float).reshape(-1)
+        if len(tolOfGroups) == 1:
+            return np.full(numOfGroups, tolOfGroups[0])
+        elif len(tolOfGroups) == numOfGroups:
+            return tolOfGroups
+        else:
+            raise ValueError("Length of tolerance should match the number of groups.")
+
+    def getPatience(self):
+        """Get the number of consecutive converged iterations to stop the
+        iteration.
+
+        Returns
+        -------
+        int
+            Patience.
+        """
+
+        return self._patience
+
+    def getMaxTimeInSec(self):
+        """Get the maximum wall-clock time of iteration in second.
+
+        Returns
+        -------
+        float or None
+            Maximum wall-clock time. None means there is no limit.
+        """
+
+        return self._maxTimeInSec
+
+    def start(self):
+        """Start the iteration. The count of converged iterations and clock
+        are reset."""
+
+        self._numOfConvergedItr = 0
+        self._startTime = time.monotonic()
+
+    def isConverged(self, zkPrev, zkCurr):
+        """The iteration is converged or not.
+
+        The count of consecutive converged iterations is updated in each call.
+
+        Parameters
+        ----------
+        zkPrev : numpy.ndarray
+            Zk in nm from z1 in the previous iteration.
+        zkCurr : numpy.ndarray
+            Zk in nm from z1 in the current iteration.
+
+        Returns
+        -------
+        bool
+            True if the iteration is converged for the patience.
+        """
+
+        if self._isConvergedSglItr(np.asarray(zkPrev), np.asarray(zkCurr)):
+            self._numOfConvergedItr += 1
+        else:
+            self._numOfConvergedItr = 0
+
+        return self._numOfConvergedItr >= self._patience
+
+    def _isConvergedSglItr(self, zkPrev, zkCurr):
+        """The Zk in all groups are converged in a single iteration or not.
+
+        Parameters
+        ----------
+        zkPrev : numpy.ndarray
+            Zk in nm from z1 in the previous iteration.
+        zkCurr : numpy.ndarray
+            Zk in nm from z1 in the current iteration.
+
+        Returns
+        -------
+        bool
+            True if all groups are converged.
+        """
+
+        if self._zkGroups is None:
+            groups = [np.arange(4, len(zkCurr) + 1)]
+        else:
+            groups = self._zkGroups
+
+        for idx, group in enumerate(groups):
+            # Ignore the terms that are not solved
+            group = group[group <= len(zkCurr)]
+            if len(group) == 0:
+                continue
+
+            delta = np.max(np.abs(zkCurr[group - 1] - zkPrev[group - 1]))
+
+            isConverged = False
+            if self._absTol is not None:
+                isConverged = delta <= self._absTol[idx]
+            if (not isConverged) and (self._relTol is not None):
+                scale = np.max(np.abs(zkCurr[group - 1]))
+                isConverged = delta <= self._relTol[idx] * scale
+
+            if not isConverged:
+                return False
+
+        return True
+
+    def isTimeOut(self):
+        """The wall-clock time of iteration exceeds the maximum time or not.
+
+        Returns
+        -------
+        bool
+            True if the time is out.
+        """
+
+        if (self._maxTimeInSec is None) or (self._startTime is None):
+            return False
+
+        return (time.monotonic() - self._startTime) >= self._maxTimeInSec
@@ -0,0 +1,339 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import threading
+import numpy as np
+
+from lsst.ts.wep.Utility import CamType, DefocalType
+from lsst.ts.wep.cwfs.DonutTemplateDefault import DonutTemplateDefault
+from lsst.ts.wep.cwfs.DonutTemplateModel import DonutTemplateModel
+from lsst.ts.wep.cwfs.LruCache import LruCache
+
+
+class DonutTemplateBank(DonutTemplateDefault):
+    def __init__(self, maxSize=64, donutTemplate=None):
+        """Initialize the donut template bank class.
+
+        The templates are precomputed by the donut template object and saved
+        in a npz file by makeBank(). After readBank(), the templates are read
+        from the file and kept in a least-recently-used (LRU) cache. The
+        templates not in the file are made by the donut template object.
+
+        Parameters
+        ----------
+        maxSize : int, optional
+            Maximum number of templates kept in the cache. (the default is
+            64.)
+        donutTemplate : Child class of DonutTemplateDefault, optional
+            Donut template object to make the templates. If set to None, the
+            DonutTemplateModel is used. (the default is None.)
+        """
+
+        if donutTemplate is None:
+            donutTemplate = DonutTemplateModel()
+        self._donutTemplate = donutTemplate
+
+        self._cache = LruCache(maxSize=maxSize)
+
+        # Lazily loaded npz file of bank. The access of file is not
+        # thread-safe.
+        self._bankFile = None
+        self._bankFilePath = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def getTemplateKey(
+        sensorName,
+        defocalType,
+        imageSize,
+        camType=CamType.LsstCam,
+        opticalModel="offAxis",
+        pixelScale=0.2,
+    ):
+        """Get the key of template in the bank.
+
+        Parameters
+        ----------
+        sensorName : str
+            The camera detector of template. Should be in "Rxx_Sxx" format.
+        defocalType : enum 'DefocalType'
+            The defocal state of the sensor.
+        imageSize : int
+            Size of template in pixels.
+        camType : enum 'CamType', optional
+            Camera type. (the default is CamType.LsstCam.)
+        opticalModel : str, optional
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+            (the default is "offAxis".)
+        pixelScale : float, optional
+            The pixels to arcseconds conversion factor. (the default is 0.2.)
+
+        Returns
+        -------
+        str
+            Key of template.
+        """
+
+        return "/".join(
+            [
+                CamType(camType).name,
+                sensorName,
+                DefocalType(defocalType).name,
+                str(int(imageSize)),
+                opticalModel,
+                str(float(pixelScale)),
+            ]
+        )
+
+    def makeBank(
+        self,
+        filePath,
+        sensorNameList,
+        defocalTypeList=(DefocalType.Intra, DefocalType.Extra),
+        imageSizeList=(160,),
+        camTypeList=(CamType.LsstCam,),
+        opticalModel="offAxis",
+        pixelScale=0.2,
+    ):
+        """Make the templates of all the combinations of sensor, defocal
+        type, image size, and camera type, and save them in a npz file.
+
+        The binary templates are saved in uint8.
+
+        Parameters
+        ----------
+        filePath : str
+            Path of npz file.
+        sensorNameList : list[str]
+            List of camera detectors. Should be in "Rxx_Sxx" format.
+        defocalTypeList : list[enum 'DefocalType'], optional
+            List of defocal states. (the default is (DefocalType.Intra,
+            DefocalType.Extra).)
+        imageSizeList : list[int], optional
+            List of template sizes in pixels. (the default is (160,).)
+        camTypeList : list[enum 'CamType'], optional
+            List of camera types. (the default is (CamType.LsstCam,).)
+        opticalModel : str, optional
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+            (the default is "offAxis".)
+        pixelScale : float, optional
+            The pixels to arcseconds conversion factor. (the default is 0.2.)
+        """
+
+        templates = dict()
+        for camType in camTypeList:
+            for sensorName in sensorNameList:
+                for defocalType in defocalTypeList:
+                    for imageSize in imageSizeList:
+                        key = self.getTemplateKey(
+                            sensorName,
+                            defocalType,
+                            imageSize,
+                            camType=camType,
+                            opticalModel=opticalModel,
+                            pixelScale=pixelScale,
+                        )
+                        template = self._donutTemplate.makeTemplate(
+                            sensorName,
+                            defocalType,
+                            imageSize,
+                            camType=camType,
+                            opticalModel=opticalModel,
+                            pixelScale=pixelScale,
+                        )
+                        templates[key] = template.astype(np.uint8)
+
+        np.savez_compressed(filePath, **templates)
+
+    def readBank(self, filePath):
+        """Read the npz file of bank made by makeBank().
+
+        The templates are read from the file when needed. The cache of
+        templates is cleared.
+
+        Parameters
+        ----------
+        filePath : str
+            Path of npz file.
+        """
+
+        bankFile = np.load(filePath)
+
+        with self._lock:
+            if self._bankFile is not None:
+                self._bankFile.close()
+
+            self._bankFile = bankFile
+            self._bankFilePath = filePath
+
+        self._cache.clear()
+
+    def getBankFilePath(self):
+        """Get the path of npz file of bank.
+
+        Returns
+        -------
+        str or None
+            Path of npz file. None if no bank is read.
+        """
+
+        return self._bankFilePath
+
+    def getTemplateKeys(self):
+        """Get the keys of templates in the bank.
+
+        Returns
+        -------
+        list[str]
+            Keys of templates. Empty if no bank is read.
+        """
+
+        with self._lock:
+            if self._bankFile is None:
+                return []
+
+            return list(self._bankFile.files)
+
+    def getNumOfCachedTemplates(self):
+        """Get the number of templates in the cache.
+
+        Returns
+        -------
+        int
+            Number of templates.
+        """
+
+        return self._cache.getNumOfEntries()
+
+    def clearCache(self):
+        """Clear the cache of templates."""
+
+        self._cache.clear()
+
+    def makeTemplate(
+        self,
+        sensorName,
+        defocalType,
+        imageSize,
+        camType=CamType.LsstCam,
+        opticalModel="offAxis",
+        pixelScale=0.2,
+    ):
+        """Make the donut template image.
+
+        The template is taken from the cache, the bank, or the donut
+        template object in this order.
+
+        Parameters
+        ----------
+        sensorName : str
+            The camera detector for which we want to make a template. Should
+            be in "Rxx_Sxx" format.
+        defocalType : enum 'DefocalType'
+            The defocal state of the sensor.
+        imageSize : int
+            Size of template in pixels. The template will be a square.
+        camType : enum 'CamType', optional
+            Camera type. (the default is CamType.LsstCam.)
+        opticalModel : str, optional
+            Optical model. It can be "paraxial", "onAxis", or "offAxis".
+            (the default is "offAxis".)
+        pixelScale : float, optional
+            The pixels to arcseconds conversion factor. (the default is 0.2.)
+
+        Returns
+        -------
+        numpy.ndarray [int]
+            The donut template as a binary image.
+        """
+
+        key = self.getTemplateKey(
+            sensorName,
+            defocalType,
+            imageSize,
+            camType=camType,
+            opticalModel=opticalModel,
+            pixelScale=pixelScale,
+        )
+
+        template = self._cache.getOrCreate(
+            key,
+            lambda: self._loadTemplate(
+                key,
+                sensorName,
+                defocalType,
+                imageSize,
+                camType,
+                opticalModel,
+                pixelScale,
+            ),
+        )
+
+        return template.copy()
+
+    def _loadTemplate(
+        self, key, sensorName, defocalType, imageSize, camType, opticalModel, pixelScale
+    ):
+        """Load the template from the bank or make it by the donut template
+        object if it is not in the bank.
+
+        Parameters
+        ----------
+        key : str
+            Key of template.
+        sensorName : str
+            The camera detector of template.
+        defocalType : enum 'DefocalType'
+            The defocal state of the sensor.
+        imageSize : int
+            Size of template in pixels.
+        camType : enum 'CamType'
+            Camera type.
+        opticalModel : str
+            Optical model.
+        pixelScale : float
+            The pixels to arcseconds conversion factor.
+
+        Returns
+        -------
+        numpy.ndarray [int]
+            The donut template as a read-only binary image.
+        """
+
+        template = None
+        with self._lock:
+            if (self._bankFile is not None) and (key in self._bankFile.files):
+                template = self._bankFile[key].astype(int)
+
+        if template is None:
+            template = self._donutTemplate.makeTemplate(
+                sensorName,
+                defocalType,
+                imageSize,
+                camType=camType,
+                opticalModel=opticalModel,
+                pixelScale=pixelScale,
+            )
+
+        template.setflags(write=False)
+
+        return template
@@ -25,11 +25,73 @@ from lsst.ts.wep.Utility import getConfigDir, readPhoSimSettingData, CamType
 from lsst.ts.wep.cwfs.DonutTemplateDefault import DonutTemplateDefault
 from lsst.ts.wep.cwfs.Instrument import Instrument
 from lsst.ts.wep.cwfs.CompensableImage import CompensableImage
+from lsst.ts.wep.cwfs.LruCache import LruCache
 
 
 class DonutTemplateModel(DonutTemplateDefault):
     """Class to make the donut templates from the Instrument model."""
 
+    # Focal plane layouts shared by all the template models
+    _focalPlaneLayoutCache = LruCache(maxSize=2)
+
+    # Configured instruments shared by all the template models. They are
+    # read-only after the configuration.
+    _instCache = LruCache(maxSize=8)
+
+    @classmethod
+    def clearCache(cls):
+        """Clear the caches of focal plane layout and instrument shared by
+        all the template models."""
+
+        cls._focalPlaneLayoutCache.clear()
+        cls._instCache.clear()
+
+    def _getFocalPlaneLayout(self, configDir):
+        """Get the focal plane layout with the cache.
+
+        Parameters
+        ----------
+        configDir : str
+            Configuration directory.
+
+        Returns
+        -------
+        dict
+            Focal plane layout of the sensors.
+        """
+
+        return self._focalPlaneLayoutCache.getOrCreate(
+            configDir,
+            lambda: readPhoSimSettingData(
+                configDir, "focalplanelayout.txt", "fieldCenter"
+            ),
+        )
+
+    def _getInst(self, instDir, camType, imageSize):
+        """Get the configured instrument with the cache.
+
+        Parameters
+        ----------
+        instDir : str
+            Instrument directory.
+        camType : enum 'CamType'
+            Camera type.
+        imageSize : int
+            Size of image in pixels.
+
+        Returns
+        -------
+        Instrument
+            Configured instrument.
+        """
+
+        def _makeInst():
+            inst = Instrument(instDir)
+            inst.config(camType, imageSize)
+            return inst
+
+        return self._instCache.getOrCreate((instDir, camType, imageSize), _makeInst)
+
     def makeTemplate(
         self,
         sensorName,
@@ -65,9 +127,7 @@ class DonutTemplateModel(DonutTemplateDefault):
         """
 
         configDir = getConfigDir()
-        focalPlaneLayout = readPhoSimSettingData(
-            configDir, "focalplanelayout.txt", "fieldCenter"
-        )
+        focalPlaneLayout = self._getFocalPlaneLayout(configDir)
 
         pixelSizeInUm = float(focalPlaneLayout[sensorName][2])
         sizeXinPixel = int(focalPlaneLayout[sensorName][3])
@@ -91,8 +151,7 @@ class DonutTemplateModel(DonutTemplateDefault):
 
         # Load Instrument parameters
         instDir = os.path.join(configDir, "cwfs", "instData")
-        inst = Instrument(instDir)
-        inst.config(camType, imageSize)
+        inst = self._getInst(instDir, camType, imageSize)
 
         # Create image for mask
         img = CompensableImage()
@@ -0,0 +1,190 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.LruCache import LruCache
+
+
+class FftBackendDefault(object):
+    def __init__(self, numOfWorkers=1):
+        """Initialize the default fast Fourier transform (FFT) backend class.
+
+        The backend solves the Poisson's equation of real signal with the
+        real-to-complex FFT. The inverse Laplacian kernel is cached for each
+        FFT dimension and aperture pixel size.
+
+        Parameters
+        ----------
+        numOfWorkers : int, optional
+            Number of workers (threads) used in the FFT. It is ignored if the
+            backend does not support it. (the default is 1.)
+
+        Raises
+        ------
+        ValueError
+            The number of workers is less than 1.
+        """
+
+        if int(numOfWorkers) < 1:
+            raise ValueError("Number of workers should be >= 1.")
+
+        self._numOfWorkers = int(numOfWorkers)
+        self._kernelCache = LruCache(maxSize=4)
+
+    def getNumOfWorkers(self):
+        """Get the number of workers used in the FFT.
+
+        Returns
+        -------
+        int
+            Number of workers.
+        """
+
+        return self._numOfWorkers
+
+    def rfft2(self, signal):
+        """Calculate the 2D real-to-complex FFT.
+
+        Parameters
+        ----------
+        signal : numpy.ndarray
+            Real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Complex spectrum with the shape of (m, n // 2 + 1), where (m, n)
+            is the shape of signal.
+
+        Raises
+        ------
+        NotImplementedError
+            Child class should implement this.
+        """
+
+        raise NotImplementedError("Child class should implement this.")
+
+    def irfft2(self, spectrum, shape):
+        """Calculate the 2D complex-to-real inverse FFT.
+
+        Parameters
+        ----------
+        spectrum : numpy.ndarray
+            Complex spectrum from rfft2().
+        shape : tuple
+            Shape of real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Real signal.
+
+        Raises
+        ------
+        NotImplementedError
+            Child class should implement this.
+        """
+
+        raise NotImplementedError("Child class should implement this.")
+
+    def getInvLaplacianKernel(self, padDim, aperturePixelSize):
+        """Get the inverse Laplacian kernel in the layout of rfft2().
+
+        The kernel is 1 / (-4 * pi^2 * (u^2 + v^2)) based on
+        FT{Delta W} = -4 * pi^2 * (u^2 + v^2) * FT{W}. It is 0 at the origin
+        to remove the offset of wavefront.
+
+        Parameters
+        ----------
+        padDim : int
+            FFT dimension in pixel.
+        aperturePixelSize : float
+            Pixel size on aperture in meter.
+
+        Returns
+        -------
+        numpy.ndarray
+            Kernel with the shape of (padDim, padDim // 2 + 1). The array is
+            read-only.
+        """
+
+        key = (int(padDim), float(aperturePixelSize))
+
+        return self._kernelCache.getOrCreate(
+            key, lambda: self._calcInvLaplacianKernel(int(padDim), aperturePixelSize)
+        )
+
+    def _calcInvLaplacianKernel(self, padDim, aperturePixelSize):
+        """Calculate the inverse Laplacian kernel in the layout of rfft2().
+
+        Parameters
+        ----------
+        padDim : int
+            FFT dimension in pixel.
+        aperturePixelSize : float
+            Pixel size on aperture in meter.
+
+        Returns
+        -------
+        numpy.ndarray
+            Kernel with the shape of (padDim, padDim // 2 + 1). The array is
+            read-only.
+        """
+
+        # Generate the v, u-coordinates on pupil plane
+        v = np.fft.fftfreq(padDim, d=aperturePixelSize)
+        u = np.fft.rfftfreq(padDim, d=aperturePixelSize)
+
+        u2v2 = -4 * (np.pi**2) * (u[np.newaxis, :] ** 2 + v[:, np.newaxis] ** 2)
+
+        # Set origin to Inf to result in 0 at origin after filtering
+        u2v2[0, 0] = np.inf
+
+        kernel = 1.0 / u2v2
+        kernel.flags.writeable = False
+
+        return kernel
+
+    def solvePoissonEq(self, signal, aperturePixelSize):
+        """Solve the Poisson's equation: Delta W = S.
+
+        W is calculated by W = IFT{ FT{S} / (-4 * pi^2 * (u^2 + v^2)) }.
+
+        Parameters
+        ----------
+        signal : numpy.ndarray
+            Real signal S with the shape of (padDim, padDim).
+        aperturePixelSize : float
+            Pixel size on aperture in meter.
+
+        Returns
+        -------
+        numpy.ndarray
+            Wavefront W with the same shape as signal.
+        """
+
+        kernel = self.getInvLaplacianKernel(signal.shape[0], aperturePixelSize)
+
+        spectrum = self.rfft2(signal)
+        spectrum *= kernel
+
+        return self.irfft2(spectrum, signal.shape)
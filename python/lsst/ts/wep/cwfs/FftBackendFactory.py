@@ -0,0 +1,61 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from lsst.ts.wep.Utility import FftBackendType
+from lsst.ts.wep.cwfs.FftBackendNumpy import FftBackendNumpy
+from lsst.ts.wep.cwfs.FftBackendScipy import FftBackendScipy
+from lsst.ts.wep.cwfs.FftBackendPyfftw import FftBackendPyfftw
+
+
+class FftBackendFactory(object):
+    """Factory for creating the fast Fourier transform (FFT) backend object to
+    solve the Poisson's equation."""
+
+    @staticmethod
+    def createFftBackend(fftBackendType, numOfWorkers=1):
+        """Create the FFT backend object.
+
+        Parameters
+        ----------
+        fftBackendType : enum 'FftBackendType'
+            FFT backend to use.
+        numOfWorkers : int, optional
+            Number of workers (threads) used in the FFT. (the default is 1.)
+
+        Returns
+        -------
+        Child class of FftBackendDefault
+            FFT backend object.
+
+        Raises
+        ------
+        ValueError
+            The FFT backend type is not supported.
+        """
+
+        if fftBackendType == FftBackendType.Numpy:
+            return FftBackendNumpy(numOfWorkers=numOfWorkers)
+        elif fftBackendType == FftBackendType.Scipy:
+            return FftBackendScipy(numOfWorkers=numOfWorkers)
+        elif fftBackendType == FftBackendType.Pyfftw:
+            return FftBackendPyfftw(numOfWorkers=numOfWorkers)
+        else:
+            raise ValueError("The %s is not supported." % fftBackendType)
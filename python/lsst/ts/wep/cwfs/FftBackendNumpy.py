@@ -0,0 +1,64 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.FftBackendDefault import FftBackendDefault
+
+
+class FftBackendNumpy(FftBackendDefault):
+    """FftBackendDefault child class to calculate the FFT with numpy.fft. The
+    number of workers is ignored."""
+
+    def rfft2(self, signal):
+        """Calculate the 2D real-to-complex FFT.
+
+        Parameters
+        ----------
+        signal : numpy.ndarray
+            Real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Complex spectrum with the shape of (m, n // 2 + 1), where (m, n)
+            is the shape of signal.
+        """
+
+        return np.fft.rfft2(signal)
+
+    def irfft2(self, spectrum, shape):
+        """Calculate the 2D complex-to-real inverse FFT.
+
+        Parameters
+        ----------
+        spectrum : numpy.ndarray
+            Complex spectrum from rfft2().
+        shape : tuple
+            Shape of real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Real signal.
+        """
+
+        return np.fft.irfft2(spectrum, s=shape)
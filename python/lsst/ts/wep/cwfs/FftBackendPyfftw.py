@@ -0,0 +1,111 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.FftBackendDefault import FftBackendDefault
+from lsst.ts.wep.cwfs.LruCache import LruCache
+
+# The pyFFTW is an optional dependency
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+
+class FftBackendPyfftw(FftBackendDefault):
+    def __init__(self, numOfWorkers=1):
+        """FftBackendDefault child class to calculate the FFT with the plans
+        of FFTW in multiple threads.
+
+        The plans are created once for each shape and reused. The results
+        are copied from the output array of plan, which is overwritten by the
+        next call of the same shape.
+
+        Parameters
+        ----------
+        numOfWorkers : int, optional
+            Number of threads used in the FFT. (the default is 1.)
+
+        Raises
+        ------
+        RuntimeError
+            The pyfftw is not installed.
+        """
+
+        if pyfftw is None:
+            raise RuntimeError("The pyfftw is not installed.")
+
+        super().__init__(numOfWorkers=numOfWorkers)
+
+        self._planCache = LruCache(maxSize=8)
+
+    def rfft2(self, signal):
+        """Calculate the 2D real-to-complex FFT.
+
+        Parameters
+        ----------
+        signal : numpy.ndarray
+            Real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Complex spectrum with the shape of (m, n // 2 + 1), where (m, n)
+            is the shape of signal.
+        """
+
+        plan = self._planCache.getOrCreate(
+            ("rfft2", signal.shape),
+            lambda: pyfftw.builders.rfft2(
+                np.empty(signal.shape), threads=self._numOfWorkers
+            ),
+        )
+
+        return plan(signal).copy()
+
+    def irfft2(self, spectrum, shape):
+        """Calculate the 2D complex-to-real inverse FFT.
+
+        Parameters
+        ----------
+        spectrum : numpy.ndarray
+            Complex spectrum from rfft2().
+        shape : tuple
+            Shape of real signal.
+
+        Returns
+        -------
+        numpy.ndarray
+            Real signal.
+        """
+
+        shape = tuple(shape)
+        plan = self._planCache.getOrCreate(
+            ("irfft2", shape),
+            lambda: pyfftw.builders.irfft2(
+                np.empty(spectrum.shape, dtype=complex),
+                s=shape,
+                threads=self._numOfWorkers,
+            ),
+        )
+
+        return plan(spectrum).copy()
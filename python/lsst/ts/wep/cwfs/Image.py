@@ -44,6 +44,11 @@ class Image(object):
 
         self._centroidFind = CentroidFindFactory.createCentroidFind(centroidFindType)
 
+        # Binary image and centroid data of the current image. They are reset
+        # in setImg() and updateImage().
+        self._imgBinary = None
+        self._centerAndR = None
+
     def getCentroidFind(self):
         """Get the centroid find object.
 
@@ -97,6 +102,14 @@ class Image(object):
                 self.image = self._readImgFile(imageFile)
                 self.imageFilePath = imageFile
 
+        self._resetCentroidData()
+
+    def _resetCentroidData(self):
+        """Reset the cached binary image and centroid data."""
+
+        self._imgBinary = None
+        self._centerAndR = None
+
     def _readImgFile(self, imageFile):
         """Read the donut image.
 
@@ -128,6 +141,9 @@ class Image(object):
     def updateImage(self, image):
         """Update the image of donut.
 
+        The cached binary image and centroid data are reset. Call this
+        function after changing the image in place as well.
+
         Parameters
         ----------
         image : numpy.ndarray
@@ -141,14 +157,36 @@ class Image(object):
             )
         else:
             self.image = image
+            self._resetCentroidData()
+
+    def getImgBinary(self):
+        """Get the binary image of donut.
+
+        The binary image is calculated once for the current image.
+
+        Returns
+        -------
+        numpy.ndarray [int]
+            Read-only binary image of donut.
+        """
+
+        if self._imgBinary is None:
+            imgBinary = self._centroidFind.getImgBinary(self.image)
+            imgBinary.setflags(write=False)
+            self._imgBinary = imgBinary
+
+        return self._imgBinary
 
     def getCenterAndR(self, image=None):
         """Get the centroid data.
 
+        The centroid data of the current image are calculated once.
+
         Parameters
         ----------
         image : numpy.ndarray, optional
-            Image to do the analysis. (the default is None.)
+            Image to do the analysis. If None, the current image is used. (the
+            default is None.)
 
         Returns
         -------
@@ -160,12 +198,13 @@ class Image(object):
             Effective weighting radius.
         """
 
-        if image is not None:
-            imgDonut = image
-        else:
-            imgDonut = self.image
+        if (image is not None) and (image is not self.image):
+            return self._centroidFind.getCenterAndR(image)
+
+        if self._centerAndR is None:
+            self._centerAndR = tuple(self._centroidFind.getCenterAndR(self.image))
 
-        return self._centroidFind.getCenterAndR(imgDonut)
+        return self._centerAndR
 
     def getSNR(self):
         """Get the signal to noise ratio of donut.
@@ -177,8 +216,7 @@ class Image(object):
         """
 
         # Get the signal binary image
-        imgBinary = self._centroidFind.getImgBinary(self.image)
-        realcx, realcy, realR = self._centroidFind.getCenterAndRfromImgBinary(imgBinary)
+        imgBinary = self.getImgBinary()
 
         # Get the background binary img
         bgBinary = 1 - imgBinary
@@ -23,6 +23,7 @@ import os
 import numpy as np
 
 from lsst.ts.wep.ParamReader import ParamReader
+from lsst.ts.wep.cwfs.RadialInterpTable import RadialInterpTable
 from lsst.ts.wep.Utility import CamType
 
 
@@ -44,6 +45,9 @@ class Instrument(object):
         self.instParamFile = ParamReader()
         self.maskParamFile = ParamReader()
 
+        # Table of mask off-axis correction over the field radius
+        self._maskParamTable = None
+
         self.xSensor = np.array([])
         self.ySensor = np.array([])
 
@@ -92,6 +96,8 @@ class Instrument(object):
         if os.path.exists(maskParamFilePath):
             self.maskParamFile.setFilePath(maskParamFilePath)
 
+        self._maskParamTable = None
+
         self._setSensorCoor()
         self._setSensorCoorAnnular()
 
@@ -210,6 +216,37 @@ class Instrument(object):
 
         return self.maskParamFile.getMatContent()
 
+    def getMaskParamTable(self):
+        """Get the table of mask off-axis correction over the field radius.
+
+        The table is built at the first call after the configuration.
+
+        Returns
+        -------
+        RadialInterpTable
+            Table of mask off-axis correction. The parameters are 'ca', 'ra',
+            'cb', and 'rb' coefficients.
+
+        Raises
+        ------
+        ValueError
+            No mask off-axis correction of instrument.
+        """
+
+        if self._maskParamTable is None:
+            maskParam = self.getMaskOffAxisCorr()
+            if maskParam.ndim != 2:
+                raise ValueError(
+                    "No mask off-axis correction of instrument (%s)." % self.instName
+                )
+
+            # Get the ruler, which is the distance to center
+            # ruler is between 1.51 and 1.84 degree here
+            ruler = np.sqrt(2) * maskParam[:, 0]
+            self._maskParamTable = RadialInterpTable(ruler, maskParam[:, 1:])
+
+        return self._maskParamTable
+
     def getDimOfDonutOnSensor(self):
         """Get the dimension of donut image size on sensor in pixel.
 
@@ -0,0 +1,192 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+from collections import OrderedDict
+
+
+class LruCache(object):
+    def __init__(self, maxSize=8):
+        """Initialize the least-recently-used (LRU) cache class.
+
+        The cache is thread-safe. When the number of entries exceeds the
+        maximum size, the least recently used entry is evicted.
+
+        Parameters
+        ----------
+        maxSize : int, optional
+            Maximum number of entries kept in the cache. (the default is 8.)
+
+        Raises
+        ------
+        ValueError
+            The maximum size is less than 1.
+        """
+
+        if int(maxSize) < 1:
+            raise ValueError("Maximum size of cache should be >= 1.")
+
+        self._maxSize = int(maxSize)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def getMaxSize(self):
+        """Get the maximum number of entries kept in the cache.
+
+        Returns
+        -------
+        int
+            Maximum number of entries.
+        """
+
+        return self._maxSize
+
+    def setMaxSize(self, maxSize):
+        """Set the maximum number of entries kept in the cache.
+
+        The least recently used entries are evicted if needed.
+
+        Parameters
+        ----------
+        maxSize : int
+            Maximum number of entries.
+
+        Raises
+        ------
+        ValueError
+            The maximum size is less than 1.
+        """
+
+        if int(maxSize) < 1:
+            raise ValueError("Maximum size of cache should be >= 1.")
+
+        with self._lock:
+            self._maxSize = int(maxSize)
+            self._evict()
+
+    def getNumOfEntries(self):
+        """Get the number of entries in the cache.
+
+        Returns
+        -------
+        int
+            Number of entries.
+        """
+
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Get the value of key and mark it as the most recently used one.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of entry.
+        default : object, optional
+            Value returned if the key is not in the cache. (the default is
+            None.)
+
+        Returns
+        -------
+        object
+            Value of entry.
+        """
+
+        with self._lock:
+            if key not in self._data:
+                return default
+
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        """Put the value of key into the cache.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of entry.
+        value : object
+            Value of entry.
+        """
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def getOrCreate(self, key, creator):
+        """Get the value of key. Create and put it into the cache if the key
+        does not exist.
+
+        The creator is called outside of the lock. If two threads miss the
+        same key at the same time, the value put first is kept and returned
+        to both.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of entry.
+        creator : callable
+            Function without argument to create the value.
+
+        Returns
+        -------
+        object
+            Value of entry.
+        """
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        value = creator()
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+            self._data[key] = value
+            self._evict()
+
+            return value
+
+    def clear(self):
+        """Remove all entries in the cache."""
+
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+
+        with self._lock:
+            return key in self._data
+
+    def _evict(self):
+        """Evict the least recently used entries to fit the maximum size.
+
+        The lock should be held by the caller.
+        """
+
+        while len(self._data) > self._maxSize:
+            self._data.popitem(last=False)
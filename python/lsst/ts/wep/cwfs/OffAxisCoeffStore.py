@@ -0,0 +1,176 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import re
+import threading
+import numpy as np
+
+from lsst.ts.wep.ParamReader import ParamReader
+from lsst.ts.wep.cwfs.RadialInterpTable import RadialInterpTable
+
+
+class OffAxisCoeffStore(object):
+
+    # Configurations of off-axis correction in the order of x, y-projection of
+    # intra- and extra-image
+    CONFIG_LIST = ("cxin", "cyin", "cxex", "cyex")
+
+    def __init__(self):
+        """Initialize the store of off-axis correction coefficients.
+
+        The coefficient files in the instrument directory are read once and
+        kept as the read-only numpy arrays together with their tables over the
+        field radius. The store is thread-safe.
+        """
+
+        self._data = dict()
+        self._tables = dict()
+        self._lock = threading.Lock()
+
+    def getNumOfEntries(self):
+        """Get the number of instrument directories in the store.
+
+        Returns
+        -------
+        int
+            Number of instrument directories.
+        """
+
+        return len(self._data)
+
+    def clear(self):
+        """Remove all the coefficients in the store."""
+
+        with self._lock:
+            self._data.clear()
+            self._tables.clear()
+
+    def getCorrData(self, instDir):
+        """Get the data of off-axis correction in the instrument directory.
+
+        The files are read at the first call of each instrument directory.
+
+        Parameters
+        ----------
+        instDir : str
+            Instrument parameter file directory.
+
+        Returns
+        -------
+        tuple[numpy.ndarray]
+            Read-only data of off-axis correction of "cxin", "cyin", "cxex",
+            and "cyex" files. In each data, the element of [0, 0] is the
+            defocal distance in m, the columns of [:, 1:3] are the field
+            position, and the others are the coefficients of polynomials.
+        """
+
+        key = os.path.abspath(instDir)
+
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = self._readCorrData(key)
+
+            return self._data[key]
+
+    def getCorrTables(self, instDir):
+        """Get the tables of off-axis correction coefficients over the field
+        radius in the instrument directory.
+
+        The tables are built at the first call of each instrument directory.
+
+        Parameters
+        ----------
+        instDir : str
+            Instrument parameter file directory.
+
+        Returns
+        -------
+        tuple[RadialInterpTable]
+            Tables of off-axis correction coefficients of "cxin", "cyin",
+            "cxex", and "cyex" files.
+        """
+
+        key = os.path.abspath(instDir)
+        corrData = self.getCorrData(key)
+
+        with self._lock:
+            if key not in self._tables:
+                corrTables = []
+                for cdata in corrData:
+                    # Get the ruler, which is the distance to center
+                    # ruler is between 1.51 and 1.84 degree here
+                    ruler = np.sqrt(cdata[:, 1] ** 2 + cdata[:, 2] ** 2)
+                    corrTables.append(RadialInterpTable(ruler, cdata[:, 3:]))
+
+                self._tables[key] = tuple(corrTables)
+
+            return self._tables[key]
+
+    def _readCorrData(self, instDir):
+        """Read the data of off-axis correction in the instrument directory.
+
+        Parameters
+        ----------
+        instDir : str
+            Instrument parameter file directory.
+
+        Returns
+        -------
+        tuple[numpy.ndarray]
+            Read-only data of off-axis correction of "cxin", "cyin", "cxex",
+            and "cyex" files.
+
+        Raises
+        ------
+        ValueError
+            The file of off-axis correction does not exist.
+        """
+
+        # Get all files in the directory
+        fileList = [
+            f for f in os.listdir(instDir) if os.path.isfile(os.path.join(instDir, f))
+        ]
+
+        corrData = []
+        for config in self.CONFIG_LIST:
+
+            # Construct the configuration file name
+            matchFileName = None
+            for fileName in fileList:
+                m = re.match(r"\S*%s\S*.yaml" % config, fileName)
+                if m is not None:
+                    matchFileName = m.group()
+                    break
+
+            if matchFileName is None:
+                raise ValueError(
+                    "No off-axis correction file of '%s' in %s." % (config, instDir)
+                )
+
+            paramReader = ParamReader(filePath=os.path.join(instDir, matchFileName))
+            cdata = paramReader.getMatContent().astype(float)
+            cdata.setflags(write=False)
+
+            corrData.append(cdata)
+
+        return tuple(corrData)
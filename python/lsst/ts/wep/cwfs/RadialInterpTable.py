@@ -0,0 +1,136 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+
+class RadialInterpTable(object):
+    def __init__(self, ruler, parameters):
+        """Initialize the table of parameters linearly interpolated over the
+        field radius.
+
+        The referenced parameters are sorted by the radius once, so that each
+        query only needs to find the bracketing radii. The parameters out of
+        the range of radius take the values at the nearest boundary.
+
+        Parameters
+        ----------
+        ruler : numpy.ndarray
+            A series of radius with the available parameters.
+        parameters : numpy.ndarray
+            Referenced parameters. Each row corresponds to the radius in ruler.
+
+        Raises
+        ------
+        ValueError
+            The shapes of ruler and parameters do not match.
+        """
+
+        ruler = np.asarray(ruler, dtype=float)
+        parameters = np.asarray(parameters, dtype=float)
+        if (
+            ruler.ndim != 1
+            or len(ruler) == 0
+            or parameters.ndim != 2
+            or parameters.shape[0] != len(ruler)
+        ):
+            raise ValueError(
+                "The shapes of ruler %s and parameters %s do not match."
+                % (ruler.shape, parameters.shape)
+            )
+
+        # Sort the ruler and parameters based on the magnitude of ruler
+        sortIndex = np.argsort(ruler)
+        self._ruler = ruler[sortIndex]
+        self._parameters = parameters[sortIndex, :]
+
+        self._ruler.setflags(write=False)
+        self._parameters.setflags(write=False)
+
+    def getRuler(self):
+        """Get the sorted radius of table.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted radius.
+        """
+
+        return self._ruler
+
+    def getParameters(self):
+        """Get the referenced parameters sorted by the radius.
+
+        Returns
+        -------
+        numpy.ndarray
+            Referenced parameters.
+        """
+
+        return self._parameters
+
+    def interp(self, fieldDist):
+        """Get the parameters at the field radius by the linear
+        approximation.
+
+        Parameters
+        ----------
+        fieldDist : float or numpy.ndarray
+            Field distance from donut to origin (aperature). The array of
+            distances is interpolated at once.
+
+        Returns
+        -------
+        numpy.ndarray
+            Fitted parameters based on the linear approximation. The shape is
+            fieldDist.shape + (number of parameters,).
+        """
+
+        ruler = self._ruler
+        parameters = self._parameters
+        fieldDist = np.asarray(fieldDist, dtype=float)
+
+        # Find the boundary of fieldDist in the known data
+        p2 = np.minimum(np.searchsorted(ruler, fieldDist, side="left"), len(ruler) - 1)
+        p1 = p2 - 1
+
+        # Calculate the weighting ratio. The denominator is zero if there is
+        # only one radius, which only happens to the values out of range.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w1 = (ruler[p2] - fieldDist) / (ruler[p2] - ruler[p1])
+
+        # fieldDist is too big and out of range. Take the coefficients in the
+        # highest boundary.
+        isTooBig = fieldDist > ruler[-1]
+        p1 = np.where(isTooBig, 0, p1)
+        w1 = np.where(isTooBig, 0.0, w1)
+
+        # fieldDist is too small to be in the range. Take the coefficients in
+        # the lowest boundary.
+        isTooSmall = fieldDist < ruler[0]
+        p1 = np.where(isTooSmall, 0, p1)
+        w1 = np.where(isTooSmall, 1.0, w1)
+
+        w1 = w1[..., np.newaxis]
+        w2 = 1 - w1
+
+        return w1 * parameters[p1, :] + w2 * parameters[p2, :]
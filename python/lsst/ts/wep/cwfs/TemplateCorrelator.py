@@ -0,0 +1,152 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+from scipy.fft import next_fast_len
+
+from lsst.ts.wep.cwfs.LruCache import LruCache
+
+
+class TemplateCorrelator(object):
+    def __init__(self, template, maxNumOfSpectra=8):
+        """Initialize the template correlator class.
+
+        The cross-correlation with the template is calculated by the FFT. The
+        spectrum of template is calculated once for each image shape and
+        reused for all the images with the same shape, e.g. the postage
+        stamps of donuts on a CCD or the whole CCD image.
+
+        Parameters
+        ----------
+        template : numpy.ndarray
+            2D template image.
+        maxNumOfSpectra : int, optional
+            Maximum number of template spectra (one per image shape) kept in
+            the cache. (the default is 8.)
+
+        Raises
+        ------
+        ValueError
+            The template is not a 2D array.
+        """
+
+        template = np.array(template)
+        if template.ndim != 2:
+            raise ValueError("Template should be a 2D array.")
+
+        template.setflags(write=False)
+        self._template = template
+
+        self._spectrumCache = LruCache(maxSize=maxNumOfSpectra)
+
+    def getTemplate(self):
+        """Get the template image.
+
+        Returns
+        -------
+        numpy.ndarray
+            Template image (read-only).
+        """
+
+        return self._template
+
+    def getNumOfSpectra(self):
+        """Get the number of template spectra in the cache.
+
+        Returns
+        -------
+        int
+            Number of template spectra.
+        """
+
+        return self._spectrumCache.getNumOfEntries()
+
+    def correlate(self, image):
+        """Calculate the cross-correlation of image with the template.
+
+        This is the same as scipy.signal.correlate(image, template,
+        mode="same") up to the rounding error of FFT. The result is rounded
+        if both the image and template are integers.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            2D image.
+
+        Returns
+        -------
+        numpy.ndarray
+            Cross-correlation with the same shape as the image.
+
+        Raises
+        ------
+        ValueError
+            The image is not a 2D array.
+        """
+
+        image = np.asarray(image)
+        if image.ndim != 2:
+            raise ValueError("Image should be a 2D array.")
+
+        fullShape = np.add(image.shape, self._template.shape) - 1
+        fftShape = tuple(next_fast_len(int(dim), real=True) for dim in fullShape)
+
+        corr = np.fft.irfft2(
+            np.fft.rfft2(image, s=fftShape) * self._getSpectrum(fftShape),
+            s=fftShape,
+        )
+
+        # Crop the center of full correlation as the "same" mode
+        start = (fullShape - image.shape) // 2
+        corr = corr[
+            start[0] : start[0] + image.shape[0], start[1] : start[1] + image.shape[1]
+        ]
+
+        resultType = np.result_type(image, self._template)
+        if resultType.kind in ("u", "i"):
+            corr = np.around(corr)
+
+        return corr.astype(resultType, copy=False)
+
+    def _getSpectrum(self, fftShape):
+        """Get the spectrum of template with the cache.
+
+        The template is reversed, so the product of spectra is the
+        cross-correlation.
+
+        Parameters
+        ----------
+        fftShape : tuple
+            Shape of FFT.
+
+        Returns
+        -------
+        numpy.ndarray
+            Spectrum of reversed template (read-only).
+        """
+
+        def _calcSpectrum():
+            spectrum = np.fft.rfft2(self._template[::-1, ::-1], s=fftShape)
+            spectrum.setflags(write=False)
+            return spectrum
+
+        return self._spectrumCache.getOrCreate(fftShape, _calcSpectrum)
@@ -24,7 +24,44 @@ import numpy as np
 from lsst.ts.wep.cwfs import mathcwfs
 
 
-def ZernikeAnnularEval(z, x, y, e, nMax=28):
+def setNumOfThreads(numOfThreads):
+    """Set the number of threads used in the evaluation of annular Zernike
+    polynomials and related functions in mathcwfs.
+
+    The evaluation releases the GIL and splits the points among the threads.
+    Small arrays are always evaluated in a single thread.
+
+    Parameters
+    ----------
+    numOfThreads : int
+        Number of threads. The number of hardware threads is used if it is 0.
+
+    Raises
+    ------
+    ValueError
+        The number of threads is negative.
+    """
+
+    if int(numOfThreads) < 0:
+        raise ValueError("Number of threads should be >= 0.")
+
+    mathcwfs.setNumOfThreads(int(numOfThreads))
+
+
+def getNumOfThreads():
+    """Get the number of threads used in the evaluation of annular Zernike
+    polynomials and related functions in mathcwfs.
+
+    Returns
+    -------
+    int
+        Number of threads.
+    """
+
+    return mathcwfs.getNumOfThreads()
+
+
+def ZernikeAnnularEval(z, x, y, e, nMax=28, out=None):
     """Calculate the wavefront surface in the basis of annular Zernike
     polynomial.
 
@@ -40,6 +77,10 @@ def ZernikeAnnularEval(z, x, y, e, nMax=28):
         Obscuration value. It is 0.61 in LSST.
     nMax : int, optional
         Maximum number of Zernike terms. (the default is 28.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of x. A new array is allocated if it is None. (the
+        default is None.)
 
     Returns
     -------
@@ -51,7 +92,66 @@ def ZernikeAnnularEval(z, x, y, e, nMax=28):
     z = _checkPrecondition(z, x, y, int(nMax))
 
     # Calculate the wavefront
-    return mathcwfs.zernikeAnnularEval(z, x.flatten(), y.flatten(), e).reshape(x.shape)
+    return mathcwfs.zernikeAnnularEval(z, x, y, e, out=out)
+
+
+def ZernikeAnnularEvalBasis(x, y, e, numTerms=28, out=None):
+    """Evaluate the basis of annular Zernike polynomials.
+
+    The ith basis is the wavefront surface with the coefficient of ith term to
+    be 1 and the others to be 0. All terms are calculated in a single call.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        X coordinate on pupil plane.
+    y : numpy.ndarray
+        Y coordinate on pupil plane.
+    e : float
+        Obscuration value. It is 0.61 in LSST.
+    numTerms : int, optional
+        Number of Zernike terms. It should be <= 28. (the default is 28.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of numTerms * x.size. A new array is allocated if it is
+        None. (the default is None.)
+
+    Returns
+    -------
+    numpy.ndarray
+        Basis with the shape of (numTerms, *x.shape).
+
+    Raises
+    ------
+    ValueError
+        The shapes of x and y are different.
+    ValueError
+        The number of terms is not supported.
+    """
+
+    _checkShape(x, y)
+
+    return mathcwfs.zernikeAnnularEvalBasis(x, y, e, int(numTerms), out=out)
+
+
+def _checkShape(x, y):
+    """Check the shapes of x and y are the same.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        X coordinate on pupil plane.
+    y : numpy.ndarray
+        Y coordinate on pupil plane.
+
+    Raises
+    ------
+    ValueError
+        The shapes of x and y are different.
+    """
+
+    if x.shape != y.shape:
+        raise ValueError("x & y are not the same size.")
 
 
 def _checkPrecondition(z, x, y, nMax):
@@ -72,7 +172,8 @@ def _checkPrecondition(z, x, y, nMax):
     Returns
     -------
     numpy.ndarray
-        Coefficient of Zernike polynomials.
+        Coefficient of Zernike polynomials. The higher order terms not in z
+        are treated as zero in mathcwfs and are not padded.
     """
 
     # Check the dimensions of x and y are the same or not
@@ -86,15 +187,11 @@ def _checkPrecondition(z, x, y, nMax):
             "Some Zernike related functions are not implemented with >%d terms." % nMax
         )
         return
-    elif len(z) < nMax:
-        # Put the higher order terms as zero to make sure nMax terms of
-        # polynomials
-        z = np.hstack((z, np.zeros(nMax - len(z))))
 
     return z
 
 
-def ZernikeAnnularGrad(z, x, y, e, axis, nMax=22):
+def ZernikeAnnularGrad(z, x, y, e, axis, nMax=22, out=None):
     """Evaluate the gradident of annular Zernike polynomials in a certain
     direction.
 
@@ -112,6 +209,10 @@ def ZernikeAnnularGrad(z, x, y, e, axis, nMax=22):
         It can be "dx", "dy", "dx2", "dy2", or "dxy".
     nMax : int, optional
         Maximum number of Zernike terms. (the default is 22.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of x. A new array is allocated if it is None. (the
+        default is None.)
 
     Returns
     -------
@@ -123,12 +224,52 @@ def ZernikeAnnularGrad(z, x, y, e, axis, nMax=22):
     z = _checkPrecondition(z, x, y, int(nMax))
 
     # Calculate the integration elements
-    return mathcwfs.zernikeAnnularGrad(z, x.flatten(), y.flatten(), e, axis).reshape(
-        x.shape
-    )
+    return mathcwfs.zernikeAnnularGrad(z, x, y, e, axis, out=out)
+
+
+def ZernikeAnnularGradBasis(x, y, e, axis, numTerms=22, out=None):
+    """Evaluate the basis of the gradident of annular Zernike polynomials in a
+    certain direction.
+
+    The ith basis is the gradient with the coefficient of ith term to be 1 and
+    the others to be 0. All terms are calculated in a single call.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        X coordinate on pupil plane.
+    y : numpy.ndarray
+        Y coordinate on pupil plane.
+    e : float
+        Obscuration value. It is 0.61 in LSST.
+    axis : str
+        It can be "dx", "dy", "dx2", "dy2", or "dxy".
+    numTerms : int, optional
+        Number of Zernike terms. It should be <= 22. (the default is 22.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of numTerms * x.size. A new array is allocated if it is
+        None. (the default is None.)
+
+    Returns
+    -------
+    numpy.ndarray
+        Basis with the shape of (numTerms, *x.shape).
+
+    Raises
+    ------
+    ValueError
+        The shapes of x and y are different.
+    ValueError
+        The axis or number of terms is not supported.
+    """
+
+    _checkShape(x, y)
+
+    return mathcwfs.zernikeAnnularGradBasis(x, y, e, axis, int(numTerms), out=out)
 
 
-def ZernikeAnnularJacobian(z, x, y, e, order, nMax=22):
+def ZernikeAnnularJacobian(z, x, y, e, order, nMax=22, out=None):
     """Evaluate the Jacobian of annular Zernike polynomials in a certain order.
 
     Parameters
@@ -145,6 +286,10 @@ def ZernikeAnnularJacobian(z, x, y, e, order, nMax=22):
         Order of Jocobian Matrix. It can be "1st" or "2nd".
     nMax : int, optional
         Maximum number of Zernike terms. (the default is 22.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of x. A new array is allocated if it is None. (the
+        default is None.)
 
     Returns
     -------
@@ -156,9 +301,50 @@ def ZernikeAnnularJacobian(z, x, y, e, order, nMax=22):
     z = _checkPrecondition(z, x, y, int(nMax))
 
     # Calculate the Jacobian
-    return mathcwfs.zernikeAnnularJacobian(
-        z, x.flatten(), y.flatten(), e, order
-    ).reshape(x.shape)
+    return mathcwfs.zernikeAnnularJacobian(z, x, y, e, order, out=out)
+
+
+def ZernikeAnnularJacobianBasis(x, y, e, order, numTerms=22, out=None):
+    """Evaluate the basis of the Jacobian of annular Zernike polynomials in a
+    certain order.
+
+    The "1st" Jacobian is the sum of z[i] * basis[i] and the "2nd" Jacobian is
+    the sum of z[i]**2 * basis[i], where z is the coefficient of annular
+    Zernike polynomials. All terms are calculated in a single call.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        X coordinate on pupil plane.
+    y : numpy.ndarray
+        Y coordinate on pupil plane.
+    e : float
+        Obscuration value. It is 0.61 in LSST.
+    order : str
+        Order of Jocobian Matrix. It can be "1st" or "2nd".
+    numTerms : int, optional
+        Number of Zernike terms. It should be <= 22. (the default is 22.)
+    out : numpy.ndarray, optional
+        Output buffer. It should be a writeable C-contiguous float64 array
+        with the size of numTerms * x.size. A new array is allocated if it is
+        None. (the default is None.)
+
+    Returns
+    -------
+    numpy.ndarray
+        Basis with the shape of (numTerms, *x.shape).
+
+    Raises
+    ------
+    ValueError
+        The shapes of x and y are different.
+    ValueError
+        The order or number of terms is not supported.
+    """
+
+    _checkShape(x, y)
+
+    return mathcwfs.zernikeAnnularJacobianBasis(x, y, e, order, int(numTerms), out=out)
 
 
 def ZernikeAnnularFit(s, x, y, numTerms, e, nMax=28):
@@ -184,6 +370,11 @@ def ZernikeAnnularFit(s, x, y, numTerms, e, nMax=28):
     -------
     numpy.ndarray
         Coefficients of annular Zernike polynomials by the fitting.
+
+    Raises
+    ------
+    ValueError
+        The number of terms is more than the maximum.
     """
 
     # Check the dimensions of x and y are the same or not
@@ -202,15 +393,14 @@ def ZernikeAnnularFit(s, x, y, numTerms, e, nMax=28):
     yFinite = yFinite[finiteIndex]
 
     # Do the fitting
-    h = np.zeros([len(sFinite), numTerms])
-
-    for ii in range(numTerms):
-        z = np.zeros(numTerms)
-        z[ii] = 1
-        h[:, ii] = ZernikeAnnularEval(z, xFinite, yFinite, e, nMax=nMax)
+    if numTerms > nMax:
+        raise ValueError(
+            "Some Zernike related functions are not implemented with >%d terms." % nMax
+        )
+    h = ZernikeAnnularEvalBasis(xFinite, yFinite, e, numTerms=numTerms).T
 
     # Solve the equation: H*Z = S => Z = H^(-1)S
-    z = np.linalg.lstsq(h, s, rcond=None)[0]
+    z = np.linalg.lstsq(h, sFinite, rcond=None)[0]
 
     return z
 
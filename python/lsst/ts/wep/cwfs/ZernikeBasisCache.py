@@ -0,0 +1,272 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.LruCache import LruCache
+from lsst.ts.wep.cwfs.Tool import ZernikeAnnularEvalBasis, ZernikeAnnularGradBasis
+
+
+class ZernikeBasisCache(object):
+
+    # Supported basis types. "eval" is the annular Zernike polynomial itself
+    # and the others are the derivatives used in ZernikeAnnularGrad().
+    BASIS_TYPES = ("eval", "dx", "dy", "dx2", "dy2", "dxy")
+
+    def __init__(self, maxSize=4):
+        """Initialize the annular Zernike basis cache class.
+
+        The basis is the stack of annular Zernike polynomials (or their
+        derivatives) evaluated term by term on the sensor grid of instrument.
+        It only depends on the instrument configuration, obscuration, and
+        number of terms, and is shared by all donuts.
+
+        Parameters
+        ----------
+        maxSize : int, optional
+            Maximum number of instrument configurations kept in the cache. The
+            least recently used one is evicted. (the default is 4.)
+        """
+
+        self._cache = LruCache(maxSize=maxSize)
+        self._originCache = LruCache(maxSize=maxSize)
+
+    def getMaxSize(self):
+        """Get the maximum number of instrument configurations kept in the
+        cache.
+
+        Returns
+        -------
+        int
+            Maximum number of instrument configurations.
+        """
+
+        return self._cache.getMaxSize()
+
+    def getNumOfEntries(self):
+        """Get the number of instrument configurations in the cache.
+
+        Returns
+        -------
+        int
+            Number of instrument configurations.
+        """
+
+        return self._cache.getNumOfEntries()
+
+    def clear(self):
+        """Clear the cache."""
+
+        self._cache.clear()
+        self._originCache.clear()
+
+    def getBasis(self, inst, numTerms, obscuration, basisType="eval"):
+        """Get the basis of annular Zernike polynomials on the sensor grid.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        numTerms : int
+            Number of annular Zernike terms.
+        obscuration : float
+            Obscuration of annular Zernike polynomials.
+        basisType : str, optional
+            Basis type. It can be "eval", "dx", "dy", "dx2", "dy2", or "dxy".
+            (the default is "eval".)
+
+        Returns
+        -------
+        numpy.ndarray
+            Basis with the shape of (numTerms, dim, dim), where the dim is the
+            dimension of donut on sensor. The array is read-only.
+
+        Raises
+        ------
+        ValueError
+            The basis type is not supported.
+        """
+
+        self._checkBasisType(basisType)
+
+        key = self._getKey(inst, numTerms, obscuration)
+        entry = self._cache.getOrCreate(key, dict)
+
+        basis = entry.get(basisType)
+        if basis is None:
+            xSensor, ySensor = inst.getSensorCoor()
+            basis = self._calcBasis(xSensor, ySensor, numTerms, obscuration, basisType)
+            entry[basisType] = basis
+
+        return basis
+
+    def getBasisOnOrigin(self, numTerms, obscuration, basisType="eval"):
+        """Get the values of annular Zernike basis at the origin of pupil.
+
+        This is useful to replace the basis outside of a mask, where the
+        coordinate is set to be 0.
+
+        Parameters
+        ----------
+        numTerms : int
+            Number of annular Zernike terms.
+        obscuration : float
+            Obscuration of annular Zernike polynomials.
+        basisType : str, optional
+            Basis type. It can be "eval", "dx", "dy", "dx2", "dy2", or "dxy".
+            (the default is "eval".)
+
+        Returns
+        -------
+        numpy.ndarray
+            Basis values with the shape of (numTerms,).
+
+        Raises
+        ------
+        ValueError
+            The basis type is not supported.
+        """
+
+        self._checkBasisType(basisType)
+
+        key = (int(numTerms), float(obscuration))
+        entry = self._originCache.getOrCreate(key, dict)
+
+        basis = entry.get(basisType)
+        if basis is None:
+            origin = np.zeros(1)
+            basis = self._calcBasis(
+                origin, origin, numTerms, obscuration, basisType
+            ).reshape(-1)
+            basis.flags.writeable = False
+            entry[basisType] = basis
+
+        return basis
+
+    def getMaskedBasis(self, inst, numTerms, obscuration, mask, basisType="eval"):
+        """Get the basis of annular Zernike polynomials on the sensor grid
+        with the coordinates outside of mask set to be 0.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        numTerms : int
+            Number of annular Zernike terms.
+        obscuration : float
+            Obscuration of annular Zernike polynomials.
+        mask : numpy.ndarray
+            Mask with the shape of (dim, dim). The nonzero element is inside
+            the mask.
+        basisType : str, optional
+            Basis type. It can be "eval", "dx", "dy", "dx2", "dy2", or "dxy".
+            (the default is "eval".)
+
+        Returns
+        -------
+        numpy.ndarray
+            Basis with the shape of (numTerms, dim, dim).
+        """
+
+        basis = self.getBasis(inst, numTerms, obscuration, basisType=basisType)
+        basisOnOrigin = self.getBasisOnOrigin(
+            numTerms, obscuration, basisType=basisType
+        )
+
+        return np.where(mask != 0, basis, basisOnOrigin[:, np.newaxis, np.newaxis])
+
+    def _checkBasisType(self, basisType):
+        """Check the basis type is supported or not.
+
+        Parameters
+        ----------
+        basisType : str
+            Basis type.
+
+        Raises
+        ------
+        ValueError
+            The basis type is not supported.
+        """
+
+        if basisType not in self.BASIS_TYPES:
+            raise ValueError("Basis type can not be '%s'." % basisType)
+
+    def _getKey(self, inst, numTerms, obscuration):
+        """Get the key of instrument configuration.
+
+        Parameters
+        ----------
+        inst : Instrument
+            Instrument to use.
+        numTerms : int
+            Number of annular Zernike terms.
+        obscuration : float
+            Obscuration of annular Zernike polynomials.
+
+        Returns
+        -------
+        tuple
+            Key of instrument configuration.
+        """
+
+        return (
+            inst.getInstFilePath(),
+            inst.getDimOfDonutOnSensor(),
+            float(inst.getSensorFactor()),
+            int(numTerms),
+            float(obscuration),
+        )
+
+    def _calcBasis(self, xSensor, ySensor, numTerms, obscuration, basisType):
+        """Calculate the basis of annular Zernike polynomials.
+
+        Parameters
+        ----------
+        xSensor : numpy.ndarray
+            X coordinate.
+        ySensor : numpy.ndarray
+            Y coordinate.
+        numTerms : int
+            Number of annular Zernike terms.
+        obscuration : float
+            Obscuration of annular Zernike polynomials.
+        basisType : str
+            Basis type.
+
+        Returns
+        -------
+        numpy.ndarray
+            Basis with the shape of (numTerms, *xSensor.shape).
+        """
+
+        if basisType == "eval":
+            basis = ZernikeAnnularEvalBasis(
+                xSensor, ySensor, obscuration, numTerms=numTerms
+            )
+        else:
+            basis = ZernikeAnnularGradBasis(
+                xSensor, ySensor, obscuration, basisType, numTerms=numTerms
+            )
+
+        basis.flags.writeable = False
+
+        return basis
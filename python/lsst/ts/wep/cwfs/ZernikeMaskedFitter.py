@@ -0,0 +1,206 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+
+import numpy as np
+
+from lsst.ts.wep.cwfs.LruCache import LruCache
+from lsst.ts.wep.cwfs.Tool import ZernikeAnnularEvalBasis, ZernikeAnnularFit
+
+
+class ZernikeMaskedFitter(object):
+    def __init__(self, maxSize=4):
+        """Initialize the fitter of annular Zernike polynomials in the mask.
+
+        The pseudo-inverse of design matrix only depends on the mask, x, y
+        coordinates, obscuration, and number of terms. It is calculated once
+        and kept in the cache, so that each fit becomes a single matrix-vector
+        product. The caller that tracks the mask (e.g. Algorithm) should
+        supply the key of mask and coordinates in fit(), so that the arrays
+        are not hashed in each fit. The result is the same as
+        ZernikeMaskedFit() in Tool.
+
+        Parameters
+        ----------
+        maxSize : int, optional
+            Maximum number of pseudo-inverse matrices kept in the cache. Each
+            one has the size of 8 * numTerms * (number of pixels in mask)
+            bytes. The least recently used one is evicted. (the default is 4.)
+        """
+
+        self._cache = LruCache(maxSize=maxSize)
+
+    def getMaxSize(self):
+        """Get the maximum number of pseudo-inverse matrices kept in the
+        cache.
+
+        Returns
+        -------
+        int
+            Maximum number of pseudo-inverse matrices.
+        """
+
+        return self._cache.getMaxSize()
+
+    def getNumOfEntries(self):
+        """Get the number of pseudo-inverse matrices in the cache.
+
+        Returns
+        -------
+        int
+            Number of pseudo-inverse matrices.
+        """
+
+        return self._cache.getNumOfEntries()
+
+    def clear(self):
+        """Clear the cache."""
+
+        self._cache.clear()
+
+    def fit(self, s, x, y, numTerms, mask, e, key=None):
+        """Fit the wavefront surface in the mask to a linear combination of
+        annular Zernike polynomials.
+
+        Parameters
+        ----------
+        s : numpy.ndarray
+            Wavefront surface to be fitted.
+        x : numpy.ndarray
+            Normalized x coordinate between -1 and 1 (pupil coordinate).
+        y : numpy.ndarray
+            Normalized y coordinate between -1 and 1 (pupil coordinate).
+        numTerms : int
+            Number of annular Zernike terms used in the fit.
+        mask : numpy.ndarray[int]
+            Mask used.
+        e : float
+            Obscuration ratio of annular Zernikes.
+        key : tuple, optional
+            Key of the mask and x, y coordinates with the scalars only, which
+            should change whenever any of them changes. If None, the arrays
+            are hashed to be the key. (the default is None.)
+
+        Returns
+        -------
+        numpy.ndarray
+            Coefficients of annular Zernike polynomials by the fitting.
+        """
+
+        if key is None:
+            key = self._getKey(x, y, numTerms, mask, e)
+        else:
+            key = (tuple(key), int(numTerms), float(e))
+
+        rowIdx, colIdx, pinv = self._cache.getOrCreate(
+            key, lambda: self._calcPinv(x, y, numTerms, mask, e)
+        )
+
+        sInMask = s[rowIdx, colIdx]
+
+        # The cached pseudo-inverse is only valid if all the pixels are used.
+        # Fall back to the direct fit if there is the non-finite value.
+        if not np.all(np.isfinite(sInMask)):
+            return ZernikeAnnularFit(
+                sInMask, x[rowIdx, colIdx], y[rowIdx, colIdx], numTerms, e
+            )
+
+        return pinv.dot(sInMask)
+
+    def _getKey(self, x, y, numTerms, mask, e):
+        """Get the key of pseudo-inverse matrix by hashing the arrays.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Normalized x coordinate between -1 and 1 (pupil coordinate).
+        y : numpy.ndarray
+            Normalized y coordinate between -1 and 1 (pupil coordinate).
+        numTerms : int
+            Number of annular Zernike terms used in the fit.
+        mask : numpy.ndarray[int]
+            Mask used.
+        e : float
+            Obscuration ratio of annular Zernikes.
+
+        Returns
+        -------
+        tuple
+            Key of pseudo-inverse matrix.
+        """
+
+        digest = hashlib.sha1()
+        for array in (x, y):
+            digest.update(np.ascontiguousarray(array, dtype=float).data)
+        digest.update(np.ascontiguousarray(mask != 0).data)
+
+        return (x.shape, digest.hexdigest(), int(numTerms), float(e))
+
+    def _calcPinv(self, x, y, numTerms, mask, e):
+        """Calculate the pseudo-inverse of design matrix in the mask.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Normalized x coordinate between -1 and 1 (pupil coordinate).
+        y : numpy.ndarray
+            Normalized y coordinate between -1 and 1 (pupil coordinate).
+        numTerms : int
+            Number of annular Zernike terms used in the fit.
+        mask : numpy.ndarray[int]
+            Mask used.
+        e : float
+            Obscuration ratio of annular Zernikes.
+
+        Returns
+        -------
+        numpy.ndarray
+            Row index of pixels used in the fit.
+        numpy.ndarray
+            Column index of pixels used in the fit.
+        numpy.ndarray
+            Pseudo-inverse matrix with the shape of (numTerms, number of
+            pixels). The array is read-only.
+        """
+
+        # Select the pixels in the same order as ZernikeMaskedFit()
+        rowIdx, colIdx = np.nonzero(mask.T)
+
+        xInMask = x[rowIdx, colIdx]
+        yInMask = y[rowIdx, colIdx]
+        finiteIndex = np.isfinite(xInMask + yInMask)
+
+        rowIdx = rowIdx[finiteIndex]
+        colIdx = colIdx[finiteIndex]
+
+        h = ZernikeAnnularEvalBasis(
+            xInMask[finiteIndex], yInMask[finiteIndex], e, numTerms=numTerms
+        ).T
+
+        # Use the same cutoff of small singular values as numpy.linalg.lstsq()
+        rcond = np.finfo(float).eps * max(h.shape)
+        pinv = np.linalg.pinv(h, rcond=rcond)
+
+        for array in (rowIdx, colIdx, pinv):
+            array.flags.writeable = False
+
+        return rowIdx, colIdx, pinv
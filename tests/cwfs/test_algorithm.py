@@ -22,10 +22,15 @@
 import os
 import numpy as np
 import unittest
+from scipy.ndimage import generate_binary_structure, iterate_structure
+from scipy.ndimage import binary_dilation, binary_erosion
 
 from lsst.ts.wep.cwfs.Instrument import Instrument
 from lsst.ts.wep.cwfs.CompensableImage import CompensableImage
 from lsst.ts.wep.cwfs.Algorithm import Algorithm
+from lsst.ts.wep.cwfs.ConvergencePolicy import ConvergencePolicy
+from lsst.ts.wep.cwfs.FftBackendNumpy import FftBackendNumpy
+from lsst.ts.wep.cwfs.FftBackendScipy import FftBackendScipy
 from lsst.ts.wep.Utility import getModulePath, getConfigDir, DefocalType, CamType
 
 
@@ -173,6 +178,38 @@ class TestAlgorithm(unittest.TestCase):
 
         self.assertEqual(self.algoFft.getFftDimension(), 128)
 
+    def testGetFftDimensionWithFastFftDimension(self):
+
+        self.algoFft.algoParamFile.updateSetting("fastFftDimension", True)
+        self.assertEqual(self.algoFft.getFftDimension(), 120)
+
+    def testGetFftBackendName(self):
+
+        self.assertEqual(self.algoFft.getFftBackendName(), "numpy")
+        self.assertEqual(self.algoExp.getFftBackendName(), "numpy")
+
+    def testGetNumOfFftWorkers(self):
+
+        self.assertEqual(self.algoFft.getNumOfFftWorkers(), 1)
+
+    def testGetFftBackend(self):
+
+        self.assertTrue(isinstance(self.algoFft.getFftBackend(), FftBackendNumpy))
+        self.assertEqual(self.algoExp.getFftBackend(), None)
+
+    def testGetImageDtype(self):
+
+        self.assertEqual(self.algoFft.getImageDtype(), np.float64)
+        self.assertEqual(self.algoExp.getImageDtype(), np.float64)
+
+        self.algoExp.algoParamFile.updateSetting("imageDtype", "float32")
+        self.assertEqual(self.algoExp.getImageDtype(), np.float32)
+
+    def testGetImageDtypeWithWrongValue(self):
+
+        self.algoExp.algoParamFile.updateSetting("imageDtype", "float16")
+        self.assertRaises(ValueError, self.algoExp.getImageDtype)
+
     def testGetSignalClipSequence(self):
 
         sumclipSequence = self.algoFft.getSignalClipSequence()
@@ -290,6 +327,21 @@ class TestAlgorithm(unittest.TestCase):
         zk = self.algoExp.getZer4UpInNm()
         self.assertEqual(int(zk[7]), -192)
 
+    def testRunItOfExpWithFloat32Image(self):
+
+        self.algoExp.algoParamFile.updateSetting("imageDtype", "float32")
+        self.algoExp.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
+
+        for img in (self.I1, self.I2):
+            self.assertEqual(img.getImg().dtype, np.float32)
+            self.assertEqual(img.getImgInit().dtype, np.float32)
+            self.assertEqual(img.getPaddedMask().dtype, np.uint8)
+            self.assertEqual(img.getNonPaddedMask().dtype, np.uint8)
+
+        zk = self.algoExp.getZer4UpInNm()
+        self.assertEqual(zk.dtype, np.float64)
+        self.assertEqual(int(zk[7]), -192)
+
     def testResetAfterFullCalc(self):
 
         self.algoExp.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
@@ -305,6 +357,137 @@ class TestAlgorithm(unittest.TestCase):
         zk = self.algoExp.getZer4UpInNm()
         self.assertEqual(int(zk[7]), -192)
 
+    def testRunItWithConvergencePolicy(self):
+
+        self.assertEqual(self.algoExp.getConvergencePolicy(), None)
+
+        policy = ConvergencePolicy(absTol=1e3)
+        self.algoExp.setConvergencePolicy(policy)
+        self.assertTrue(self.algoExp.getConvergencePolicy() is policy)
+
+        self.algoExp.runIt(self.I1, self.I2, self.opticalModel)
+
+        # The policy is used after all the terms are compensated based on the
+        # compSequence
+        compSequence = self.algoExp.getCompSequence()
+        numOfItr = np.argmax(compSequence >= self.algoExp.getNumOfZernikes()) + 2
+        self.assertEqual(self.algoExp.getNumOfItrUsed(), numOfItr)
+
+    def testGetConvergencePolicyFromSetting(self):
+
+        algoParamFile = self.algoExp.algoParamFile
+        algoParamFile.updateSetting("convergenceAbsTol", [1.0, 2.0])
+        algoParamFile.updateSetting("convergenceZkGroups", [[4, 5, 6], [7, 8]])
+        algoParamFile.updateSetting("convergencePatience", 2)
+        algoParamFile.updateSetting("convergenceMaxTimeInSec", 10.0)
+
+        policy = self.algoExp.getConvergencePolicy()
+        self.assertTrue(isinstance(policy, ConvergencePolicy))
+        self.assertEqual(policy.getPatience(), 2)
+        self.assertEqual(policy.getMaxTimeInSec(), 10.0)
+        self.assertTrue(self.algoExp.getConvergencePolicy() is policy)
+
+        # The policy set in code is used instead
+        policyInCode = ConvergencePolicy(relTol=0.1)
+        self.algoExp.setConvergencePolicy(policyInCode)
+        self.assertTrue(self.algoExp.getConvergencePolicy() is policyInCode)
+
+    def testGetConvergencePolicyFromSettingWithoutTol(self):
+
+        self.algoExp.algoParamFile.updateSetting("convergenceMaxTimeInSec", 10.0)
+        self.assertRaises(ValueError, self.algoExp.getConvergencePolicy)
+
+    def testRunItWithConvergencePolicyFromSetting(self):
+
+        self.algoExp.algoParamFile.updateSetting("convergenceMaxTimeInSec", 0)
+        self.algoExp.algoParamFile.updateSetting("convergenceAbsTol", 1e-3)
+
+        self.algoExp.runIt(self.I1, self.I2, self.opticalModel)
+
+        self.assertEqual(self.algoExp.getNumOfItrUsed(), 1)
+
+    def testConfigResetsConvergencePolicy(self):
+
+        self.algoExp.setConvergencePolicy(ConvergencePolicy(absTol=1e3))
+        self.algoExp.config("exp", self.inst)
+
+        self.assertEqual(self.algoExp.getConvergencePolicy(), None)
+
+    def testResetStartsConvergencePolicy(self):
+
+        policy = ConvergencePolicy(absTol=1e3, patience=2)
+        self.algoExp.setConvergencePolicy(policy)
+
+        # The converged iteration of previous images is not counted
+        zk = np.zeros(self.algoExp.getNumOfZernikes())
+        self.assertFalse(policy.isConverged(zk, zk))
+        self.algoExp.reset()
+        self.assertFalse(policy.isConverged(zk, zk))
+        self.assertTrue(policy.isConverged(zk, zk))
+
+    def testNextItrStartsConvergencePolicy(self):
+
+        policy = ConvergencePolicy(absTol=1e3, patience=2)
+        self.algoExp.setConvergencePolicy(policy)
+
+        zk = np.zeros(self.algoExp.getNumOfZernikes())
+        self.assertFalse(policy.isConverged(zk, zk))
+
+        # The iteration 0 starts the policy without runIt()
+        self.algoExp.nextItr(self.I1, self.I2, self.opticalModel, nItr=1)
+        self.assertFalse(policy.isConverged(zk, zk))
+
+    def testSetWarmStart(self):
+
+        self.assertEqual(self.algoExp.getWarmStart(), None)
+
+        zer4UpNm = np.arange(1, 6)
+        self.algoExp.setWarmStart(zer4UpNm)
+
+        warmStart = self.algoExp.getWarmStart()
+        self.assertEqual(len(warmStart), self.algoExp.getNumOfZernikes() - 3)
+        np.testing.assert_allclose(warmStart[:5], zer4UpNm)
+        self.assertEqual(np.sum(np.abs(warmStart[5:])), 0)
+
+        self.algoExp.setWarmStart(None)
+        self.assertEqual(self.algoExp.getWarmStart(), None)
+
+    def testSetWarmStartWithWrongNumOfTerms(self):
+
+        self.assertRaises(ValueError, self.algoExp.setWarmStart, np.zeros(20))
+
+    def testRunItWithWarmStart(self):
+
+        zer4UpNm = np.zeros(self.algoExp.getNumOfZernikes() - 3)
+        zer4UpNm[7] = -190
+        self.algoExp.setWarmStart(zer4UpNm)
+
+        self.algoExp.runIt(self.I1, self.I2, self.opticalModel)
+
+        # The ramp-up iterations in compSequence are skipped
+        compSequence = self.algoExp.getCompSequence()
+        numOfSkippedItr = np.argmax(compSequence >= self.algoExp.getNumOfZernikes())
+        self.assertEqual(
+            self.algoExp.getNumOfItrUsed(),
+            self.algoExp.getNumOfOuterItr() + 1 - numOfSkippedItr,
+        )
+
+        zk = self.algoExp.getZer4UpInNm()
+        self.assertEqual(int(zk[7]), -192)
+
+        # The warm start is kept after the reset
+        self.algoExp.reset()
+        self.assertEqual(self.algoExp.getWarmStart()[7], -190)
+
+    def testRunItWithTimeOut(self):
+
+        policy = ConvergencePolicy(absTol=1e-3, maxTimeInSec=0)
+        self.algoExp.setConvergencePolicy(policy)
+
+        self.algoExp.runIt(self.I1, self.I2, self.opticalModel)
+
+        self.assertEqual(self.algoExp.getNumOfItrUsed(), 1)
+
     def testRunItOfFft(self):
 
         self.algoFft.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
@@ -312,6 +495,102 @@ class TestAlgorithm(unittest.TestCase):
         zk = self.algoFft.getZer4UpInNm()
         self.assertEqual(int(zk[7]), -192)
 
+    def testRunItOfFftWithMaskedFitKey(self):
+
+        self.algoFft.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
+
+        # The pseudo-inverse matrix of Zernike fitting is keyed by the
+        # scalars of pMask and instrument
+        maskedFitKey = self.algoFft._maskedFitKey
+        self.assertEqual(maskedFitKey[0], 1)
+        self.assertEqual(maskedFitKey[1], self.inst.getInstFileDir())
+
+        maskedFitter = self.algoFft.getZernikeMaskedFitter()
+        self.assertEqual(maskedFitter.getNumOfEntries(), 1)
+        self.assertTrue(
+            (
+                maskedFitKey,
+                self.algoFft.getNumOfZernikes(),
+                self.algoFft.getObsOfZernikes(),
+            )
+            in maskedFitter._cache
+        )
+
+        # The key is invalidated by reset(), and the new mask has a new key
+        self.algoFft.reset()
+        self.assertEqual(self.algoFft._maskedFitKey, None)
+
+        fieldXY = [self.I1.fieldX, self.I1.fieldY]
+        self.I1.setImg(fieldXY, self.I1.getDefocalType(), image=self.I1.getImgInit())
+        self.I2.setImg(fieldXY, self.I2.getDefocalType(), image=self.I2.getImgInit())
+        self.algoFft.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
+
+        self.assertEqual(self.algoFft._maskedFitKey[0], 2)
+        self.assertEqual(maskedFitter.getNumOfEntries(), 2)
+
+        zk = self.algoFft.getZer4UpInNm()
+        self.assertEqual(int(zk[7]), -192)
+
+    def testRunItOfFftWithScipyAndFastFftDimension(self):
+
+        self.algoFft.algoParamFile.updateSetting("fftBackend", "scipy")
+        self.algoFft.algoParamFile.updateSetting("numOfFftWorkers", 2)
+        self.algoFft.algoParamFile.updateSetting("fastFftDimension", True)
+
+        self.assertTrue(isinstance(self.algoFft.getFftBackend(), FftBackendScipy))
+        self.assertEqual(self.algoFft.getFftBackend().getNumOfWorkers(), 2)
+
+        self.algoFft.runIt(self.I1, self.I2, self.opticalModel, tol=1e-3)
+
+        zk = self.algoFft.getZer4UpInNm()
+        self.assertEqual(int(zk[7]), -192)
+
+    def testGetBoundaryAvgOperator(self):
+
+        # Use an asymmetric mask to check the order of indices
+        dim = 40
+        yy, xx = np.mgrid[0:dim, 0:dim]
+        pMask = ((xx - 18) ** 2 / 100 + (yy - 21) ** 2 / 49 < 1).astype(int)
+        self.algoFft.pMask = pMask
+
+        boundaryT = 1
+        borderIdx, avgOperator, emptyIdx = self.algoFft._getBoundaryAvgOperator(
+            boundaryT
+        )
+
+        West = np.random.RandomState(seed=1).rand(dim, dim) * pMask
+        WestdWdn0 = West.copy()
+        borderValue = avgOperator.dot(West.ravel())
+        borderValue[emptyIdx] = np.nan
+        WestdWdn0.ravel()[borderIdx] = borderValue
+
+        ans = self._averageBoundary(West, pMask, boundaryT)
+        np.testing.assert_allclose(WestdWdn0, ans, rtol=1e-12, atol=0)
+
+        self.assertTrue(
+            self.algoFft._getBoundaryAvgOperator(boundaryT)[1] is avgOperator
+        )
+
+    def _averageBoundary(self, West, pMask, boundaryT):
+
+        # Average the wavefront around the boundary pixel by pixel
+        struct = iterate_structure(generate_binary_structure(2, 1), boundaryT)
+        ApringOut = np.logical_xor(binary_dilation(pMask, structure=struct), pMask)
+        ApringIn = np.logical_xor(binary_erosion(pMask, structure=struct), pMask)
+
+        WestdWdn0 = West.copy()
+        bordery, borderx = np.nonzero(ApringOut)
+        for ii in range(len(borderx)):
+            winX = slice(borderx[ii] - boundaryT, borderx[ii] + boundaryT + 1)
+            winY = slice(bordery[ii] - boundaryT, bordery[ii] + boundaryT + 1)
+
+            reg = West[winX, winY]
+            WestdWdn0[borderx[ii], bordery[ii]] = reg[
+                np.nonzero(ApringIn[winX, winY])
+            ].mean()
+
+        return WestdWdn0
+
 
 if __name__ == "__main__":
 
@@ -186,6 +186,77 @@ class TestCentroidConvolveTemplate(unittest.TestCase):
         self.assertEqual(doubleCY, [80.0, 80.0])
         self.assertAlmostEqual(rad, eff_radius, delta=0.1)
 
+    def testGetCenterAndRFromTemplateConvWithKMeans(self):
+
+        singleDonut, doubleDonut, eff_radius = self._createData(20, 40, 160)
+
+        doubleCX, doubleCY, rad = self.centroidConv.getCenterAndRfromTemplateConv(
+            doubleDonut,
+            templateImgBinary=singleDonut,
+            nDonuts=2,
+            peakFindMethod="kmeans",
+        )
+        self.assertCountEqual(doubleCX, [50.0, 110.0])
+        self.assertEqual(doubleCY, [80.0, 80.0])
+        self.assertAlmostEqual(rad, eff_radius, delta=0.1)
+
+    def testGetCenterAndRFromTemplateConvWithKMeansFallback(self):
+
+        singleDonut, doubleDonut, eff_radius = self._createData(20, 40, 160)
+
+        # The minimum distance between peaks is larger than the distance of
+        # donuts. Only one peak is found by the maximum filter.
+        doubleCX, doubleCY, rad = self.centroidConv.getCenterAndRfromTemplateConv(
+            doubleDonut, templateImgBinary=singleDonut, nDonuts=2, minPeakDistance=80
+        )
+        self.assertCountEqual(doubleCX, [50.0, 110.0])
+        self.assertEqual(doubleCY, [80.0, 80.0])
+
+    def testGetCenterAndRFromTemplateConvWithWrongMethod(self):
+
+        singleDonut, doubleDonut, eff_radius = self._createData(20, 40, 160)
+
+        self.assertRaises(
+            ValueError,
+            self.centroidConv.getCenterAndRfromTemplateConv,
+            singleDonut,
+            peakFindMethod="wrongMethod",
+        )
+
+    def testFindPeaksByMaxFilter(self):
+
+        tempConvolve = np.zeros((50, 50))
+        tempConvolve[10, 10] = 1.0
+        tempConvolve[10, 12] = 0.99
+        tempConvolve[40, 30:33] = 0.98
+
+        # The neighboring peak and the plateau are suppressed
+        centX, centY = self.centroidConv._findPeaksByMaxFilter(tempConvolve, 3, 0.95, 5)
+        self.assertEqual(centX, [10, 40])
+        self.assertEqual(centY, [10, 30])
+
+        # The peaks under the threshold are not found
+        centX, centY = self.centroidConv._findPeaksByMaxFilter(
+            tempConvolve, 3, 0.985, 1
+        )
+        self.assertEqual(centX, [10, 10])
+        self.assertEqual(centY, [10, 12])
+
+    def testGetTemplateCorrelator(self):
+
+        singleDonut, doubleDonut, eff_radius = self._createData(20, 40, 160)
+
+        correlator = self.centroidConv.getTemplateCorrelator(singleDonut)
+        np.testing.assert_array_equal(correlator.getTemplate(), singleDonut)
+
+        # The correlator is reused for the same template
+        self.assertIs(
+            self.centroidConv.getTemplateCorrelator(singleDonut.copy()), correlator
+        )
+        self.assertIsNot(
+            self.centroidConv.getTemplateCorrelator(doubleDonut), correlator
+        )
+
 
 if __name__ == "__main__":
 
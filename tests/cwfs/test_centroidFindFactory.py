@@ -26,6 +26,7 @@ from lsst.ts.wep.cwfs.CentroidFindFactory import CentroidFindFactory
 from lsst.ts.wep.cwfs.CentroidRandomWalk import CentroidRandomWalk
 from lsst.ts.wep.cwfs.CentroidOtsu import CentroidOtsu
 from lsst.ts.wep.cwfs.CentroidConvolveTemplate import CentroidConvolveTemplate
+from lsst.ts.wep.cwfs.CentroidHistogramValley import CentroidHistogramValley
 
 
 class TestCentroidFindFactory(unittest.TestCase):
@@ -50,6 +51,13 @@ class TestCentroidFindFactory(unittest.TestCase):
         )
         self.assertTrue(isinstance(centroidFind, CentroidConvolveTemplate))
 
+    def testCreateCentroidFindHistogramValley(self):
+
+        centroidFind = CentroidFindFactory.createCentroidFind(
+            CentroidFindType.HistogramValley
+        )
+        self.assertTrue(isinstance(centroidFind, CentroidHistogramValley))
+
     def testCreateCentroidFindWrongType(self):
 
         self.assertRaises(
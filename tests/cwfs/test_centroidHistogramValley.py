@@ -0,0 +1,124 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.CentroidHistogramValley import CentroidHistogramValley
+from lsst.ts.wep.cwfs.CentroidRandomWalk import CentroidRandomWalk
+from lsst.ts.wep.Utility import getModulePath
+
+
+class TestCentroidHistogramValley(unittest.TestCase):
+    """Test the CentroidHistogramValley class."""
+
+    def setUp(self):
+
+        self.centroid = CentroidHistogramValley()
+
+    def testGetCenterAndR(self):
+
+        imgDonut = self._prepareDonutImg(1000)
+
+        realcx, realcy, realR = self.centroid.getCenterAndR(imgDonut)
+        self.assertAlmostEqual(realcx, 59.7495, places=3)
+        self.assertAlmostEqual(realcy, 59.3421, places=3)
+        self.assertAlmostEqual(realR, 47.3616, places=3)
+
+    def _prepareDonutImg(self, seed):
+
+        # Read the image file
+        imgFile = os.path.join(
+            getModulePath(),
+            "tests",
+            "testData",
+            "testImages",
+            "LSST_NE_SN25",
+            "z11_0.25_intra.txt",
+        )
+        imgDonut = np.loadtxt(imgFile)
+        # This assumes this "txt" file is in the format
+        # I[0,0]   I[0,1]
+        # I[1,0]   I[1,1]
+        imgDonut = imgDonut[::-1, :]
+
+        # Add the noise to simulate the amplifier image
+        np.random.seed(seed=seed)
+        d0, d1 = imgDonut.shape
+        noise = np.random.rand(d0, d1) * 10
+
+        return imgDonut + noise
+
+    def testGetCenterAndRWithRandomWalk(self):
+
+        centroidRandomWalk = CentroidRandomWalk()
+
+        for seed in (1, 10, 100):
+            # Donut with the sky background
+            rng = np.random.default_rng(seed)
+            imgDonut = self._prepareDonutImg(seed) * 1000 + rng.normal(
+                100, 10, (120, 120)
+            )
+
+            ansCx, ansCy, ansR = centroidRandomWalk.getCenterAndR(imgDonut)
+            realcx, realcy, realR = self.centroid.getCenterAndR(imgDonut)
+
+            self.assertLess(np.hypot(realcx - ansCx, realcy - ansCy), 0.5)
+            self.assertLess(np.abs(realR / ansR - 1), 0.03)
+
+    def testGetCenterAndRNotChangeRandomState(self):
+
+        imgDonut = self._prepareDonutImg(1000)
+
+        np.random.seed(seed=1)
+        self.centroid.getCenterAndR(imgDonut)
+        value = np.random.rand()
+
+        np.random.seed(seed=1)
+        self.assertEqual(np.random.rand(), value)
+
+    def testGetImgBinaryWithFlatImage(self):
+
+        imgBinary = self.centroid.getImgBinary(np.ones((10, 10)))
+
+        self.assertEqual(imgBinary.dtype, int)
+        self.assertEqual(np.sum(imgBinary), 100)
+
+    def testCalcThresholdWithValley(self):
+
+        # Background of 0 - 10 and signal of 100 - 110 with no count between
+        # them
+        rng = np.random.default_rng(0)
+        imgDonut = rng.uniform(0, 10, (100, 100))
+        imgDonut[30:70, 30:70] += 100
+
+        threshold = self.centroid._calcThreshold(imgDonut)
+
+        self.assertGreater(threshold, 10)
+        self.assertLess(threshold, 100)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
@@ -102,6 +102,10 @@ class TestCompensableImage(unittest.TestCase):
 
         self.wfsImg = CompensableImage()
 
+        # The cache of geometric mapping is shared by all the instances
+        CompensableImage.clearGeometricMappingCache()
+        CompensableImage.clearMaskCache()
+
     def testGetDefocalType(self):
 
         defocalType = self.wfsImg.getDefocalType()
@@ -186,6 +190,65 @@ class TestCompensableImage(unittest.TestCase):
         delta = np.sum(np.abs(self.wfsImg.getImgInit() - self.wfsImg.getImg()))
         self.assertEqual(delta, 0)
 
+    def testResetImage(self):
+
+        self._setIntraImg()
+        self.wfsImg.updateImgInit()
+
+        self.wfsImg.updateImage(np.zeros_like(self.wfsImg.getImg()))
+        self.wfsImg.resetImage()
+
+        img = self.wfsImg.getWorkingImg()
+        np.testing.assert_array_equal(img, self.wfsImg.getImgInit())
+        self.assertFalse(np.shares_memory(img, self.wfsImg.getImgInit()))
+
+        # The working buffer is reused in place
+        img[:] = 0
+        self.wfsImg.resetImage()
+        self.assertIs(self.wfsImg.getWorkingImg(), img)
+        np.testing.assert_array_equal(img, self.wfsImg.getImgInit())
+
+        # The working buffer is not overwritten after setting the new image
+        self._setIntraImg()
+        self.wfsImg.updateImgInit()
+        self.wfsImg.updateImage(np.zeros_like(self.wfsImg.getImg()))
+        self.wfsImg.resetImage()
+        self.assertIsNot(self.wfsImg.getWorkingImg(), img)
+
+    def testGetImgNotChangedByResetImageAndCompensate(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+        self.wfsImg.imageCoCenter(self.inst)
+        self.wfsImg.updateImgInit()
+        self.wfsImg.resetImage()
+
+        img = self.wfsImg.getImg()
+        self.assertFalse(np.shares_memory(img, self.wfsImg.getWorkingImg()))
+        imgAns = img.copy()
+
+        self.wfsImg.compensate(self.inst, algo, zcCol, self.opticalModel)
+        imgCompensated = self.wfsImg.getImg()
+        np.testing.assert_array_equal(img, imgAns)
+
+        self.wfsImg.resetImage()
+        self.wfsImg.compensate(self.inst, algo, zcCol * 1.1, self.opticalModel)
+        np.testing.assert_array_equal(img, imgAns)
+        self.assertFalse(np.array_equal(imgCompensated, self.wfsImg.getImg()))
+
+        self.wfsImg.resetImage()
+        np.testing.assert_array_equal(img, imgAns)
+        self.assertFalse(np.array_equal(imgCompensated, img))
+
+    def testResetImageWithoutImgInit(self):
+
+        self._setIntraImg()
+        self.assertRaises(RuntimeError, self.wfsImg.resetImage)
+
     def testImageCoCenter(self):
 
         self._setIntraImg()
@@ -238,6 +301,386 @@ class TestCompensableImage(unittest.TestCase):
         res = np.sum(np.abs(intraImg - extraImg) * binaryImg)
         self.assertLess(res, 500)
 
+    def testGetGeometricMapping(self):
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+
+        algo = TempAlgo()
+        projSamples = self.wfsImg.getImgSizeInPix()
+        lutx, luty = self._getPupilGrid(projSamples)
+        lutxInit = lutx.copy()
+
+        geoMapping = self.wfsImg.getGeometricMapping(
+            self.inst, algo, lutx, luty, projSamples, self.opticalModel
+        )
+
+        # The input coordinate should not be changed
+        np.testing.assert_array_equal(lutx, lutxInit)
+
+        for key in ("lutx", "luty", "lutxp", "lutyp", "xpox", "ypoy", "xpoy", "ypox"):
+            self.assertEqual(geoMapping[key].shape, (projSamples, projSamples))
+            self.assertFalse(geoMapping[key].flags.writeable)
+
+        # The mapping is reused by the image at the same field position
+        wfsImg = CompensableImage()
+        wfsImg.setImg(self.fieldXY, DefocalType.Intra, imageFile=self.imgFilePathIntra)
+        wfsImg.setOffAxisCorr(self.inst, 10)
+        geoMappingCached = wfsImg.getGeometricMapping(
+            self.inst, algo, lutx, luty, projSamples, self.opticalModel
+        )
+        self.assertIs(geoMappingCached, geoMapping)
+
+        # The mapping depends on the defocal type
+        wfsImg.setImg(self.fieldXY, DefocalType.Extra, imageFile=self.imgFilePathExtra)
+        wfsImg.setOffAxisCorr(self.inst, 10)
+        geoMappingExtra = wfsImg.getGeometricMapping(
+            self.inst, algo, lutx, luty, projSamples, self.opticalModel
+        )
+        self.assertIsNot(geoMappingExtra, geoMapping)
+
+    def testGetGeometricMappingKey(self):
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+
+        algo = TempAlgo()
+        projSamples = self.wfsImg.getImgSizeInPix()
+        key = self.wfsImg._getGeometricMappingKey(
+            self.inst, algo, projSamples, self.opticalModel
+        )
+
+        # The key only has the scalars
+        for value in key:
+            self.assertTrue(np.isscalar(value) or isinstance(value, DefocalType))
+
+        wfsImg = CompensableImage()
+        wfsImg.setImg((0.5, 0.5), DefocalType.Intra, imageFile=self.imgFilePathIntra)
+        wfsImg.setOffAxisCorr(self.inst, 10)
+        self.assertNotEqual(
+            wfsImg._getGeometricMappingKey(
+                self.inst, algo, projSamples, self.opticalModel
+            ),
+            key,
+        )
+
+    def testGetGeometricMappingWithWrongModel(self):
+
+        self._setIntraImg()
+
+        lutx, luty = self._getPupilGrid(10)
+        self.assertRaises(
+            ValueError,
+            self.wfsImg.getGeometricMapping,
+            self.inst,
+            TempAlgo(),
+            lutx,
+            luty,
+            10,
+            "wrongModel",
+        )
+
+    def _getPupilGrid(self, projSamples):
+
+        luty, lutx = np.mgrid[
+            -(projSamples / 2 - 0.5) : (projSamples / 2 + 0.5),
+            -(projSamples / 2 - 0.5) : (projSamples / 2 + 0.5),
+        ]
+
+        sensorFactor = self.inst.getSensorFactor()
+        lutx = lutx / (projSamples / 2 / sensorFactor)
+        luty = luty / (projSamples / 2 / sensorFactor)
+
+        return lutx, luty
+
+    def testCompensateWithCachedGeometricMapping(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.makeMask(self.inst, self.opticalModel, 8, 1)
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+        self.wfsImg.imageCoCenter(self.inst)
+        imgInit = self.wfsImg.getImg().copy()
+
+        imgs = []
+        for clearCache in (True, False):
+            if clearCache:
+                CompensableImage.clearGeometricMappingCache()
+
+            self.wfsImg.updateImage(imgInit.copy())
+            self.wfsImg.compensate(self.inst, algo, zcCol, self.opticalModel)
+            imgs.append(self.wfsImg.getImg().copy())
+
+        np.testing.assert_array_equal(imgs[0], imgs[1])
+
+    def testCompensateWithFloat32Image(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        imgList = []
+        for dtype in (np.float64, np.float32):
+            wfsImg = CompensableImage()
+            wfsImg.setImg(
+                self.fieldXY, DefocalType.Extra, imageFile=self.imgFilePathExtra
+            )
+            wfsImg.makeMask(self.inst, self.opticalModel, 8, 1, maskDtype=np.uint8)
+            wfsImg.setOffAxisCorr(self.inst, 10)
+            wfsImg.imageCoCenter(self.inst)
+            wfsImg.updateImage(wfsImg.getImg().astype(dtype))
+            wfsImg.updateImgInit()
+            wfsImg.compensate(self.inst, algo, zcCol, self.opticalModel)
+
+            self.assertEqual(wfsImg.getImg().dtype, dtype)
+            self.assertEqual(wfsImg.getPaddedMask().dtype, np.uint8)
+            imgList.append(wfsImg.getImg())
+
+        np.testing.assert_allclose(imgList[1], imgList[0], rtol=0, atol=1e-5)
+
+    def testCompensateStack(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        fieldXYList = [self.fieldXY, (1.2, 1.17), (-1.1, 1.3)]
+        zcColStack = np.array([zcCol * (1 + 0.1 * ii) for ii in range(3)])
+
+        for defocalType, imgFilePath in (
+            (DefocalType.Intra, self.imgFilePathIntra),
+            (DefocalType.Extra, self.imgFilePathExtra),
+        ):
+            imgList = []
+            projImgList = []
+            for fieldXY, zc in zip(fieldXYList, zcColStack):
+                wfsImg = CompensableImage()
+                wfsImg.setImg(fieldXY, defocalType, imageFile=imgFilePath)
+                wfsImg.imageCoCenter(self.inst)
+                wfsImg.updateImgInit()
+                imgList.append(wfsImg.getImg().copy())
+
+                wfsImg.setOffAxisCorr(self.inst, 10)
+                wfsImg.compensate(self.inst, algo, zc, self.opticalModel)
+                projImgList.append(wfsImg.getImg())
+
+            projStack, jacobianStack, causticStack = CompensableImage.compensateStack(
+                self.inst,
+                algo,
+                np.array(imgList),
+                fieldXYList,
+                defocalType,
+                zcColStack,
+                self.opticalModel,
+            )
+
+            self.assertEqual(projStack.shape, (3, 120, 120))
+            self.assertEqual(projStack.dtype, np.float64)
+            self.assertEqual(jacobianStack.shape, (3, 120, 120))
+            np.testing.assert_allclose(projStack, projImgList, rtol=0, atol=1e-10)
+            np.testing.assert_array_equal(causticStack, [False, False, False])
+
+    def testCompensateStackWithFloat32Image(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.imageCoCenter(self.inst)
+        imgStack = np.array([self.wfsImg.getImg()] * 2)
+
+        projStackList = []
+        for dtype in (np.float64, np.float32):
+            projStack, jacobianStack = CompensableImage.compensateStack(
+                self.inst,
+                algo,
+                imgStack.astype(dtype),
+                [self.fieldXY] * 2,
+                DefocalType.Intra,
+                zcCol,
+                self.opticalModel,
+            )[0:2]
+
+            self.assertEqual(projStack.dtype, dtype)
+            self.assertEqual(jacobianStack.dtype, dtype)
+            projStackList.append(projStack)
+
+        np.testing.assert_allclose(
+            projStackList[1], projStackList[0], rtol=0, atol=1e-5
+        )
+
+    def testCompensateStackWithWrongShape(self):
+
+        algo = TempAlgo()
+        imgStack = np.zeros((2, 120, 120))
+        fieldXYList = [self.fieldXY, self.fieldXY]
+
+        self.assertRaises(
+            ValueError,
+            CompensableImage.compensateStack,
+            self.inst,
+            algo,
+            imgStack[0],
+            fieldXYList,
+            DefocalType.Intra,
+            np.zeros(22),
+            self.opticalModel,
+        )
+        self.assertRaises(
+            ValueError,
+            CompensableImage.compensateStack,
+            self.inst,
+            algo,
+            imgStack,
+            fieldXYList[0:1],
+            DefocalType.Intra,
+            np.zeros(22),
+            self.opticalModel,
+        )
+        self.assertRaises(
+            ValueError,
+            CompensableImage.compensateStack,
+            self.inst,
+            algo,
+            imgStack,
+            fieldXYList,
+            DefocalType.Intra,
+            np.zeros((3, 22)),
+            self.opticalModel,
+        )
+        self.assertRaises(
+            ValueError,
+            CompensableImage.compensateStack,
+            self.inst,
+            algo,
+            np.zeros((0, 120, 120)),
+            [],
+            DefocalType.Intra,
+            np.zeros(22),
+            self.opticalModel,
+        )
+
+    def testCompensateStackWithRepeatedFieldAndOrigin(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.imageCoCenter(self.inst)
+        img = self.wfsImg.getImg().copy()
+
+        fieldXYList = [self.fieldXY, (0.0, 0.0), self.fieldXY, (-0.3, 0.2)]
+        for model in ("paraxial", "offAxis"):
+            CompensableImage.clearGeometricMappingCache()
+
+            projImgList = []
+            for fieldXY in fieldXYList:
+                wfsImg = CompensableImage()
+                wfsImg.setImg(fieldXY, DefocalType.Intra, image=img.copy())
+                wfsImg.setOffAxisCorr(self.inst, 10)
+                wfsImg.compensate(self.inst, algo, zcCol, model)
+                projImgList.append(wfsImg.getImg())
+
+            CompensableImage.clearGeometricMappingCache()
+            projStack = CompensableImage.compensateStack(
+                self.inst,
+                algo,
+                np.array([img] * len(fieldXYList)),
+                fieldXYList,
+                DefocalType.Intra,
+                zcCol,
+                model,
+            )[0]
+
+            np.testing.assert_allclose(projStack, projImgList, rtol=0, atol=1e-10)
+
+    def testGetGeometricMappingStack(self):
+
+        self._setIntraImg()
+
+        algo = TempAlgo()
+        projSamples = self.wfsImg.getImgSizeInPix()
+        lutx, luty = self._getPupilGrid(projSamples)
+        fieldXYList = [self.fieldXY, (0.0, 0.0), (-1.1, 1.3), self.fieldXY]
+
+        CompensableImage.clearGeometricMappingCache()
+        geoMapping = self.wfsImg._getGeometricMappingStack(
+            self.inst, algo, lutx, luty, projSamples, fieldXYList, self.opticalModel
+        )
+
+        # The mapping of each donut is the same as the one of single donut,
+        # which is put into the cache
+        CompensableImage.clearGeometricMappingCache()
+        for idx, fieldXY in enumerate(fieldXYList):
+            wfsImg = CompensableImage()
+            wfsImg.setImg(fieldXY, DefocalType.Intra, imageFile=self.imgFilePathIntra)
+            wfsImg.setOffAxisCorr(self.inst, 10)
+            geoMappingOfDonut = wfsImg.getGeometricMapping(
+                self.inst, algo, lutx, luty, projSamples, self.opticalModel
+            )
+            for key, value in geoMappingOfDonut.items():
+                self.assertEqual(geoMapping[key].shape[0], len(fieldXYList))
+                np.testing.assert_array_equal(geoMapping[key][idx], value)
+
+        self.assertEqual(CompensableImage._geometricMappingCache.getNumOfEntries(), 3)
+
+        # The mapping of paraxial model is shared by all the donuts
+        geoMappingParaxial = self.wfsImg._getGeometricMappingStack(
+            self.inst, algo, lutx, luty, projSamples, fieldXYList, "paraxial"
+        )
+        self.assertEqual(geoMappingParaxial["lutxp"].shape, (projSamples, projSamples))
+
+    def testGetProjSupport(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+
+        projSamples = self.wfsImg.getImgSizeInPix()
+        lutx, luty = self._getPupilGrid(projSamples)
+
+        support = self._getProjSupport(algo, zcCol, lutx, luty, projSamples)
+        self.assertEqual(support.shape, (projSamples, projSamples))
+        self.assertFalse(support.flags.writeable)
+
+        # Reuse the support if the change of wavefront is small
+        zcColSmallChange = zcCol.copy()
+        zcColSmallChange[3] += 0.5 * CompensableImage.PROJ_SUPPORT_ZK_TOL_IN_M
+        supportReused = self._getProjSupport(
+            algo, zcColSmallChange, lutx, luty, projSamples
+        )
+        self.assertIs(supportReused, support)
+
+        # Recalculate the support if the change of wavefront is large
+        zcColLargeChange = zcCol.copy()
+        zcColLargeChange[3] += 1e-6
+        supportNew = self._getProjSupport(
+            algo, zcColLargeChange, lutx, luty, projSamples
+        )
+        self.assertIsNot(supportNew, support)
+
+    def _getProjSupport(self, algo, zcCol, lutx, luty, projSamples):
+
+        lutxp, lutyp = self.wfsImg._aperture2image(
+            self.inst, algo, zcCol, lutx, luty, projSamples, self.opticalModel
+        )[0:2]
+
+        geoMappingKey = self.wfsImg._getGeometricMappingKey(
+            self.inst, algo, projSamples, self.opticalModel
+        )
+
+        return self.wfsImg._getProjSupport(
+            self.inst, zcCol, lutxp, lutyp, projSamples, geoMappingKey
+        )
+
     def testCenterOnProjection(self):
 
         template = self._prepareGaussian2D(100, 1)
@@ -265,6 +708,114 @@ class TestCompensableImage(unittest.TestCase):
             * np.exp(-(xx ** 2 / (2 * sigma ** 2) + yy ** 2 / (2 * sigma ** 2)))
         )
 
+    def testCenterOnProjectionWithOddSizeAndNegativeShift(self):
+
+        template = self._prepareGaussian2D(101, 1)
+
+        img = np.roll(np.roll(template, -9, axis=1), -3, axis=0)
+
+        imgRecenter = self.wfsImg.centerOnProjection(img, template, window=20)
+        self.assertLess(np.sum(np.abs(imgRecenter - template)), 1e-7)
+
+    def testCenterOnProjectionOutOfWindow(self):
+
+        template = self._prepareGaussian2D(100, 1)
+
+        # The shift of 15 pixels is out of the window, and the best shift in
+        # the window is at the boundary of [-window/2, window/2)
+        img = np.roll(template, 15, axis=1)
+
+        imgRecenter = self.wfsImg.centerOnProjection(img, template, window=20)
+        np.testing.assert_array_equal(imgRecenter, np.roll(img, -9, axis=1))
+
+    def testCenterOnProjectionStack(self):
+
+        template = self._prepareGaussian2D(100, 1)
+        shiftList = [(2, 8), (-9, -3), (0, 0), (15, 0)]
+
+        imgStack = np.array(
+            [np.roll(template, shift, axis=(1, 0)) for shift in shiftList]
+        )
+        templateStack = np.array([template] * len(shiftList))
+
+        imgRecenterStack = self.wfsImg._centerOnProjectionStack(
+            imgStack, templateStack, window=20
+        )
+        for img, imgRecenter in zip(imgStack, imgRecenterStack):
+            np.testing.assert_array_equal(
+                imgRecenter, self.wfsImg.centerOnProjection(img, template, window=20)
+            )
+
+    def testGetProjSupportStack(self):
+
+        algo = TempAlgo()
+        zcCol = np.zeros(22)
+        zcCol[3:] = self.zcCol * 1e-9
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+
+        projSamples = self.wfsImg.getImgSizeInPix()
+        lutx, luty = self._getPupilGrid(projSamples)
+        lutxp, lutyp = self.wfsImg._aperture2image(
+            self.inst, algo, zcCol, lutx, luty, projSamples, self.opticalModel
+        )[0:2]
+
+        # The last donut is out of the projection
+        lutxpStack = np.array([lutxp, lutxp[::-1, :], np.full_like(lutxp, np.nan)])
+        lutypStack = np.array([lutyp, lutyp[::-1, :], lutyp])
+        supportStack, isOutOfProj = self.wfsImg._getProjSupportStack(
+            self.inst, lutxpStack, lutypStack, projSamples
+        )
+
+        np.testing.assert_array_equal(isOutOfProj, [False, False, True])
+        np.testing.assert_array_equal(supportStack[2], False)
+        for idx in range(2):
+            wfsImg = CompensableImage()
+            wfsImg.setImg(
+                self.fieldXY, DefocalType.Intra, imageFile=self.imgFilePathIntra
+            )
+            support = wfsImg._getProjSupport(
+                self.inst, zcCol, lutxpStack[idx], lutypStack[idx], projSamples, idx
+            )
+            np.testing.assert_array_equal(supportStack[idx], support)
+
+    def testPoly10WithStackOfCoeffs(self):
+
+        self._setIntraImg()
+        self.wfsImg.setOffAxisCorr(self.inst, 10)
+
+        offAxisCoeff = self.wfsImg.getOffAxisCoeff()[0]
+        lutx, luty = self._getPupilGrid(40)
+        lutxStack = np.array([lutx, luty, -lutx, lutx])
+        lutyStack = np.array([luty, lutx, luty, -luty])
+
+        polyStack = self.wfsImg._poly10_2D(offAxisCoeff, lutxStack, y=lutyStack)
+        for idx in range(len(offAxisCoeff)):
+            np.testing.assert_array_equal(
+                polyStack[idx],
+                self.wfsImg._poly10_2D(
+                    offAxisCoeff[idx], lutxStack[idx], y=lutyStack[idx]
+                ),
+            )
+
+        for atype in ("dx", "dy"):
+            gradStack = self.wfsImg._poly10Grad(
+                offAxisCoeff, lutxStack, lutyStack, atype
+            )
+            for idx in range(len(offAxisCoeff)):
+                np.testing.assert_array_equal(
+                    gradStack[idx],
+                    self.wfsImg._poly10Grad(
+                        offAxisCoeff[idx], lutxStack[idx], lutyStack[idx], atype
+                    ),
+                )
+
+        # The number of points should be a multiple of the parameter sets
+        self.assertRaises(
+            ValueError, self.wfsImg._poly10_2D, offAxisCoeff[0:3], lutxStack, lutyStack
+        )
+
     def testSetOffAxisCorr(self):
 
         self._setIntraImg()
@@ -304,6 +855,17 @@ class TestCompensableImage(unittest.TestCase):
         )
         self.assertAlmostEqual(np.sum(np.abs(masklist - masklistAns)), 0)
 
+    def testMakeMaskListWithFieldXY(self):
+
+        self._setIntraImg()
+
+        model = "offAxis"
+        masklist = self.wfsImg.makeMaskList(self.inst, model, fieldX=0.0, fieldY=0.0)
+
+        wfsImg = CompensableImage()
+        masklistAns = wfsImg.makeMaskList(self.inst, model)
+        np.testing.assert_array_equal(masklist, masklistAns)
+
     def testMakeMask(self):
 
         self._setIntraImg()
@@ -320,6 +882,51 @@ class TestCompensableImage(unittest.TestCase):
         self.assertEqual(cMask.shape, image.shape)
         self.assertEqual(np.sum(np.abs(cMask - pMask)), 3001)
 
+    def testMakeMaskWithCache(self):
+
+        self._setIntraImg()
+
+        boundaryT = 8
+        model = "offAxis"
+        self.wfsImg.makeMask(self.inst, model, boundaryT, 1)
+        pMask = self.wfsImg.getPaddedMask()
+
+        self.assertEqual(pMask.dtype, int)
+        self.assertTrue(pMask.flags.writeable)
+
+        # The donut close to the field position shares the same mask
+        wfsImg = CompensableImage()
+        fieldXY = (self.fieldXY[0] + 1e-5, self.fieldXY[1] - 1e-5)
+        wfsImg.setImg(fieldXY, DefocalType.Intra, imageFile=self.imgFilePathIntra)
+        wfsImg.makeMask(self.inst, model, boundaryT, 1)
+
+        np.testing.assert_array_equal(wfsImg.getPaddedMask(), pMask)
+        self.assertIsNot(wfsImg.getPaddedMask(), pMask)
+
+        # The mask at the other field position is different
+        fieldXY = (-self.fieldXY[0], self.fieldXY[1])
+        wfsImg.setImg(fieldXY, DefocalType.Intra, imageFile=self.imgFilePathIntra)
+        wfsImg.makeMask(self.inst, model, boundaryT, 1)
+
+        self.assertGreater(np.sum(wfsImg.getPaddedMask() != pMask), 0)
+
+    def testMakeMaskWithCacheOfOtherInstrument(self):
+
+        self._setIntraImg()
+
+        boundaryT = 8
+        model = "offAxis"
+        self.wfsImg.makeMask(self.inst, model, boundaryT, 1)
+        pMask = self.wfsImg.getPaddedMask()
+
+        # The instrument with the other sensor grid does not share the mask
+        inst = Instrument(os.path.join(getConfigDir(), "cwfs", "instData"))
+        inst.config(CamType.LsstCam, 160, announcedDefocalDisInMm=1.0)
+        self.wfsImg.makeMask(inst, model, boundaryT, 1)
+
+        self.assertEqual(pMask.shape, (120, 120))
+        self.assertEqual(self.wfsImg.getPaddedMask().shape, (160, 160))
+
 
 if __name__ == "__main__":
 
@@ -0,0 +1,136 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.ConvergencePolicy import ConvergencePolicy
+
+
+class TestConvergencePolicy(unittest.TestCase):
+    """Test the ConvergencePolicy class."""
+
+    def setUp(self):
+
+        self.zkPrev = np.zeros(22)
+        self.zkPrev[3:] = 100
+
+    def testInitWithoutTol(self):
+
+        self.assertRaises(ValueError, ConvergencePolicy)
+
+    def testInitWithWrongPatience(self):
+
+        self.assertRaises(ValueError, ConvergencePolicy, absTol=1, patience=0)
+
+    def testInitWithWrongLengthOfTol(self):
+
+        self.assertRaises(
+            ValueError, ConvergencePolicy, absTol=[1, 2, 3], zkGroups=[[4, 5], [6]]
+        )
+
+    def testInitWithWrongZkGroups(self):
+
+        self.assertRaises(ValueError, ConvergencePolicy, absTol=1, zkGroups=[[0, 4]])
+
+    def testIsConvergedWithAbsTol(self):
+
+        policy = ConvergencePolicy(absTol=1.0)
+        policy.start()
+
+        zkCurr = self.zkPrev.copy()
+        zkCurr[10] += 0.5
+        self.assertTrue(policy.isConverged(self.zkPrev, zkCurr))
+
+        zkCurr[10] += 1.0
+        self.assertFalse(policy.isConverged(self.zkPrev, zkCurr))
+
+    def testIsConvergedIgnoreLowerTerms(self):
+
+        policy = ConvergencePolicy(absTol=1.0)
+        policy.start()
+
+        zkCurr = self.zkPrev.copy()
+        zkCurr[:3] += 10
+        self.assertTrue(policy.isConverged(self.zkPrev, zkCurr))
+
+    def testIsConvergedWithRelTol(self):
+
+        policy = ConvergencePolicy(relTol=0.01)
+        policy.start()
+
+        zkCurr = self.zkPrev.copy()
+        zkCurr[10] += 0.5
+        self.assertTrue(policy.isConverged(self.zkPrev, zkCurr))
+
+        zkCurr[10] += 1.0
+        self.assertFalse(policy.isConverged(self.zkPrev, zkCurr))
+
+    def testIsConvergedWithZkGroups(self):
+
+        policy = ConvergencePolicy(absTol=[1.0, 5.0], zkGroups=[[4, 5, 6], [7, 8]])
+        policy.start()
+
+        zkCurr = self.zkPrev.copy()
+        zkCurr[6] += 3.0
+        self.assertTrue(policy.isConverged(self.zkPrev, zkCurr))
+
+        # z11 is not in any group
+        zkCurr[10] += 100.0
+        self.assertTrue(policy.isConverged(self.zkPrev, zkCurr))
+
+        zkCurr[3] += 3.0
+        self.assertFalse(policy.isConverged(self.zkPrev, zkCurr))
+
+    def testIsConvergedWithPatience(self):
+
+        policy = ConvergencePolicy(absTol=1.0, patience=2)
+        policy.start()
+
+        self.assertFalse(policy.isConverged(self.zkPrev, self.zkPrev))
+        self.assertTrue(policy.isConverged(self.zkPrev, self.zkPrev))
+
+        zkCurr = self.zkPrev + 10
+        self.assertFalse(policy.isConverged(self.zkPrev, zkCurr))
+        self.assertFalse(policy.isConverged(self.zkPrev, self.zkPrev))
+
+        policy.start()
+        self.assertFalse(policy.isConverged(self.zkPrev, self.zkPrev))
+
+    def testIsTimeOut(self):
+
+        policy = ConvergencePolicy(absTol=1.0)
+        self.assertEqual(policy.getMaxTimeInSec(), None)
+
+        policy.start()
+        self.assertFalse(policy.isTimeOut())
+
+        policy = ConvergencePolicy(absTol=1.0, maxTimeInSec=0.01)
+        policy.start()
+        time.sleep(0.02)
+        self.assertTrue(policy.isTimeOut())
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
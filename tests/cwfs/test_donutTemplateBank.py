@@ -0,0 +1,131 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from lsst.ts.wep.cwfs.DonutTemplateBank import DonutTemplateBank
+from lsst.ts.wep.cwfs.DonutTemplateModel import DonutTemplateModel
+from lsst.ts.wep.Utility import CamType, DefocalType
+
+
+class TestDonutTemplateBank(unittest.TestCase):
+    """Test the DonutTemplateBank class."""
+
+    def setUp(self):
+
+        self.templateBank = DonutTemplateBank(maxSize=2)
+
+        self.testDir = tempfile.TemporaryDirectory()
+        self.bankFilePath = os.path.join(self.testDir.name, "templateBank.npz")
+
+    def tearDown(self):
+
+        self.testDir.cleanup()
+
+    def testGetTemplateKey(self):
+
+        key = DonutTemplateBank.getTemplateKey("R22_S11", DefocalType.Extra, 160)
+        self.assertEqual(key, "LsstCam/R22_S11/Extra/160/offAxis/0.2")
+
+        key = DonutTemplateBank.getTemplateKey(
+            "R22_S11",
+            DefocalType.Intra,
+            120,
+            camType=CamType.ComCam,
+            opticalModel="onAxis",
+            pixelScale=0.1,
+        )
+        self.assertEqual(key, "ComCam/R22_S11/Intra/120/onAxis/0.1")
+
+    def testMakeTemplateWithoutBank(self):
+
+        self.assertEqual(self.templateBank.getBankFilePath(), None)
+        self.assertEqual(self.templateBank.getTemplateKeys(), [])
+
+        template = self.templateBank.makeTemplate("R22_S11", DefocalType.Extra, 160)
+
+        templateModel = DonutTemplateModel().makeTemplate(
+            "R22_S11", DefocalType.Extra, 160
+        )
+        np.testing.assert_array_equal(template, templateModel)
+        self.assertEqual(self.templateBank.getNumOfCachedTemplates(), 1)
+
+    def testMakeTemplateWithCache(self):
+
+        template = self.templateBank.makeTemplate("R22_S11", DefocalType.Extra, 160)
+
+        # The returned template is a copy of the cached one
+        template[:] = 0
+        templateAgain = self.templateBank.makeTemplate(
+            "R22_S11", DefocalType.Extra, 160
+        )
+        self.assertEqual(np.max(templateAgain), 1)
+        self.assertEqual(self.templateBank.getNumOfCachedTemplates(), 1)
+
+        self.templateBank.clearCache()
+        self.assertEqual(self.templateBank.getNumOfCachedTemplates(), 0)
+
+    def testMakeAndReadBank(self):
+
+        self.templateBank.makeBank(
+            self.bankFilePath, ["R22_S11", "R00_S22_C0"], imageSizeList=[120, 160]
+        )
+        self.assertTrue(os.path.exists(self.bankFilePath))
+
+        templateBank = DonutTemplateBank(donutTemplate=_DonutTemplateNotUsed())
+        templateBank.readBank(self.bankFilePath)
+
+        self.assertEqual(templateBank.getBankFilePath(), self.bankFilePath)
+        self.assertEqual(len(templateBank.getTemplateKeys()), 8)
+
+        # The templates are read from the bank
+        templateModel = DonutTemplateModel()
+        for sensorName in ("R22_S11", "R00_S22_C0"):
+            for defocalType in (DefocalType.Intra, DefocalType.Extra):
+                template = templateBank.makeTemplate(sensorName, defocalType, 120)
+                self.assertEqual(template.dtype, int)
+                np.testing.assert_array_equal(
+                    template,
+                    templateModel.makeTemplate(sensorName, defocalType, 120),
+                )
+
+        # The template not in the bank is made by the donut template object
+        self.assertRaises(
+            RuntimeError, templateBank.makeTemplate, "R22_S11", DefocalType.Extra, 100
+        )
+
+
+class _DonutTemplateNotUsed(object):
+    """Donut template object that should not be called."""
+
+    def makeTemplate(self, *args, **kwargs):
+
+        raise RuntimeError("The template should be read from the bank.")
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
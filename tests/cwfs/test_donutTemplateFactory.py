@@ -24,6 +24,7 @@ import unittest
 from lsst.ts.wep.Utility import DonutTemplateType
 from lsst.ts.wep.cwfs.DonutTemplateFactory import DonutTemplateFactory
 from lsst.ts.wep.cwfs.DonutTemplateModel import DonutTemplateModel
+from lsst.ts.wep.cwfs.DonutTemplateBank import DonutTemplateBank
 
 
 class TestTemplateMakerFactory(unittest.TestCase):
@@ -36,6 +37,11 @@ class TestTemplateMakerFactory(unittest.TestCase):
         )
         self.assertTrue(isinstance(donutTemplate, DonutTemplateModel))
 
+    def testCreateTemplateBank(self):
+
+        donutTemplate = DonutTemplateFactory.createDonutTemplate(DonutTemplateType.Bank)
+        self.assertTrue(isinstance(donutTemplate, DonutTemplateBank))
+
     def testCreateCentroidFindWrongType(self):
 
         self.assertRaises(
@@ -70,6 +70,31 @@ class TestTemplateModel(unittest.TestCase):
         self.assertEqual(np.shape(smallTemplate), (imageSize - 20, imageSize - 20))
         np.testing.assert_array_equal(templateArray[10:-10, 10:-10], smallTemplate)
 
+    def testMakeTemplateWithCache(self):
+
+        DonutTemplateModel.clearCache()
+
+        imageSize = 160
+        templateArray = self.templateMaker.makeTemplate(
+            "R22_S11", DefocalType.Extra, imageSize
+        )
+        templateIntra = DonutTemplateModel().makeTemplate(
+            "R22_S11", DefocalType.Intra, imageSize
+        )
+
+        # The focal plane layout and instrument are shared
+        self.assertEqual(DonutTemplateModel._focalPlaneLayoutCache.getNumOfEntries(), 1)
+        self.assertEqual(DonutTemplateModel._instCache.getNumOfEntries(), 1)
+
+        np.testing.assert_array_equal(
+            self.templateMaker.makeTemplate("R22_S11", DefocalType.Extra, imageSize),
+            templateArray,
+        )
+        self.assertEqual(templateIntra.shape, templateArray.shape)
+
+        DonutTemplateModel.clearCache()
+        self.assertEqual(DonutTemplateModel._instCache.getNumOfEntries(), 0)
+
 
 if __name__ == "__main__":
 
@@ -0,0 +1,75 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.FftBackendDefault import FftBackendDefault
+
+
+class TestFftBackendDefault(unittest.TestCase):
+    """Test the FftBackendDefault class."""
+
+    def setUp(self):
+
+        self.fftBackend = FftBackendDefault()
+
+    def testInitWithWrongNumOfWorkers(self):
+
+        self.assertRaises(ValueError, FftBackendDefault, numOfWorkers=0)
+
+    def testGetNumOfWorkers(self):
+
+        self.assertEqual(self.fftBackend.getNumOfWorkers(), 1)
+
+    def testRfft2(self):
+
+        self.assertRaises(NotImplementedError, self.fftBackend.rfft2, np.zeros((4, 4)))
+
+    def testIrfft2(self):
+
+        self.assertRaises(
+            NotImplementedError, self.fftBackend.irfft2, np.zeros((4, 3)), (4, 4)
+        )
+
+    def testGetInvLaplacianKernel(self):
+
+        padDim = 8
+        aperturePixelSize = 0.05
+        kernel = self.fftBackend.getInvLaplacianKernel(padDim, aperturePixelSize)
+
+        self.assertEqual(kernel.shape, (padDim, padDim // 2 + 1))
+        self.assertFalse(kernel.flags.writeable)
+        self.assertEqual(kernel[0, 0], 0)
+
+        freq = 1.0 / padDim / aperturePixelSize
+        self.assertAlmostEqual(kernel[0, 1], -1.0 / (4 * np.pi**2 * freq**2))
+        self.assertAlmostEqual(kernel[-1, 0], kernel[1, 0])
+
+        self.assertTrue(
+            self.fftBackend.getInvLaplacianKernel(padDim, aperturePixelSize) is kernel
+        )
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,56 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.BaseFftBackendTestCase import BaseFftBackendTestCase
+from lsst.ts.wep.cwfs.FftBackendPyfftw import FftBackendPyfftw, pyfftw
+
+
+@unittest.skipIf(pyfftw is None, "The pyfftw is not installed.")
+class TestFftBackendPyfftw(BaseFftBackendTestCase, unittest.TestCase):
+    """Test the FftBackendPyfftw class."""
+
+    def createFftBackend(self):
+
+        return FftBackendPyfftw(numOfWorkers=2)
+
+    def testRfft2WithPlanCache(self):
+
+        self.fftBackend.rfft2(self.signal)
+        self.fftBackend.rfft2(np.zeros_like(self.signal))
+        self.assertEqual(self.fftBackend._planCache.getNumOfEntries(), 1)
+
+
+@unittest.skipIf(pyfftw is not None, "The pyfftw is installed.")
+class TestFftBackendPyfftwWithoutPyfftw(unittest.TestCase):
+    """Test the FftBackendPyfftw class without the pyfftw."""
+
+    def testInit(self):
+
+        self.assertRaises(RuntimeError, FftBackendPyfftw)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
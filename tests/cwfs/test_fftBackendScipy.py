@@ -0,0 +1,43 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+
+from lsst.ts.wep.cwfs.BaseFftBackendTestCase import BaseFftBackendTestCase
+from lsst.ts.wep.cwfs.FftBackendScipy import FftBackendScipy
+
+
+class TestFftBackendScipy(BaseFftBackendTestCase, unittest.TestCase):
+    """Test the FftBackendScipy class."""
+
+    def createFftBackend(self):
+
+        return FftBackendScipy(numOfWorkers=2)
+
+    def testGetNumOfWorkers(self):
+
+        self.assertEqual(self.fftBackend.getNumOfWorkers(), 2)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
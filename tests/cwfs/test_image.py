@@ -98,6 +98,43 @@ class TestImage(unittest.TestCase):
         self.assertEqual(int(realcy), 61)
         self.assertGreater(int(realR), 35)
 
+    def testGetCenterAndRWithCache(self):
+
+        centerAndR = self.img.getCenterAndR()
+        self.assertIs(self.img.getCenterAndR(), centerAndR)
+
+        # The centroid data are recalculated after updating the image
+        self.img.updateImage(np.roll(self.img.getImg(), 5, axis=1))
+        realcx, realcy, realR = self.img.getCenterAndR()
+
+        self.assertAlmostEqual(realcx, centerAndR[0] + 5, places=6)
+        self.assertAlmostEqual(realcy, centerAndR[1], places=6)
+        self.assertAlmostEqual(realR, centerAndR[2], places=6)
+
+    def testGetCenterAndRWithImage(self):
+
+        centerAndR = self.img.getCenterAndR()
+
+        image = np.roll(self.img.getImg(), 5, axis=0)
+        realcx, realcy, realR = self.img.getCenterAndR(image=image)
+        self.assertAlmostEqual(realcy, centerAndR[1] + 5, places=6)
+
+        # The input image does not change the centroid data of current image
+        self.assertIs(self.img.getCenterAndR(), centerAndR)
+
+    def testGetImgBinary(self):
+
+        imgBinary = self.img.getImgBinary()
+
+        ansImgBinary = self.img.getCentroidFind().getImgBinary(self.img.getImg())
+        np.testing.assert_array_equal(imgBinary, ansImgBinary)
+        self.assertFalse(imgBinary.flags.writeable)
+        self.assertIs(self.img.getImgBinary(), imgBinary)
+
+        # The binary image is recalculated after setting the image
+        self.img.setImg(image=np.zeros((10, 10)))
+        self.assertEqual(np.sum(self.img.getImgBinary()), 0)
+
     def testGetSNR(self):
 
         # Add the noise to the image
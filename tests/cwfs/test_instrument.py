@@ -77,6 +77,28 @@ class TestInstrument(unittest.TestCase):
         self.assertEqual(maskOffAxisCorr[0, 0], 1.07)
         self.assertEqual(maskOffAxisCorr[2, 3], -0.090100858)
 
+    def testGetMaskParamTable(self):
+
+        maskParamTable = self.inst.getMaskParamTable()
+        self.assertIs(self.inst.getMaskParamTable(), maskParamTable)
+
+        maskOffAxisCorr = self.inst.getMaskOffAxisCorr()
+        np.testing.assert_array_equal(
+            maskParamTable.interp(np.sqrt(2) * maskOffAxisCorr[2, 0]),
+            maskOffAxisCorr[2, 1:],
+        )
+
+        # The table is rebuilt after the configuration
+        self.inst.config(CamType.LsstFamCam, self.dimOfDonutOnSensor)
+        self.assertIsNot(self.inst.getMaskParamTable(), maskParamTable)
+
+    def testGetMaskParamTableWithoutMaskFile(self):
+
+        inst = Instrument(self.instDir)
+        inst.config(CamType.AuxTel, 160, announcedDefocalDisInMm=0.8)
+
+        self.assertRaises(ValueError, inst.getMaskParamTable)
+
     def testGetDimOfDonutOnSensor(self):
 
         dimOfDonutOnSensor = self.inst.getDimOfDonutOnSensor()
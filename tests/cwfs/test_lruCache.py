@@ -0,0 +1,93 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+
+from lsst.ts.wep.cwfs.LruCache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    """Test the LruCache class."""
+
+    def setUp(self):
+
+        self.cache = LruCache(maxSize=2)
+
+    def testInitWithWrongSize(self):
+
+        self.assertRaises(ValueError, LruCache, maxSize=0)
+
+    def testGetAndPut(self):
+
+        self.assertEqual(self.cache.get("a"), None)
+        self.assertEqual(self.cache.get("a", default=-1), -1)
+
+        self.cache.put("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertTrue("a" in self.cache)
+
+    def testEviction(self):
+
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+
+        # Touch "a" to make "b" the least recently used one
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        self.assertEqual(self.cache.getNumOfEntries(), 2)
+        self.assertTrue("a" in self.cache)
+        self.assertFalse("b" in self.cache)
+
+    def testSetMaxSize(self):
+
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.setMaxSize(1)
+
+        self.assertEqual(self.cache.getMaxSize(), 1)
+        self.assertEqual(self.cache.getNumOfEntries(), 1)
+        self.assertTrue("b" in self.cache)
+
+    def testGetOrCreate(self):
+
+        counter = []
+
+        def creator():
+            counter.append(1)
+            return len(counter)
+
+        self.assertEqual(self.cache.getOrCreate("a", creator), 1)
+        self.assertEqual(self.cache.getOrCreate("a", creator), 1)
+        self.assertEqual(len(counter), 1)
+
+    def testClear(self):
+
+        self.cache.put("a", 1)
+        self.cache.clear()
+
+        self.assertEqual(self.cache.getNumOfEntries(), 0)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
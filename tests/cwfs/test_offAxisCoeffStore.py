@@ -0,0 +1,130 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.OffAxisCoeffStore import OffAxisCoeffStore
+from lsst.ts.wep.ParamReader import ParamReader
+from lsst.ts.wep.Utility import getConfigDir
+
+
+class TestOffAxisCoeffStore(unittest.TestCase):
+    """Test the OffAxisCoeffStore class."""
+
+    def setUp(self):
+
+        self.instDir = os.path.join(getConfigDir(), "cwfs", "instData", "lsst")
+
+        self.store = OffAxisCoeffStore()
+
+    def testGetNumOfEntries(self):
+
+        self.assertEqual(self.store.getNumOfEntries(), 0)
+
+    def testGetCorrData(self):
+
+        corrData = self.store.getCorrData(self.instDir)
+
+        self.assertEqual(len(corrData), 4)
+        for config, cdata in zip(OffAxisCoeffStore.CONFIG_LIST, corrData):
+            filePath = os.path.join(self.instDir, "offAxis_%s_poly10.yaml" % config)
+            ans = ParamReader(filePath=filePath).getMatContent()
+            np.testing.assert_array_equal(cdata, ans)
+            self.assertFalse(cdata.flags.writeable)
+
+        self.assertEqual(self.store.getNumOfEntries(), 1)
+
+    def testGetCorrTables(self):
+
+        corrTables = self.store.getCorrTables(self.instDir)
+        corrData = self.store.getCorrData(self.instDir)
+
+        self.assertEqual(len(corrTables), 4)
+        for corrTable, cdata in zip(corrTables, corrData):
+            ruler = np.sqrt(cdata[:, 1] ** 2 + cdata[:, 2] ** 2)
+            idx = np.argmax(ruler)
+            np.testing.assert_array_equal(corrTable.interp(ruler[idx]), cdata[idx, 3:])
+
+        self.assertIs(self.store.getCorrTables(self.instDir), corrTables)
+        self.assertEqual(self.store.getNumOfEntries(), 1)
+
+    def testGetCorrDataReadOnce(self):
+
+        tempDir = tempfile.mkdtemp()
+        try:
+            for config in OffAxisCoeffStore.CONFIG_LIST:
+                fileName = "offAxis_%s_poly10.yaml" % config
+                shutil.copy(os.path.join(self.instDir, fileName), tempDir)
+
+            corrData = self.store.getCorrData(tempDir)
+
+            # The data are kept after the files are removed
+            for fileName in os.listdir(tempDir):
+                os.remove(os.path.join(tempDir, fileName))
+
+            self.assertIs(self.store.getCorrData(tempDir), corrData)
+
+        finally:
+            shutil.rmtree(tempDir)
+
+    def testGetCorrDataWithoutFile(self):
+
+        tempDir = tempfile.mkdtemp()
+        try:
+            self.assertRaises(ValueError, self.store.getCorrData, tempDir)
+        finally:
+            shutil.rmtree(tempDir)
+
+    def testGetCorrDataInThreads(self):
+
+        results = []
+
+        def getCorrData():
+            results.append(self.store.getCorrData(self.instDir))
+
+        threads = [threading.Thread(target=getCorrData) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.store.getNumOfEntries(), 1)
+        for corrData in results:
+            self.assertIs(corrData, results[0])
+
+    def testClear(self):
+
+        self.store.getCorrData(self.instDir)
+        self.store.clear()
+
+        self.assertEqual(self.store.getNumOfEntries(), 0)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
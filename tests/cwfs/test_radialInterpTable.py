@@ -0,0 +1,87 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.RadialInterpTable import RadialInterpTable
+
+
+class TestRadialInterpTable(unittest.TestCase):
+    """Test the RadialInterpTable class."""
+
+    def setUp(self):
+
+        self.ruler = np.array([1.3, 1.0, 1.2, 1.1])
+        self.parameters = np.array([[4.0, -4.0], [1.0, -1.0], [3.0, -3.0], [2.0, -2.0]])
+
+        self.table = RadialInterpTable(self.ruler, self.parameters)
+
+    def testGetRuler(self):
+
+        ruler = self.table.getRuler()
+        np.testing.assert_array_equal(ruler, np.sort(self.ruler))
+        self.assertFalse(ruler.flags.writeable)
+
+    def testGetParameters(self):
+
+        parameters = self.table.getParameters()
+        np.testing.assert_array_equal(parameters[:, 0], [1.0, 2.0, 3.0, 4.0])
+        self.assertFalse(parameters.flags.writeable)
+
+    def testInterp(self):
+
+        np.testing.assert_allclose(self.table.interp(1.05), [1.5, -1.5])
+        np.testing.assert_allclose(self.table.interp(1.25), [3.5, -3.5])
+
+    def testInterpOnRuler(self):
+
+        for ruler, param in zip(self.ruler, self.parameters):
+            np.testing.assert_array_equal(self.table.interp(ruler), param)
+
+    def testInterpOutOfRange(self):
+
+        np.testing.assert_array_equal(self.table.interp(0.5), [1.0, -1.0])
+        np.testing.assert_array_equal(self.table.interp(2.0), [4.0, -4.0])
+
+    def testInterpArray(self):
+
+        fieldDist = np.array([[0.5, 1.05], [1.25, 2.0]])
+        param = self.table.interp(fieldDist)
+
+        self.assertEqual(param.shape, (2, 2, 2))
+        for idx in np.ndindex(fieldDist.shape):
+            np.testing.assert_array_equal(param[idx], self.table.interp(fieldDist[idx]))
+
+    def testInitWithWrongShape(self):
+
+        self.assertRaises(
+            ValueError, RadialInterpTable, self.ruler, self.parameters[:-1, :]
+        )
+        self.assertRaises(ValueError, RadialInterpTable, self.ruler, self.ruler)
+        self.assertRaises(ValueError, RadialInterpTable, [], np.zeros((0, 2)))
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,102 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+from scipy.signal import correlate
+
+from lsst.ts.wep.cwfs.TemplateCorrelator import TemplateCorrelator
+
+
+class TestTemplateCorrelator(unittest.TestCase):
+    """Test the TemplateCorrelator class."""
+
+    def setUp(self):
+
+        rng = np.random.default_rng(seed=1)
+        self.template = (rng.random((33, 40)) > 0.5).astype(int)
+        self.image = (rng.random((161, 157)) > 0.6).astype(int)
+
+        self.correlator = TemplateCorrelator(self.template, maxNumOfSpectra=2)
+
+    def testInitWithWrongDimension(self):
+
+        self.assertRaises(ValueError, TemplateCorrelator, np.zeros(3))
+
+    def testGetTemplate(self):
+
+        template = self.correlator.getTemplate()
+        np.testing.assert_array_equal(template, self.template)
+        self.assertFalse(template.flags.writeable)
+
+        # The template is copied
+        self.template[0, 0] = 2
+        self.assertNotEqual(template[0, 0], 2)
+
+    def testCorrelate(self):
+
+        corr = self.correlator.correlate(self.image)
+
+        self.assertEqual(corr.dtype, np.result_type(self.image, self.template))
+        np.testing.assert_array_equal(
+            corr, correlate(self.image, self.template, mode="same")
+        )
+
+    def testCorrelateWithFloatImage(self):
+
+        image = np.random.default_rng(seed=2).random((50, 60))
+        corr = self.correlator.correlate(image)
+
+        np.testing.assert_allclose(
+            corr, correlate(image, self.template, mode="same"), atol=1e-10
+        )
+
+    def testCorrelateWithSmallImage(self):
+
+        image = self.image[:20, :30]
+        np.testing.assert_array_equal(
+            self.correlator.correlate(image),
+            correlate(image, self.template, mode="same"),
+        )
+
+    def testCorrelateWithWrongDimension(self):
+
+        self.assertRaises(ValueError, self.correlator.correlate, np.zeros(3))
+
+    def testGetNumOfSpectra(self):
+
+        self.assertEqual(self.correlator.getNumOfSpectra(), 0)
+
+        # The spectrum is reused for the same image shape
+        self.correlator.correlate(self.image)
+        self.correlator.correlate(self.image)
+        self.assertEqual(self.correlator.getNumOfSpectra(), 1)
+
+        self.correlator.correlate(self.image[:20, :30])
+        self.correlator.correlate(self.image[:50, :60])
+        self.assertEqual(self.correlator.getNumOfSpectra(), 2)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
@@ -30,8 +30,13 @@ from lsst.ts.wep.cwfs.Tool import (
     ZernikeAnnularGrad,
     ZernikeAnnularJacobian,
     ZernikeAnnularFit,
+    ZernikeAnnularEvalBasis,
+    ZernikeAnnularGradBasis,
+    ZernikeAnnularJacobianBasis,
     padArray,
     extractArray,
+    setNumOfThreads,
+    getNumOfThreads,
 )
 from lsst.ts.wep.Utility import getModulePath
 
@@ -75,12 +80,24 @@ class TestTool(unittest.TestCase):
 
     def _checkAnsWithFile(self, value, ansFileName):
 
-        ansFilePath = os.path.join(self.testDataDir, ansFileName)
-        ans = np.loadtxt(ansFilePath)
+        ans = self._getAnsFromFile(ansFileName)
 
         delta = np.sum(np.abs(value - ans))
         self.assertLess(delta, 1e-10)
 
+    def _checkCloseToFile(self, value, ansFileName):
+
+        # The order of summation of basis is different from the evaluation
+        # with coefficients, so the tolerance is applied to each element.
+        ans = self._getAnsFromFile(ansFileName)
+        np.testing.assert_allclose(value, ans, rtol=1e-10, atol=1e-10)
+
+    def _getAnsFromFile(self, ansFileName):
+
+        ansFilePath = os.path.join(self.testDataDir, ansFileName)
+
+        return np.loadtxt(ansFilePath)
+
     def testZernikeAnnularNormality(self):
 
         ansValue = np.pi * (1 - self.obscuration ** 2)
@@ -201,6 +218,155 @@ class TestTool(unittest.TestCase):
                 self.zerCoef, self.xx, self.yy, self.obscuration, "wrongType"
             )
 
+    def testZernikeAnnularEvalBasis(self):
+
+        basis = ZernikeAnnularEvalBasis(self.xx, self.yy, self.obscuration)
+        self.assertEqual(basis.shape, (28,) + self.xx.shape)
+
+        for ii in (0, 3, 21, 27):
+            zk = np.zeros(28)
+            zk[ii] = 1
+            np.testing.assert_array_equal(
+                basis[ii], ZernikeAnnularEval(zk, self.xx, self.yy, self.obscuration)
+            )
+
+        surface = np.tensordot(self.zerCoef, basis[: len(self.zerCoef)], axes=1)
+        self._checkCloseToFile(surface, "annularZernikeEval.txt")
+
+    def testZernikeAnnularGradBasis(self):
+
+        basis = ZernikeAnnularGradBasis(self.xx, self.yy, self.obscuration, "dxy")
+        self.assertEqual(basis.shape, (22,) + self.xx.shape)
+
+        dxy = np.tensordot(self.zerCoef, basis, axes=1)
+        self._checkCloseToFile(dxy, "annularZernikeGradDxy.txt")
+
+    def testZernikeAnnularGradBasisWrongNumOfTerms(self):
+
+        with self.assertRaises(ValueError):
+            ZernikeAnnularGradBasis(
+                self.xx, self.yy, self.obscuration, "dx", numTerms=23
+            )
+
+    def testZernikeAnnularJacobianBasis(self):
+
+        basis = ZernikeAnnularJacobianBasis(
+            self.xx, self.yy, self.obscuration, "1st", numTerms=22
+        )
+        jacobian = np.tensordot(self.zerCoef, basis, axes=1)
+        self._checkCloseToFile(jacobian, "annularZernikeJaco1st.txt")
+
+        basis = ZernikeAnnularJacobianBasis(
+            self.xx, self.yy, self.obscuration, "2nd", numTerms=22
+        )
+        jacobian = np.tensordot(self.zerCoef**2, basis, axes=1)
+        self._checkCloseToFile(jacobian, "annularZernikeJaco2nd.txt")
+
+    def testZernikeAnnularEvalWithFloat32AndStridedInput(self):
+
+        surface = ZernikeAnnularEval(self.zerCoef, self.xx, self.yy, self.obscuration)
+
+        # Strided input
+        surfaceStrided = ZernikeAnnularEval(
+            self.zerCoef, self.xx.T, self.yy.T, self.obscuration
+        )
+        np.testing.assert_array_equal(surfaceStrided, surface.T)
+
+        # Float32 input is converted to float64
+        xx32 = self.xx.astype(np.float32)
+        yy32 = self.yy.astype(np.float32)
+        surface32 = ZernikeAnnularEval(self.zerCoef, xx32, yy32, self.obscuration)
+        self.assertEqual(surface32.dtype, np.float64)
+        np.testing.assert_array_equal(
+            surface32,
+            ZernikeAnnularEval(
+                self.zerCoef,
+                xx32.astype(np.float64),
+                yy32.astype(np.float64),
+                self.obscuration,
+            ),
+        )
+
+    def testZernikeAnnularEvalWithShortCoef(self):
+
+        surface = ZernikeAnnularEval(self.zerCoef, self.xx, self.yy, self.obscuration)
+
+        zerCoefPadded = np.zeros(28)
+        zerCoefPadded[: len(self.zerCoef)] = self.zerCoef
+        np.testing.assert_array_equal(
+            ZernikeAnnularEval(zerCoefPadded, self.xx, self.yy, self.obscuration),
+            surface,
+        )
+
+    def testZernikeAnnularEvalWithOut(self):
+
+        out = np.zeros_like(self.xx)
+        surface = ZernikeAnnularEval(
+            self.zerCoef, self.xx, self.yy, self.obscuration, out=out
+        )
+
+        self.assertTrue(surface is out)
+        self._checkAnsWithFile(out, "annularZernikeEval.txt")
+
+    def testZernikeAnnularGradBasisWithOut(self):
+
+        out = np.zeros((22,) + self.xx.shape)
+        basis = ZernikeAnnularGradBasis(
+            self.xx, self.yy, self.obscuration, "dx", out=out
+        )
+
+        self.assertTrue(basis is out)
+        np.testing.assert_array_equal(
+            out, ZernikeAnnularGradBasis(self.xx, self.yy, self.obscuration, "dx")
+        )
+
+    def testZernikeAnnularEvalWithWrongOut(self):
+
+        args = (self.zerCoef, self.xx, self.yy, self.obscuration)
+
+        outWrongSize = np.zeros(10)
+        self.assertRaises(ValueError, ZernikeAnnularEval, *args, out=outWrongSize)
+
+        outWrongType = np.zeros(self.xx.shape, dtype=np.float32)
+        self.assertRaises(ValueError, ZernikeAnnularEval, *args, out=outWrongType)
+
+        outReadOnly = np.zeros_like(self.xx)
+        outReadOnly.flags.writeable = False
+        self.assertRaises(ValueError, ZernikeAnnularEval, *args, out=outReadOnly)
+
+    def testSetNumOfThreads(self):
+
+        self.assertEqual(getNumOfThreads(), 1)
+
+        surface = ZernikeAnnularEval(self.zerCoef, self.xx, self.yy, self.obscuration)
+        dx = ZernikeAnnularGrad(self.zerCoef, self.xx, self.yy, self.obscuration, "dx")
+
+        try:
+            setNumOfThreads(4)
+            self.assertEqual(getNumOfThreads(), 4)
+
+            # The result should be independent of the number of threads
+            np.testing.assert_array_equal(
+                ZernikeAnnularEval(self.zerCoef, self.xx, self.yy, self.obscuration),
+                surface,
+            )
+            np.testing.assert_array_equal(
+                ZernikeAnnularGrad(
+                    self.zerCoef, self.xx, self.yy, self.obscuration, "dx"
+                ),
+                dx,
+            )
+
+            setNumOfThreads(0)
+            self.assertGreaterEqual(getNumOfThreads(), 1)
+
+        finally:
+            setNumOfThreads(1)
+
+    def testSetNumOfThreadsWithWrongValue(self):
+
+        self.assertRaises(ValueError, setNumOfThreads, -1)
+
     def testZernikeAnnularFit(self):
 
         opdFitsFile = os.path.join(self.testDataDir, "sim6_iter0_opd0.fits.gz")
@@ -0,0 +1,131 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.Instrument import Instrument
+from lsst.ts.wep.cwfs.ZernikeBasisCache import ZernikeBasisCache
+from lsst.ts.wep.cwfs.Tool import ZernikeAnnularEval, ZernikeAnnularGrad
+from lsst.ts.wep.Utility import getConfigDir, CamType
+
+
+class TestZernikeBasisCache(unittest.TestCase):
+    """Test the ZernikeBasisCache class."""
+
+    def setUp(self):
+
+        instDir = os.path.join(getConfigDir(), "cwfs", "instData")
+        self.inst = Instrument(instDir)
+        self.inst.config(CamType.LsstCam, 60, announcedDefocalDisInMm=1.0)
+
+        self.numTerms = 22
+        self.obscuration = 0.61
+
+        self.basisCache = ZernikeBasisCache(maxSize=2)
+
+    def testGetBasis(self):
+
+        xSensor, ySensor = self.inst.getSensorCoor()
+        for basisType in ZernikeBasisCache.BASIS_TYPES:
+            basis = self.basisCache.getBasis(
+                self.inst, self.numTerms, self.obscuration, basisType=basisType
+            )
+            self.assertEqual(basis.shape, (self.numTerms,) + xSensor.shape)
+
+            for ii in (0, 3, 10, 21):
+                zcCol = np.zeros(self.numTerms)
+                zcCol[ii] = 1
+                if basisType == "eval":
+                    ans = ZernikeAnnularEval(zcCol, xSensor, ySensor, self.obscuration)
+                else:
+                    ans = ZernikeAnnularGrad(
+                        zcCol, xSensor, ySensor, self.obscuration, basisType
+                    )
+
+                np.testing.assert_array_equal(basis[ii], ans)
+
+    def testGetBasisIsCached(self):
+
+        basis = self.basisCache.getBasis(self.inst, self.numTerms, self.obscuration)
+        basisAgain = self.basisCache.getBasis(
+            self.inst, self.numTerms, self.obscuration
+        )
+
+        self.assertTrue(basis is basisAgain)
+        self.assertFalse(basis.flags.writeable)
+        self.assertEqual(self.basisCache.getNumOfEntries(), 1)
+
+    def testGetBasisWithWrongType(self):
+
+        self.assertRaises(
+            ValueError,
+            self.basisCache.getBasis,
+            self.inst,
+            self.numTerms,
+            self.obscuration,
+            basisType="dz",
+        )
+
+    def testGetMaskedBasis(self):
+
+        xSensor, ySensor = self.inst.getSensorCoor()
+        mask = (np.hypot(xSensor, ySensor) < 0.8).astype(int)
+
+        basis = self.basisCache.getMaskedBasis(
+            self.inst, self.numTerms, self.obscuration, mask, basisType="dx"
+        )
+
+        zcCol = np.zeros(self.numTerms)
+        zcCol[7] = 1
+        ans = ZernikeAnnularGrad(
+            zcCol, xSensor * mask, ySensor * mask, self.obscuration, "dx"
+        )
+        np.testing.assert_array_equal(basis[7], ans)
+
+    def testLruEviction(self):
+
+        basis = self.basisCache.getBasis(self.inst, self.numTerms, self.obscuration)
+
+        for dimOfDonut in (80, 100):
+            self.inst.config(CamType.LsstCam, dimOfDonut, announcedDefocalDisInMm=1.0)
+            self.basisCache.getBasis(self.inst, self.numTerms, self.obscuration)
+
+        self.assertEqual(self.basisCache.getNumOfEntries(), 2)
+
+        self.inst.config(CamType.LsstCam, 60, announcedDefocalDisInMm=1.0)
+        basisNew = self.basisCache.getBasis(self.inst, self.numTerms, self.obscuration)
+        self.assertFalse(basis is basisNew)
+        np.testing.assert_array_equal(basis, basisNew)
+
+    def testClear(self):
+
+        self.basisCache.getBasis(self.inst, self.numTerms, self.obscuration)
+        self.basisCache.clear()
+
+        self.assertEqual(self.basisCache.getNumOfEntries(), 0)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,170 @@
+# This file is part of ts_wep.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import numpy as np
+import unittest
+
+from lsst.ts.wep.cwfs.Instrument import Instrument
+from lsst.ts.wep.cwfs.ZernikeMaskedFitter import ZernikeMaskedFitter
+from lsst.ts.wep.cwfs.Tool import ZernikeAnnularEval, ZernikeMaskedFit
+from lsst.ts.wep.Utility import getConfigDir, CamType
+
+
+class TestZernikeMaskedFitter(unittest.TestCase):
+    """Test the ZernikeMaskedFitter class."""
+
+    def setUp(self):
+
+        instDir = os.path.join(getConfigDir(), "cwfs", "instData")
+        inst = Instrument(instDir)
+        inst.config(CamType.LsstCam, 120, announcedDefocalDisInMm=1.0)
+
+        self.xSensor, self.ySensor = inst.getSensorCoor()
+        self.mask = (np.hypot(self.xSensor, self.ySensor) < 0.9).astype(int)
+
+        self.numTerms = 22
+        self.obscuration = 0.61
+
+        zerCoef = np.arange(1, 1 + self.numTerms) * 0.1
+        self.surface = ZernikeAnnularEval(
+            zerCoef, self.xSensor, self.ySensor, self.obscuration
+        )
+
+        self.fitter = ZernikeMaskedFitter(maxSize=2)
+
+    def testFit(self):
+
+        zc = self._fit(self.surface, self.mask)
+
+        ans = ZernikeMaskedFit(
+            self.surface,
+            self.xSensor,
+            self.ySensor,
+            self.numTerms,
+            self.mask,
+            self.obscuration,
+        )
+        np.testing.assert_allclose(zc, ans, rtol=1e-10, atol=1e-10)
+
+    def _fit(self, surface, mask):
+
+        return self.fitter.fit(
+            surface, self.xSensor, self.ySensor, self.numTerms, mask, self.obscuration
+        )
+
+    def testFitWithAsymmetricMask(self):
+
+        mask = self.mask.copy()
+        mask[:, :50] = 0
+
+        zc = self._fit(self.surface, mask)
+
+        ans = ZernikeMaskedFit(
+            self.surface,
+            self.xSensor,
+            self.ySensor,
+            self.numTerms,
+            mask,
+            self.obscuration,
+        )
+        np.testing.assert_allclose(zc, ans, rtol=1e-10, atol=1e-10)
+
+    def testFitIsCached(self):
+
+        self._fit(self.surface, self.mask)
+        self._fit(self.surface * 2, self.mask)
+        self.assertEqual(self.fitter.getNumOfEntries(), 1)
+
+        self._fit(self.surface, self.mask.copy())
+        self.assertEqual(self.fitter.getNumOfEntries(), 1)
+
+        mask = self.mask.copy()
+        mask[0, 0] = 1
+        self._fit(self.surface, mask)
+        self.assertEqual(self.fitter.getNumOfEntries(), 2)
+
+    def testFitWithKey(self):
+
+        key = ("mask", 1)
+        zc = self.fitter.fit(
+            self.surface,
+            self.xSensor,
+            self.ySensor,
+            self.numTerms,
+            self.mask,
+            self.obscuration,
+            key=key,
+        )
+        np.testing.assert_allclose(
+            zc, self._fit(self.surface, self.mask), rtol=1e-10, atol=1e-10
+        )
+
+        # The entry is found by the key without hashing the arrays. There are
+        # the entries of the key and the hashed arrays.
+        self.fitter.fit(
+            self.surface,
+            self.xSensor,
+            self.ySensor,
+            self.numTerms,
+            self.mask.copy(),
+            self.obscuration,
+            key=key,
+        )
+        self.assertEqual(self.fitter.getNumOfEntries(), 2)
+
+    def testFitWithNonFiniteValue(self):
+
+        surface = self.surface.copy()
+        surface[60, 60] = np.nan
+
+        zc = self._fit(surface, self.mask)
+
+        ans = ZernikeMaskedFit(
+            surface,
+            self.xSensor,
+            self.ySensor,
+            self.numTerms,
+            self.mask,
+            self.obscuration,
+        )
+        np.testing.assert_allclose(zc, ans, rtol=1e-10, atol=1e-10)
+
+    def testLruEviction(self):
+
+        for radius in (0.7, 0.8, 0.9):
+            mask = (np.hypot(self.xSensor, self.ySensor) < radius).astype(int)
+            self._fit(self.surface, mask)
+
+        self.assertEqual(self.fitter.getNumOfEntries(), self.fitter.getMaxSize())
+
+    def testClear(self):
+
+        self._fit(self.surface, self.mask)
+        self.fitter.clear()
+
+        self.assertEqual(self.fitter.getNumOfEntries(), 0)
+
+
+if __name__ == "__main__":
+
+    # Do the unit test
+    unittest.main()
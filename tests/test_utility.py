@@ -36,6 +36,8 @@ from lsst.ts.wep.Utility import (
     CentroidFindType,
     getDeblendDonutType,
     DeblendDonutType,
+    getFftBackendType,
+    FftBackendType,
 )
 
 
@@ -88,6 +90,9 @@ class TestUtility(unittest.TestCase):
 
         self.assertEqual(getCentroidFindType("randomWalk"), CentroidFindType.RandomWalk)
         self.assertEqual(getCentroidFindType("otsu"), CentroidFindType.Otsu)
+        self.assertEqual(
+            getCentroidFindType("histogramValley"), CentroidFindType.HistogramValley
+        )
 
     def testGetCentroidFindTypeWithWrongInput(self):
 
@@ -101,6 +106,16 @@ class TestUtility(unittest.TestCase):
 
         self.assertRaises(ValueError, getDeblendDonutType, "wrongType")
 
+    def testGetFftBackendType(self):
+
+        self.assertEqual(getFftBackendType("numpy"), FftBackendType.Numpy)
+        self.assertEqual(getFftBackendType("scipy"), FftBackendType.Scipy)
+        self.assertEqual(getFftBackendType("pyfftw"), FftBackendType.Pyfftw)
+
+    def testGetFftBackendTypeWithWrongInput(self):
+
+        self.assertRaises(ValueError, getFftBackendType, "wrongType")
+
 
 if __name__ == "__main__":
 
@@ -24,6 +24,7 @@ import numpy as np
 import unittest
 
 from lsst.ts.wep.WfEstimator import WfEstimator
+from lsst.ts.wep.cwfs.ConvergencePolicy import ConvergencePolicy
 from lsst.ts.wep.Utility import getModulePath, getConfigDir, DefocalType, CamType
 
 
@@ -148,6 +149,56 @@ class TestWfEsitmator(unittest.TestCase):
         self.wfsEst.reset()
         self.assertEqual(np.sum(self.wfsEst.getAlgo().getZer4UpInNm()), 0)
 
+    def testCalWfsErrWithWarmStart(self):
+
+        self.wfsEst.config(
+            solver="exp",
+            camType=CamType.LsstCam,
+            opticalModel="offAxis",
+            defocalDisInMm=1.0,
+            sizeInPix=120,
+            debugLevel=0,
+        )
+
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Intra, imageFile=self.intraImgFile)
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Extra, imageFile=self.extraImgFile)
+        zer4UpNm = self.wfsEst.calWfsErr()
+
+        # Solve the same images again with the previous solution as the prior
+        self.wfsEst.reset()
+        self.wfsEst.setWarmStart(zer4UpNm)
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Intra, imageFile=self.intraImgFile)
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Extra, imageFile=self.extraImgFile)
+        zer4UpNmWarm = self.wfsEst.calWfsErr()
+
+        algo = self.wfsEst.getAlgo()
+        np.testing.assert_allclose(algo.getWarmStart(), zer4UpNm)
+        self.assertLess(algo.getNumOfItrUsed(), algo.getNumOfOuterItr() + 1)
+        self.assertLess(np.max(np.abs(zer4UpNmWarm - zer4UpNm)), 3)
+
+    def testCalWfsErrWithConvergencePolicy(self):
+
+        self.wfsEst.config(
+            solver="exp",
+            camType=CamType.LsstCam,
+            opticalModel="offAxis",
+            defocalDisInMm=1.0,
+            sizeInPix=120,
+            debugLevel=0,
+        )
+
+        policy = ConvergencePolicy(absTol=1e-3, maxTimeInSec=0)
+        self.wfsEst.setConvergencePolicy(policy)
+
+        algo = self.wfsEst.getAlgo()
+        self.assertTrue(algo.getConvergencePolicy() is policy)
+
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Intra, imageFile=self.intraImgFile)
+        self.wfsEst.setImg(self.fieldXY, DefocalType.Extra, imageFile=self.extraImgFile)
+        self.wfsEst.calWfsErr()
+
+        self.assertEqual(algo.getNumOfItrUsed(), 1)
+
 
 if __name__ == "__main__":
 